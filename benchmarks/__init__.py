@@ -0,0 +1,4 @@
+"""Benchmarks of the parser, the minter and the validators.
+
+Run them from the root of the repository, as `python -m benchmarks.suite`.
+"""
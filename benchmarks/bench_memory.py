@@ -0,0 +1,49 @@
+"""Memory used by parsed tags.
+
+Compares the memory needed to keep many parsed tags alive using the
+ParsedTag representation, the TagUriParser facade, and the layout
+TagUriParser used before ParsedTag existed (five attributes stored in
+the instance `__dict__`).
+
+Usage:
+    python -m benchmarks.bench_memory [count]
+"""
+import sys
+import tracemalloc
+
+from taguri import ParsedTag, TagUriParser
+
+class LegacyParser:
+    """The attribute layout of the original TagUriParser."""
+
+    def __init__(self, tag_uri):
+        parsed = ParsedTag.parse(tag_uri)
+        self.__tag = tag_uri
+        self.__authority = parsed.authority_name
+        self.__date = parsed.date
+        self.__specific = parsed.specific
+        self.__fragment = parsed.fragment
+
+def make_tags(count):
+    return [f'tag:example.com,2018-11:Collections/Books/{n}#Chapter{n % 40}'
+            for n in range(count)]
+
+def measure(factory, tags):
+    tracemalloc.start()
+    objects = [factory(tag) for tag in tags]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return used
+
+def main(count):
+    tags = make_tags(count)
+    print(f'{count} tags, bytes per tag excluding the tag string')
+    for name, factory in (('LegacyParser', LegacyParser),
+                          ('TagUriParser', TagUriParser),
+                          ('ParsedTag', ParsedTag.parse)):
+        used = measure(factory, tags)
+        print(f'{name:>14}: {used / count:8.1f}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,44 @@
+"""Per-tag cost of minting tags one by one and in bulk.
+
+Compares a loop calling TagUriMinter.mint with TagUriMinter.mint_many,
+with and without fragments.
+
+Usage:
+    python -m benchmarks.bench_mint [count]
+"""
+import sys
+import timeit
+
+from taguri import TagUriMinter
+
+def main(count):
+    minter = TagUriMinter('example.com', '2018-11')
+    specifics = [f'Collections/Books/{n}' for n in range(count)]
+    fragments = [f'Chapter{n % 40}' for n in range(count)]
+
+    def loop_mint():
+        for specific in specifics:
+            minter.mint(specific)
+
+    def loop_mint_fragments():
+        for specific, fragment in zip(specifics, fragments):
+            minter.mint(specific, fragment)
+
+    def bulk_mint():
+        for _ in minter.mint_many(specifics):
+            pass
+
+    def bulk_mint_fragments():
+        for _ in minter.mint_many(specifics, fragments):
+            pass
+
+    print(f'{count} tags, nanoseconds per tag')
+    for name, function in (('mint', loop_mint),
+                           ('mint_many', bulk_mint),
+                           ('mint + fragment', loop_mint_fragments),
+                           ('mint_many + fragment', bulk_mint_fragments)):
+        best = min(timeit.repeat(function, number=1, repeat=5))
+        print(f'{name:>22}: {best / count * 1e9:8.1f}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
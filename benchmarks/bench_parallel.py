@@ -0,0 +1,45 @@
+"""Scaling of the parallel parsers with the number of threads.
+
+Parses the synthetic corpus with parse_parallel and check_parallel
+using 1 to N threads, and reports the time per tag and the speedup
+over a single thread.  On interpreters with
+the GIL, threads are expected to make parsing slower; on free-threaded
+builds, they should make it faster up to the number of CPUs.
+
+Usage:
+    python -m benchmarks.bench_parallel [count] [max threads]
+"""
+import os
+import platform
+import sys
+import timeit
+
+from taguri.parallel import check_parallel, free_threaded, parse_parallel
+
+from .corpus import generate
+
+def main(count, max_threads):
+    tags = [sample.tag for sample in generate(count)]
+    kind = 'free-threaded' if free_threaded() else 'GIL enabled'
+    print(f'{platform.python_implementation()} {platform.python_version()}, '
+          f'{kind}, {os.cpu_count()} CPUs, {count} tags')
+    print(f'{"threads":>7} {"parse ns/tag":>13} {"speedup":>8} '
+          f'{"check ns/tag":>13} {"speedup":>8}')
+    baselines = None
+    for threads in range(1, max_threads + 1):
+        def parse():
+            for _ in parse_parallel(tags, 'skip', threads=threads):
+                pass
+
+        def check():
+            check_parallel(tags, threads=threads)
+
+        times = [min(timeit.repeat(function, number=1, repeat=5)) / count * 1e9
+                 for function in (parse, check)]
+        baselines = baselines or times
+        print(f'{threads:>7} {times[0]:13.1f} {baselines[0] / times[0]:7.2f}x '
+              f'{times[1]:13.1f} {baselines[1] / times[1]:7.2f}x')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1)
@@ -0,0 +1,60 @@
+"""Throughput of the memory-mapped tag scanner.
+
+Generates a corpus mixing log lines and Atom entries with embedded
+tags, some of them invalid, and scans it with scan_file.  The corpus
+is written to a temporary file unless a path is given.
+
+Usage:
+    python -m benchmarks.bench_scanner [size in MB] [path]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from taguri.scanner import scan_file
+
+TEMPLATES = (
+    '2018-11-26T10:{minute:02}:00Z INFO fetched tag:example.com,2018:Items/{n} '
+    'in {minute} ms from 10.0.0.{octet}\n',
+    '<entry><id>tag:blog.example.org,2018-11-{day:02}:Posts/{n}#c{minute}</id>'
+    '<title>Post number {n}</title></entry>\n',
+    '2018-11-26T10:{minute:02}:00Z WARN rejected tag:example.com,2018-02-30:{n}\n',
+    '{n}\t{octet}\tno tags in this row, only plain text and numbers\n',
+)
+
+def generate(path, size):
+    written = n = 0
+    with open(path, 'w') as corpus:
+        while written < size:
+            lines = []
+            for _ in range(1000):
+                n += 1
+                lines.append(TEMPLATES[n % len(TEMPLATES)].format(
+                    n=n, minute=n % 60, octet=n % 256, day=n % 28 + 1))
+            block = ''.join(lines)
+            corpus.write(block)
+            written += len(block)
+    return written
+
+def main(megabytes, path=None):
+    temporary = path is None
+    if temporary:
+        descriptor, path = tempfile.mkstemp(suffix='.txt')
+        os.close(descriptor)
+    try:
+        if temporary or not os.path.exists(path):
+            generate(path, megabytes * 1000000)
+        size = os.path.getsize(path)
+        started = time.perf_counter()
+        found = sum(1 for _ in scan_file(path))
+        elapsed = time.perf_counter() - started
+        print(f'{size / 1e6:.0f} MB, {found} tags, {elapsed:.2f} s, '
+              f'{size / elapsed / 1e6:.1f} MB/s, {found / elapsed:.0f} tags/s')
+    finally:
+        if temporary:
+            os.unlink(path)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 256,
+         sys.argv[2] if len(sys.argv) > 2 else None)
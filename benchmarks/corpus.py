@@ -0,0 +1,99 @@
+"""Synthetic corpus of tags for the benchmarks.
+
+Tags use DNS names and e-mail addresses as authority names, dates of
+the three precisions, and specifics with and without pct-encoded
+tokens and fragments.  A configurable share of them is broken in one
+of the ways the parser rejects.  The corpus is deterministic for a
+given seed, so every run of the benchmarks parses the same tags.
+
+Usage:
+    python -m benchmarks.corpus [count] [invalid share] > tags.txt
+"""
+import random
+import sys
+from typing import List, NamedTuple, Optional
+
+WORDS = ('alice', 'bob', 'carol', 'library', 'archive', 'news', 'blog', 'shop')
+DOMAINS = ('example.com', 'example.org', 'mail.example.net', 'x.example.co.uk')
+KINDS = ('Books', 'Films', 'Music', 'Posts', 'Collections/Books', 'a/b/c/d')
+ENCODED = ('Caf%C3%A9', 'Stra%C3%9Fe', '%7Euser', 'a%2Fb', 'Tom%20%26%20Jerry')
+
+class Sample(NamedTuple):
+    """A tag of the corpus, along with its components.
+
+    Components of invalid samples are given as they were put in the
+    tag, including the one that makes the tag invalid.
+    """
+    tag: str
+    authority_name: str
+    date: str
+    specific: str
+    fragment: Optional[str]
+    valid: bool
+
+def authority_name(rng: random.Random) -> str:
+    domain = rng.choice(DOMAINS)
+    if rng.random() < 0.3:
+        return f'{rng.choice(WORDS)}.{rng.choice(WORDS)}@{domain}'
+    return f'{rng.choice(WORDS)}.{domain}' if rng.random() < 0.5 else domain
+
+def date(rng: random.Random) -> str:
+    year = rng.randint(2000, 2024)
+    precision = rng.randrange(3)
+    if precision == 0:
+        return f'{year}'
+    month = rng.randint(1, 12)
+    if precision == 1:
+        return f'{year}-{month:02}'
+    return f'{year}-{month:02}-{rng.randint(1, 28):02}'
+
+def specific(rng: random.Random, n: int) -> str:
+    if rng.random() < 0.2:
+        return f'{rng.choice(KINDS)}/{rng.choice(ENCODED)}/{n}'
+    return f'{rng.choice(KINDS)}/{n}'
+
+def fragment(rng: random.Random) -> Optional[str]:
+    if rng.random() < 0.3:
+        return f'Chapter{rng.randrange(40)}'
+    return None
+
+# Ways of breaking a sample, each returning its new components.
+BREAKERS = (
+    lambda a, d, s, f: (a, '2018-02-30', s, f),
+    lambda a, d, s, f: (a, '2018-13', s, f),
+    lambda a, d, s, f: ('-bad-.example.com', d, s, f),
+    lambda a, d, s, f: ('al!ce@example.com', d, s, f),
+    lambda a, d, s, f: (a, d, s + ' copy', f),
+    lambda a, d, s, f: (a, d, s + '%zz', f),
+    lambda a, d, s, f: (a, d, s, 'Intro#Outro'),
+)
+
+# Ways of breaking a whole tag: its prefix, tagging entity, or parts.
+TAG_BREAKERS = (
+    lambda tag: 'urn:' + tag[4:],
+    lambda tag: tag.replace(',', '', 1),
+    lambda tag: tag[:tag.index(':', 4)],
+)
+
+def generate(count: int, invalid_share: float=0.1, seed: int=0) -> List[Sample]:
+    """Generates a list of samples, some of them invalid."""
+    rng = random.Random(seed)
+    samples = []
+    for n in range(count):
+        components = (authority_name(rng), date(rng), specific(rng, n),
+                      fragment(rng))
+        valid = rng.random() >= invalid_share
+        if not valid:
+            components = rng.choice(BREAKERS)(*components)
+        a, d, s, f = components
+        tag = f'tag:{a},{d}:{s}' + (f'#{f}' if f else '')
+        if not valid and rng.random() < 0.2:
+            tag = rng.choice(TAG_BREAKERS)(tag)
+        samples.append(Sample(tag, a, d, s, f, valid))
+    return samples
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    for sample in generate(count, share):
+        print(sample.tag)
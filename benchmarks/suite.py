@@ -0,0 +1,440 @@
+"""Benchmark suite for the parser, the minter and the validators.
+
+Every benchmark runs over the synthetic corpus of benchmarks.corpus
+and reports the best time per item of several runs.  Timings are also
+divided by the time of a fixed calibration workload, run alternately
+with each benchmark, which makes them comparable between machines and
+between runs on a busy machine.  These ratios are compared with the
+baselines stored in benchmarks/baselines.json.  Benchmarks that got slower than
+their baseline by more than the tolerance are measured again, and if
+they are still slower they are reported as regressions, which make
+the suite exit with status 1.
+
+Usage:
+    python -m benchmarks.suite [-k NAME] [--count N] [--tolerance T]
+    python -m benchmarks.suite --save
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from taguri import (
+    OwnershipRegistry,
+    ParsedTag,
+    TagIndex,
+    TagTable,
+    TagUriMinter,
+    TagUriParser,
+    encode_table,
+    parse_buffer,
+    parse_many,
+)
+from taguri.instrumentation import MetricsRecorder, instrumented
+from taguri.validator import (
+    authority_name_validator,
+    date_validator,
+    days_in_month,
+    parse_date,
+    specific_validator,
+    validate_specifics,
+)
+
+from .corpus import Sample, generate
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines.json')
+# How many times a regression is measured again before reporting it.
+RETRIES = 2
+
+# Every benchmark, by name.  Each one is given the corpus, and returns
+# the function to time and how many items the function processes.
+BENCHMARKS = {}
+
+def benchmark(name: str):
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+@benchmark('parser.TagUriParser.valid')
+def parser_valid(corpus: List[Sample]):
+    tags = [sample.tag for sample in corpus if sample.valid]
+
+    def run():
+        for tag in tags:
+            TagUriParser(tag)
+    return run, len(tags)
+
+@benchmark('parser.TagUriParser.lazy.specific')
+def parser_lazy_specific(corpus: List[Sample]):
+    tags = [sample.tag for sample in corpus if sample.valid]
+
+    def run():
+        for tag in tags:
+            TagUriParser(tag, lazy=True).specific
+    return run, len(tags)
+
+@benchmark('parser.TagUriParser.mixed')
+def parser_mixed(corpus: List[Sample]):
+    tags = [sample.tag for sample in corpus]
+
+    def run():
+        for tag in tags:
+            try:
+                TagUriParser(tag)
+            except AttributeError:
+                pass
+    return run, len(tags)
+
+@benchmark('parser.TagUriParser.mixed.instrumented')
+def parser_mixed_instrumented(corpus: List[Sample]):
+    run, items = parser_mixed(corpus)
+    recorder = MetricsRecorder()
+
+    def run_instrumented():
+        with instrumented(recorder):
+            run()
+    return run_instrumented, items
+
+@benchmark('bulk.parse_many.decoded')
+def bulk_parse_many_decoded(corpus: List[Sample]):
+    payload = '\n'.join(sample.tag for sample in corpus).encode('utf-8')
+
+    def run():
+        for _ in parse_many(payload.decode('utf-8').split('\n'), 'skip'):
+            pass
+    return run, len(corpus)
+
+@benchmark('buffer.parse_buffer')
+def buffer_parse_buffer(corpus: List[Sample]):
+    payload = '\n'.join(sample.tag for sample in corpus).encode('utf-8')
+
+    def run():
+        for _ in parse_buffer(payload, 'skip'):
+            pass
+    return run, len(corpus)
+
+@benchmark('minter.TagUriMinter.init')
+def minter_init(corpus: List[Sample]):
+    entities = [(sample.authority_name, sample.date)
+                for sample in corpus if sample.valid]
+
+    def run():
+        for authority_name, date in entities:
+            TagUriMinter(authority_name, date)
+    return run, len(entities)
+
+@benchmark('minter.TagUriMinter.mint.valid')
+def minter_mint_valid(corpus: List[Sample]):
+    inputs = _mint_inputs([sample for sample in corpus if sample.valid])
+
+    def run():
+        for mint, specific, fragment in inputs:
+            mint(specific, fragment)
+    return run, len(inputs)
+
+@benchmark('minter.TagUriMinter.mint.mixed')
+def minter_mint_mixed(corpus: List[Sample]):
+    inputs = _mint_inputs(corpus)
+
+    def run():
+        for mint, specific, fragment in inputs:
+            try:
+                mint(specific, fragment)
+            except AttributeError:
+                pass
+    return run, len(inputs)
+
+@benchmark('minter.TagTemplate.mint')
+def minter_template(corpus: List[Sample]):
+    mint = TagUriMinter('example.com', '2018').template(
+        'Collections/{kind}/{id:int}#{section}').mint
+    inputs = _shaped_inputs(corpus)
+
+    def run():
+        for kind, id, section in inputs:
+            mint(kind, id, section)
+    return run, len(inputs)
+
+@benchmark('minter.TagUriMinter.mint.formatted')
+def minter_mint_formatted(corpus: List[Sample]):
+    # The same tags as minter.TagTemplate.mint, minted without a template.
+    mint = TagUriMinter('example.com', '2018').mint
+    inputs = _shaped_inputs(corpus)
+
+    def run():
+        for kind, id, section in inputs:
+            mint(f'Collections/{kind}/{id}', section)
+    return run, len(inputs)
+
+def _shaped_inputs(samples: List[Sample]) -> List[Tuple[str, int, str]]:
+    # Tags of a fixed shape, made from the words of the valid samples.
+    return [(sample.authority_name.split('.')[0].split('@')[0], n,
+             sample.fragment or 'Doe')
+            for n, sample in enumerate(samples) if sample.valid]
+
+def _mint_inputs(samples: List[Sample]) -> List[Tuple[Callable, str, str]]:
+    # Minters are built beforehand, one for each valid tagging entity.
+    minters = {}
+    inputs = []
+    for sample in samples:
+        key = (sample.authority_name, sample.date)
+        if key not in minters:
+            try:
+                minters[key] = TagUriMinter(*key)
+            except AttributeError:
+                minters[key] = None
+        if minters[key] is not None:
+            inputs.append((minters[key].mint, sample.specific, sample.fragment))
+    return inputs
+
+@benchmark('index.TagIndex.add')
+def index_add(corpus: List[Sample]):
+    tags = [ParsedTag.parse(sample.tag) for sample in corpus if sample.valid]
+
+    def run():
+        index = TagIndex(tags)
+        index.by_date('2018')
+    return run, len(tags)
+
+@benchmark('ownership.OwnershipRegistry.check')
+def ownership_check(corpus: List[Sample]):
+    samples = [sample for sample in corpus if sample.valid]
+    registry = OwnershipRegistry(today='2100')
+    for n, sample in enumerate(samples):
+        # A few periods for every authority name, one of them open.
+        registry.add(sample.authority_name, f'{1990 + n % 10}', f'{2000 + n % 10}')
+        registry.add(sample.authority_name, f'{2011 + n % 5}')
+    entities = [(sample.authority_name, sample.date) for sample in samples]
+
+    def run():
+        check = registry.check
+        for authority_name, date in entities:
+            check(authority_name, date)
+    return run, len(entities)
+
+@benchmark('tag.ParsedTag.replace')
+def tag_replace(corpus: List[Sample]):
+    tags = _parsed_tags(corpus)
+
+    def run():
+        for parsed in tags:
+            parsed.replace(fragment='Section')
+            parsed.replace(date='2019')
+            parsed.append('v2')
+    return run, 3 * len(tags)
+
+@benchmark('tag.ParsedTag.parse.derived')
+def tag_parse_derived(corpus: List[Sample]):
+    # The same tags as tag.ParsedTag.replace, formatted and parsed again.
+    tags = _parsed_tags(corpus)
+    parse = ParsedTag.parse
+
+    def run():
+        for parsed in tags:
+            authority_name, date, specific, fragment = parsed
+            suffix = '' if fragment is None else f'#{fragment}'
+            parse(f'tag:{authority_name},{date}:{specific}#Section')
+            parse(f'tag:{authority_name},2019:{specific}{suffix}')
+            parse(f'tag:{authority_name},{date}:{specific}/v2{suffix}')
+    return run, 3 * len(tags)
+
+def _parsed_tags(samples: List[Sample]) -> List[ParsedTag]:
+    return [ParsedTag.parse(sample.tag) for sample in samples if sample.valid]
+
+@benchmark('table.TagTable.iter')
+def table_iter(corpus: List[Sample]):
+    table = TagTable(encode_table(sorted(sample.tag for sample in corpus if sample.valid)))
+
+    def run():
+        for _ in table:
+            pass
+    return run, len(table)
+
+@benchmark('table.TagTable.getitem')
+def table_getitem(corpus: List[Sample]):
+    table = TagTable(encode_table(sorted(sample.tag for sample in corpus if sample.valid)))
+    # Every tag once, in an order that jumps between blocks.
+    positions = [n * 7919 % len(table) for n in range(len(table))]
+
+    def run():
+        for position in positions:
+            table[position]
+    return run, len(positions)
+
+@benchmark('table.TagTable.index')
+def table_index(corpus: List[Sample]):
+    tags = sorted(sample.tag for sample in corpus if sample.valid)
+    table = TagTable(encode_table(tags))
+    tags = tags[::7]
+
+    def run():
+        index = table.index
+        for tag in tags:
+            index(tag)
+    return run, len(tags)
+
+@benchmark('validator.authority_name_validator')
+def validator_authority_name(corpus: List[Sample]):
+    return _each(authority_name_validator,
+                 [sample.authority_name for sample in corpus])
+
+@benchmark('validator.date_validator')
+def validator_date(corpus: List[Sample]):
+    return _each(date_validator, [sample.date for sample in corpus])
+
+@benchmark('validator.parse_date')
+def validator_parse_date(corpus: List[Sample]):
+    return _each(parse_date, [sample.date for sample in corpus])
+
+@benchmark('validator.days_in_month')
+def validator_days_in_month(corpus: List[Sample]):
+    months = [(2000 + n % 400, n % 12 + 1) for n in range(len(corpus))]
+
+    def run():
+        for year, month in months:
+            days_in_month(year, month)
+    return run, len(months)
+
+@benchmark('validator.specific_validator')
+def validator_specific(corpus: List[Sample]):
+    return _each(specific_validator, _specifics(corpus))
+
+@benchmark('validator.validate_specifics')
+def validator_validate_specifics(corpus: List[Sample]):
+    specifics = _specifics(corpus)
+    return lambda: validate_specifics(specifics), len(specifics)
+
+def _specifics(corpus: List[Sample]) -> List[str]:
+    specifics = [sample.specific for sample in corpus]
+    specifics.extend(sample.fragment for sample in corpus if sample.fragment)
+    return specifics
+
+def _each(function: Callable, values: List) -> Tuple[Callable, int]:
+    def run():
+        for value in values:
+            function(value)
+    return run, len(values)
+
+def calibration_workload():
+    """Returns the fixed workload used to calibrate the timings."""
+    words = [f'word{n}' for n in range(10000)]
+
+    def run():
+        for word in words:
+            '-'.join(word.split('o')).upper()
+    return run, len(words)
+
+def measure(function: Callable, items: int, repeat: int) -> Tuple[float, float]:
+    """Returns the best time per item of a function, in nanoseconds.
+
+    The calibration workload is run before every run of the function,
+    and its best time per item is returned as well.
+    """
+    reference, reference_items = calibration_workload()
+    timer = timeit.Timer(function)
+    reference_timer = timeit.Timer(reference)
+    best = reference_best = float('inf')
+    for _ in range(repeat):
+        reference_best = min(reference_best, reference_timer.timeit(1))
+        best = min(best, timer.timeit(1))
+    return (best / max(items, 1) * 1e9,
+            reference_best / reference_items * 1e9)
+
+def run_suite(corpus: List[Sample], names: List[str],
+              repeat: int) -> Dict[str, Tuple[float, float]]:
+    """Runs the given benchmarks.
+
+    Returns:
+        dict: the time per item of each benchmark, in nanoseconds, and
+            the time per item of the calibration run before it.
+    """
+    results = {}
+    for name in names:
+        function, items = BENCHMARKS[name](corpus)
+        results[name] = measure(function, items, repeat)
+    return results
+
+def load_baselines(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {'benchmarks': {}}
+    with open(path) as source:
+        return json.load(source)
+
+def save_baselines(path: str, results: Dict[str, Tuple[float, float]],
+                   arguments):
+    baselines = load_baselines(path)
+    baselines.update({
+        'python': platform.python_version(),
+        'count': arguments.count,
+        'invalid_share': arguments.invalid_share,
+    })
+    for name, (nanoseconds, calibration) in results.items():
+        baselines['benchmarks'][name] = round(nanoseconds / calibration, 4)
+    with open(path, 'w') as target:
+        json.dump(baselines, target, indent=2, sort_keys=True)
+        target.write('\n')
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    parser.add_argument('-k', dest='pattern', default='',
+                        help='only run the benchmarks whose name contains this')
+    parser.add_argument('--count', type=int, default=20000,
+                        help='how many tags the corpus has')
+    parser.add_argument('--invalid-share', type=float, default=0.1,
+                        help='the share of invalid tags in the corpus')
+    parser.add_argument('--repeat', type=int, default=7,
+                        help='how many times each benchmark is run')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='how much slower than the baseline is allowed')
+    parser.add_argument('--baselines', default=BASELINES,
+                        help='the file with the baselines')
+    parser.add_argument('--save', action='store_true',
+                        help='store the results as the new baselines')
+    arguments = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if arguments.pattern in name]
+    corpus = generate(arguments.count, arguments.invalid_share)
+    results = run_suite(corpus, names, arguments.repeat)
+    if arguments.save:
+        save_baselines(arguments.baselines, results, arguments)
+        print(f'Saved {len(results)} baselines to {arguments.baselines}')
+        return 0
+
+    baselines = load_baselines(arguments.baselines)['benchmarks']
+    regressions = 0
+    print(f'{len(corpus)} tags')
+    print(f'{"benchmark":<40} {"ns/item":>9} {"baseline":>9} {"change":>8}')
+    for name, (nanoseconds, calibration) in results.items():
+        if name not in baselines:
+            print(f'{name:<40} {nanoseconds:9.1f} {"-":>9} {"new":>8}')
+            continue
+        change = nanoseconds / (baselines[name] * calibration) - 1
+        for _ in range(RETRIES):
+            if change <= arguments.tolerance:
+                break
+            # Confirm the regression, as a busy machine may cause it.
+            function, items = BENCHMARKS[name](corpus)
+            retry, retry_calibration = measure(function, items, arguments.repeat)
+            retry_change = retry / (baselines[name] * retry_calibration) - 1
+            if retry_change < change:
+                nanoseconds, calibration, change = (retry, retry_calibration,
+                                                    retry_change)
+        expected = baselines[name] * calibration
+        status = ''
+        if change > arguments.tolerance:
+            status = '  REGRESSION'
+            regressions += 1
+        print(f'{name:<40} {nanoseconds:9.1f} {expected:9.1f} '
+              f'{change:+8.1%}{status}')
+    if regressions:
+        print(f'{regressions} regressions above {arguments.tolerance:.0%}',
+              file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
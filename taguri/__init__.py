@@ -1,2 +1,29 @@
+from .aio import mint_stream, parse_stream
+from .buffer import BytesTag, parse_buffer, parse_bytes, try_parse_bytes
+from .bulk import ErrorRecord, parse_many
+from .cache import EntityCache
+from .canonical import canonicalize, tags_equal
+from .dedup import BloomFilter, Deduplicator
+from .errors import ErrorCode, TagError
+from .generator import (
+    BlockAllocator,
+    BlockIdGenerator,
+    SequenceIdGenerator,
+    TimeOrderedIdGenerator,
+)
+from .index import TagIndex
+from .instrumentation import (
+    Instrumentation,
+    MetricsRecorder,
+    instrumented,
+    set_instrumentation,
+)
 from .minter import TagUriMinter
+from .ownership import OwnershipRegistry
+from .parallel import check_parallel, parse_parallel
 from .parser import TagUriParser
+from .scanner import scan, scan_file
+from .shared import SharedTagTable
+from .table import TagTable, encode_table, write_table
+from .tag import ParsedTag, ParseResult, check, try_parse
+from .template import TagTemplate
@@ -0,0 +1,241 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List
+from .bulk import ErrorRecord, check_error_policy, decode_line, parse_many
+
+# How many bytes are read from a stream at a time.
+READ_SIZE = 64 * 1024
+# How many inputs are processed together at most.
+ASYNC_BATCH_SIZE = 1024
+# Batches with at least this many inputs are sent to the executor.
+OFFLOAD_THRESHOLD = 256
+# Marks the end of the items of an asynchronous iterable.
+_END = object()
+
+def iter_batches(source, batch_size: int=ASYNC_BATCH_SIZE) -> AsyncIterator[List]:
+    """Groups the inputs given by an asynchronous source in batches.
+
+    Batches are made of the inputs that are already available, so a
+    slow source never stalls waiting for a batch to be full, while a
+    burst of inputs is processed together.  Nothing is read from the
+    source until the next batch is requested, so a consumer that falls
+    behind makes the source stop reading, as backpressure.
+
+    The source can be:
+
+        o An `asyncio.StreamReader`, or any object with a `read`
+          coroutine, that gives a tag on each line.  Lines are decoded
+          as UTF-8 and their terminators are removed.
+
+        o An `asyncio.Queue`.  Every item is an input, and None marks
+          the end of the inputs.
+
+        o Any asynchronous iterable.  Its items are moved to a queue
+          of up to `batch_size` items by another task, so it is read
+          ahead by one batch at most.
+
+    Items given as bytes by a queue or an iterable are decoded as well.
+
+    Args:
+        source: the asynchronous source of inputs.
+        batch_size (int): how many inputs a batch has at most.
+
+    Returns:
+        An asynchronous iterator of lists of inputs.
+
+    Raises:
+        ValueError: if the batch size is not positive.
+    """
+    if batch_size < 1:
+        raise ValueError(f'Invalid batch_size: {batch_size}')
+    if isinstance(source, asyncio.Queue):
+        return _queue_batches(source, batch_size)
+    if hasattr(source, 'read'):
+        return _stream_batches(source, batch_size)
+    return _iterable_batches(source, batch_size)
+
+def _decode(item):
+    if isinstance(item, (bytes, bytearray)):
+        return decode_line(item)
+    return item
+
+async def _stream_batches(reader, batch_size: int) -> AsyncIterator[List[str]]:
+    pending = b''
+    while True:
+        chunk = await reader.read(READ_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for start in range(0, len(lines), batch_size):
+            yield [decode_line(line) for line in lines[start:start + batch_size]]
+    if pending:
+        yield [decode_line(pending)]
+
+async def _queue_batches(queue: asyncio.Queue, batch_size: int,
+                         end=None) -> AsyncIterator[List]:
+    while True:
+        item = await queue.get()
+        queue.task_done()
+        batch = []
+        while item is not end:
+            batch.append(_decode(item))
+            if len(batch) >= batch_size or queue.empty():
+                break
+            item = queue.get_nowait()
+            queue.task_done()
+        if batch:
+            yield batch
+        if item is end:
+            return
+
+async def _iterable_batches(iterable, batch_size: int) -> AsyncIterator[List]:
+    # The items that are already available can only be told apart by
+    # reading ahead, so another task moves them to a queue.
+    queue = asyncio.Queue(batch_size)
+    failures = []
+
+    async def produce():
+        try:
+            async for item in iterable:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            # Before Python 3.8, it is an Exception too.
+            raise
+        except Exception as error:
+            failures.append(error)
+        await queue.put(_END)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        async for batch in _queue_batches(queue, batch_size, _END):
+            yield batch
+        if failures:
+            raise failures[0]
+    finally:
+        producer.cancel()
+
+def parse_stream(source, errors: str='raise', cache=None,
+                 batch_size: int=ASYNC_BATCH_SIZE, executor=None,
+                 offload_threshold: int=OFFLOAD_THRESHOLD) -> AsyncIterator:
+    """Parses the tag URIs given by an asynchronous source.
+
+    This is the asynchronous version of `parse_many`.  Tags are read in
+    batches, as given by `iter_batches`, and the event loop is given
+    back after each batch, so a burst of tags does not block other
+    tasks.  Batches of many tags can also be parsed by an executor, so
+    the event loop is not blocked at all while they are parsed.
+
+    Args:
+        source: a stream reader, a queue or an asynchronous iterable of
+            tag URIs, as accepted by `iter_batches`.
+        errors (str): what to do when a tag is not valid: `raise`,
+            `skip` or `record`, like in `parse_many`.
+        cache (:obj:`EntityCache`, optional): if given, the cache used
+            to validate the tagging entities.  It is also used by the
+            executor, unless it is a ProcessPoolExecutor: caches cannot
+            be sent to other processes, so batches parsed there are
+            validated without it.
+        batch_size (int): how many tags are parsed together at most.
+        executor (:obj:`concurrent.futures.Executor`, optional): if
+            given, the executor used to parse large batches.
+        offload_threshold (int): how many tags a batch must have to be
+            parsed by the executor.
+
+    Returns:
+        An asynchronous iterator of ParsedTag for each valid tag, and of
+        ErrorRecord for each invalid tag if the error policy is `record`.
+
+    Raises:
+        AttributeError: if a tag is not valid and the error policy is
+            `raise`.  The tags that came before are yielded first.
+        ValueError: if the given error policy or batch size is not valid.
+
+    Example:
+        >>> async def main():
+        ...     reader = asyncio.StreamReader()
+        ...     reader.feed_data(b'tag:example.com,2018:Books\\ntag:x:y\\n')
+        ...     reader.feed_eof()
+        ...     return [tag async for tag in parse_stream(reader, 'skip')]
+        >>> asyncio.run(main())
+        [ParsedTag('tag:example.com,2018:Books')]
+    """
+    check_error_policy(errors)
+    batches = iter_batches(source, batch_size)
+    offloaded = (None,) if isinstance(executor, ProcessPoolExecutor) else (cache,)
+    return _process(batches, _parse_batch, (cache,), errors, executor,
+                    offload_threshold, offloaded)
+
+def mint_stream(minter, source, errors: str='raise',
+                batch_size: int=ASYNC_BATCH_SIZE, executor=None,
+                offload_threshold: int=OFFLOAD_THRESHOLD) -> AsyncIterator:
+    """Mints a tag URI for each input given by an asynchronous source.
+
+    This is the asynchronous version of `TagUriMinter.mint_many`, with
+    the same batching and offloading as `parse_stream`.  Every input is
+    either a specific, or a tuple with a specific and a fragment.
+
+    Args:
+        minter (TagUriMinter): the minter used to build the tags.
+        source: a stream reader, a queue or an asynchronous iterable of
+            inputs, as accepted by `iter_batches`.
+        errors (str): what to do when an input is not valid: `raise`,
+            `skip` or `record`, like in `TagUriMinter.mint_many`.
+        batch_size (int): how many inputs are minted together at most.
+        executor (:obj:`concurrent.futures.Executor`, optional): if
+            given, the executor used to mint large batches.
+        offload_threshold (int): how many inputs a batch must have to
+            be minted by the executor.
+
+    Returns:
+        An asynchronous iterator of the built tags, and of ErrorRecord
+        for each rejected input if the error policy is `record`.
+
+    Raises:
+        AttributeError: if an input is not valid and the error policy
+            is `raise`.  The tags that came before are yielded first.
+        ValueError: if the given error policy or batch size is not valid.
+    """
+    check_error_policy(errors)
+    batches = iter_batches(source, batch_size)
+    return _process(batches, _mint_batch, (minter,), errors, executor,
+                    offload_threshold, (minter,))
+
+async def _process(batches, function, arguments, errors: str, executor,
+                   offload_threshold: int, offloaded_arguments) -> AsyncIterator:
+    # The arguments of the function are given apart for the batches sent
+    # to the executor, since not every argument can go to other processes.
+    loop = asyncio.get_running_loop()
+    processed = 0
+    async for batch in batches:
+        if executor is not None and len(batch) >= offload_threshold:
+            results = await loop.run_in_executor(
+                executor, function, batch, processed, *offloaded_arguments)
+        else:
+            results = function(batch, processed, *arguments)
+        processed += len(batch)
+        for result in results:
+            if isinstance(result, ErrorRecord):
+                if errors == 'raise':
+                    raise AttributeError(result.reason)
+                if errors == 'skip':
+                    continue
+            yield result
+        # Let other tasks run, even if the source never has to wait.
+        await asyncio.sleep(0)
+
+def _parse_batch(batch: List[str], processed: int, cache) -> List:
+    return list(parse_many(batch, 'record', cache, start=processed + 1))
+
+def _mint_batch(batch: List, processed: int, minter) -> List:
+    specifics = []
+    fragments = []
+    for item in batch:
+        specific, fragment = (item, None) if isinstance(item, str) else item
+        specifics.append(specific)
+        fragments.append(fragment)
+    return [
+        result._replace(lineno=result.lineno + processed)
+        if isinstance(result, ErrorRecord) else result
+        for result in minter.mint_many(specifics, fragments, errors='record')
+    ]
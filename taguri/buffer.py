@@ -0,0 +1,294 @@
+import re
+from typing import Iterator, Optional, Tuple, Union
+from .bulk import ErrorRecord, check_error_policy
+from .errors import TagError
+from .grammar import TAG_URI_RE, _parse_step_by_step, scan_tag
+from .instrumentation import state as _instrumentation
+from .tag import ParsedTag, ParseResult
+from .validator import days_in_month
+
+# The tag grammar, for bytes.
+TAG_URI_BYTES_RE = re.compile(TAG_URI_RE.pattern.encode('ascii'))
+# A line of a buffer of tags, which is either a tag that matches the
+# grammar, or anything else.
+LINE_RE = re.compile(
+    rb'(?m)^(?:(?:' + TAG_URI_BYTES_RE.pattern + rb')\r?$|[^\n]*)'
+)
+
+class BytesTag:
+    """A tag URI parsed in place, inside a bytes-like object.
+
+    This is the counterpart of ParsedTag for binary data.  It keeps a
+    memoryview of the buffer plus the offsets of the tag and of its
+    separators, and its components are memoryview slices of the buffer,
+    so they can be written out or compared to bytes without copying.
+    Use `decode` to get a ParsedTag.
+
+    Note that the buffer stays exported while any BytesTag or any of
+    its slices is alive, so a bytearray cannot be resized and a mmap
+    cannot be closed until they are released.
+
+    Use `parse_bytes` to parse and validate a tag.  The constructor
+    trusts the given offsets and is meant to be used by the parsers.
+
+    Args:
+        view (memoryview): the buffer, as unsigned bytes.
+        start (int): offset where the tag starts.
+        comma (int): offset of the comma in the tagging entity.
+        colon (int): offset of the colon before the specific part.
+        hash (int): offset of the `#` before the fragment, or the end
+            of the tag if the tag has no fragment.
+        end (int): offset where the tag ends.
+
+    Example:
+        >>> parsed = parse_bytes(b'tag:example.com,2018:Books#Doe')
+        >>> parsed.specific == b'Books'
+        True
+        >>> bytes(parsed.fragment)
+        b'Doe'
+    """
+
+    __slots__ = ('__view', '__start', '__comma', '__colon', '__hash', '__end')
+
+    def __init__(self, view: memoryview, start: int, comma: int, colon: int,
+                 hash: int, end: int):
+        self.__view = view
+        self.__start = start
+        self.__comma = comma
+        self.__colon = colon
+        self.__hash = hash
+        self.__end = end
+
+    @property
+    def tag(self) -> memoryview:
+        """memoryview: The complete tag URI."""
+        return self.__view[self.__start:self.__end]
+
+    @property
+    def authority_name(self) -> memoryview:
+        """memoryview: The authority name of the tag."""
+        return self.__view[self.__start + 4:self.__comma]
+
+    @property
+    def date(self) -> memoryview:
+        """memoryview: The date component of the tag."""
+        return self.__view[self.__comma + 1:self.__colon]
+
+    @property
+    def tagging_entity(self) -> memoryview:
+        """memoryview: The tagging entity part of the tag."""
+        return self.__view[self.__start + 4:self.__colon]
+
+    @property
+    def specific(self) -> memoryview:
+        """memoryview: The specific part of the tag."""
+        return self.__view[self.__colon + 1:self.__hash]
+
+    @property
+    def fragment(self) -> Optional[memoryview]:
+        """memoryview: The fragment of the tag, or None if there is none."""
+        if self.__hash < self.__end:
+            return self.__view[self.__hash + 1:self.__end]
+        return None
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        """(int, int): The offsets where the tag starts and ends."""
+        return self.__start, self.__end
+
+    @property
+    def offsets(self) -> Tuple[int, int, int]:
+        """(int, int, int): The offsets of the comma, colon and `#`."""
+        return self.__comma, self.__colon, self.__hash
+
+    def decode(self) -> ParsedTag:
+        """Returns the tag as a ParsedTag, copying it to a string."""
+        start = self.__start
+        tag = str(self.__view[start:self.__end], 'ascii')
+        return ParsedTag(tag, self.__comma - start, self.__colon - start,
+                         self.__hash - start)
+
+    def __bytes__(self):
+        return bytes(self.tag)
+
+    def __repr__(self):
+        return f'BytesTag({bytes(self.tag)!r})'
+
+def _view(data) -> memoryview:
+    # A flat memoryview of unsigned bytes over any bytes-like object.
+    view = memoryview(data)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    return view
+
+def scan_bytes(data, start: int=0,
+               end: Optional[int]=None) -> Union[Tuple[int, int, int], TagError]:
+    """Parses a tag URI inside a bytes-like object, like `scan_tag`.
+
+    The tag is matched against the ASCII grammar directly on the bytes,
+    so valid tags are neither copied nor decoded.  Tags that do not
+    match it are decoded as Latin-1, which keeps the offsets, and given
+    to the step by step parser, which tells whether they are valid
+    anyway and where the error is.  Bytes out of the ASCII range are
+    never valid.
+
+    Args:
+        data: the bytes-like object containing the tag.
+        start (int): offset where the tag starts.
+        end (int, optional): offset where the tag ends.  Defaults to
+            the end of the data.
+
+    Returns:
+        (int, int, int): the offsets in the data of the comma, the
+            colon and the fragment separator if the tag is valid;
+            otherwise, the TagError, with its offset in the data too.
+
+    Example:
+        >>> scan_bytes(b'<tag:example.com,2018:Books>', 1, 27)
+        (16, 21, 27)
+    """
+    if end is None:
+        end = len(data)
+    if _instrumentation.hooks is None:
+        match = TAG_URI_BYTES_RE.fullmatch(data, start, end)
+        if match and _calendar_date(data, match.start('date'), match.end('date')):
+            return match.end('authority_name'), match.end('date'), match.end('specific')
+    return _scan_decoded(data, start, end)
+
+def _scan_decoded(data, start: int, end: int) -> Union[Tuple[int, int, int], TagError]:
+    # Slow path, for tags that did not match the grammar.  Instrumented
+    # tags are all parsed here, so that they are reported.
+    tag = str(data[start:end], 'latin-1')
+    if _instrumentation.hooks is None:
+        result = _parse_step_by_step(tag)
+    else:
+        result = scan_tag(tag)
+    if type(result) is TagError:
+        return TagError(result.code, start + result.offset)
+    comma, colon, hash = result
+    return start + comma, start + colon, start + hash
+
+def _calendar_date(data, start: int, end: int) -> bool:
+    # Same as calendar_date, reading the digits from the bytes.
+    if data[start] == 48 and data[start + 1] == 48 and \
+            data[start + 2] == 48 and data[start + 3] == 48:
+        return False
+    if end - start < 10:
+        return True
+    day = (data[end - 2] - 48) * 10 + data[end - 1] - 48
+    if day <= 28:
+        return True
+    year = ((data[start] - 48) * 1000 + (data[start + 1] - 48) * 100 +
+            (data[start + 2] - 48) * 10 + data[start + 3] - 48)
+    month = (data[start + 5] - 48) * 10 + data[start + 6] - 48
+    return day <= days_in_month(year, month)
+
+def try_parse_bytes(data, start: int=0, end: Optional[int]=None) -> ParseResult:
+    """Parses and validates a tag URI inside a bytes-like object.
+
+    This is `try_parse` for bytes, bytearray, memoryview or mmap
+    objects.  Nothing is raised for invalid tags.
+
+    Args:
+        data: the bytes-like object containing the tag.
+        start (int): offset where the tag starts.
+        end (int, optional): offset where the tag ends.  Defaults to
+            the end of the data.
+
+    Returns:
+        ParseResult: the BytesTag, or the error if it is not valid.
+    """
+    view = _view(data)
+    if end is None:
+        end = len(view)
+    result = scan_bytes(view, start, end)
+    if type(result) is TagError:
+        return ParseResult(None, result)
+    return ParseResult(BytesTag(view, start, *result, end), None)
+
+def parse_bytes(data, start: int=0, end: Optional[int]=None) -> BytesTag:
+    """Parses and validates a tag URI inside a bytes-like object.
+
+    Args:
+        data: the bytes-like object containing the tag.
+        start (int): offset where the tag starts.
+        end (int, optional): offset where the tag ends.  Defaults to
+            the end of the data.
+
+    Returns:
+        BytesTag: the parsed tag, referencing the data.
+
+    Raises:
+        AttributeError: if the given tag URI is not valid, using the
+            same messages that TagUriParser raises.
+    """
+    result = try_parse_bytes(data, start, end)
+    if result.error is not None:
+        raise AttributeError(result.error.message)
+    return result.tag
+
+def parse_buffer(data, errors: str='raise') -> Iterator:
+    """Parses a whole buffer with a tag on each line.
+
+    This is `parse_many` for a bytes-like object, such as a message
+    payload or a memory-mapped file.  Every line is parsed in place, so
+    the buffer is never split nor decoded, and the yielded tags share
+    a single memoryview of it.  Line terminators may be `\\n` or
+    `\\r\\n`.
+
+    Args:
+        data: the bytes-like object with the tags.
+        errors (str): what to do when a tag is not valid.  Use `raise`
+            to raise the AttributeError, `skip` to silently ignore the
+            tag, or `record` to yield an ErrorRecord in its place, with
+            the line decoded as UTF-8.
+
+    Yields:
+        BytesTag: the parsed tag for each valid line; or an ErrorRecord
+            for each invalid line if the error policy is `record`.
+
+    Raises:
+        AttributeError: if a tag is not valid and the error policy is
+            `raise`.
+        ValueError: if the given error policy is not known.
+
+    Example:
+        >>> payload = b'tag:example.com,2018:a\\r\\ntag:example.com:b\\n'
+        >>> for result in parse_buffer(payload, errors='record'):
+        ...     print(repr(result))
+        BytesTag(b'tag:example.com,2018:a')
+        ErrorRecord(lineno=2, value='tag:example.com:b', reason='Invalid tag_uri: invalid tagging entity')
+    """
+    check_error_policy(errors)
+    return _parse_buffer(_view(data), errors)
+
+def _parse_buffer(view: memoryview, errors: str) -> Iterator:
+    # Every line is matched by a single scan of the whole buffer, and
+    # tags that did not match the grammar are parsed again one by one.
+    hooks = _instrumentation.hooks
+    size = len(view)
+    lineno = 0
+    for match in LINE_RE.finditer(view):
+        start = match.start()
+        if start == size:
+            # The empty match after the last line terminator.
+            break
+        lineno += 1
+        # The groups are the authority name, date, specific and fragment.
+        if match.start(1) >= 0 and hooks is None and \
+                _calendar_date(view, match.start(2), match.end(2)):
+            hash = match.end(3)
+            end = match.end(4) if match.start(4) >= 0 else hash
+            yield BytesTag(view, start, match.end(1), match.end(2), hash, end)
+            continue
+        end = match.end()
+        if end > start and view[end - 1] == 13:
+            end -= 1
+        result = _scan_decoded(view, start, end)
+        if type(result) is not TagError:
+            yield BytesTag(view, start, *result, end)
+        elif errors == 'raise':
+            raise AttributeError(result.message)
+        elif errors == 'record':
+            value = str(view[start:end], 'utf-8', 'replace')
+            yield ErrorRecord(lineno, value, result.message)
@@ -0,0 +1,102 @@
+from typing import Iterable, Iterator, NamedTuple, Union
+from .errors import TagError
+from .grammar import scan_owned_tag, scan_tag
+from .tag import ParsedTag
+
+ERROR_POLICIES = ('raise', 'skip', 'record')
+
+class ErrorRecord(NamedTuple):
+    """An input that could not be processed by a bulk operation.
+
+    Attributes:
+        lineno (int): the position of the input, starting at 1.  When
+            reading from a file this is the line number.
+        value (str): the rejected input, line terminator excluded.
+        reason (str): the message of the error raised for the input.
+    """
+    lineno: int
+    value: str
+    reason: str
+
+def check_error_policy(errors: str):
+    """Raises ValueError if the given error policy is not known."""
+    if errors not in ERROR_POLICIES:
+        raise ValueError(f'Invalid error policy: {errors}')
+
+def iter_lines(source) -> Iterator[str]:
+    """Iterates the tags given by a source, one at a time.
+
+    If the source is a file object, opened either in text or binary
+    mode, it is read line by line, so only a single line is kept in
+    memory at a time.  Binary lines are decoded as UTF-8, and line
+    terminators are removed.  Any other iterable is considered to
+    yield the tags as strings and is returned untouched.
+    """
+    if not hasattr(source, 'read'):
+        return iter(source)
+    return (decode_line(line) for line in source)
+
+def decode_line(line: Union[str, bytes]) -> str:
+    """Decodes a line read from a file and removes its terminator."""
+    if isinstance(line, (bytes, bytearray)):
+        line = line.decode('utf-8', 'replace')
+    return line.rstrip('\r\n')
+
+def parse_many(source: Iterable[str], errors: str='raise',
+               cache=None, registry=None, start: int=1) -> Iterator:
+    """Parses many tag URIs, yielding the results as they are parsed.
+
+    This is a generator, so no intermediate list is ever built.  The
+    source can be any iterable of strings, or a file object opened in
+    text or binary mode, in which case every line is considered a tag.
+
+    Args:
+        source: an iterable of tag URIs, or a file object.
+        errors (str): what to do when a tag is not valid.  Use `raise`
+            to raise the AttributeError, `skip` to silently ignore the
+            tag, or `record` to yield an ErrorRecord in its place.
+        cache (:obj:`EntityCache`, optional): if given, the cache used
+            to validate the tagging entities.
+        registry (:obj:`OwnershipRegistry`, optional): if given, tags
+            whose tagging entity is not legitimate are invalid too.
+        start (int): the line number of the first tag, for when the
+            source is a part of a larger input.
+
+    Yields:
+        ParsedTag: the parsed tag for each valid tag; or an ErrorRecord
+            for each invalid tag if the error policy is `record`.
+
+    Raises:
+        AttributeError: if a tag is not valid and the error policy is
+            `raise`.
+        ValueError: if the given error policy is not known.
+
+    Example:
+        >>> tags = ['tag:example.com,2018:Books', 'tag:example.com:Books']
+        >>> for result in parse_many(tags, errors='record'):
+        ...     print(repr(result))
+        ParsedTag('tag:example.com,2018:Books')
+        ErrorRecord(lineno=2, value='tag:example.com:Books', reason='Invalid tag_uri: invalid tagging entity')
+    """
+    check_error_policy(errors)
+    return _parse_many(iter_lines(source), errors, cache, start, registry)
+
+def _parse_many(tags: Iterator[str], errors: str, cache,
+                start: int=1, registry=None) -> Iterator:
+    # Invalid tags are common in bulk, so nothing is raised unless asked.
+    for lineno, tag in enumerate(tags, start=start):
+        if registry is None:
+            result = scan_tag(tag, cache)
+        else:
+            result = scan_owned_tag(tag, cache, registry)
+        if type(result) is tuple:
+            yield ParsedTag(tag, *result)
+            continue
+        if type(result) is TagError:
+            message = result.message
+        else:
+            message = f'Invalid tag_uri: {result}'
+        if errors == 'raise':
+            raise AttributeError(message)
+        if errors == 'record':
+            yield ErrorRecord(lineno, tag, message)
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Optional
+from .grammar import tagging_entity_error
+
+class CacheInfo(NamedTuple):
+    """Statistics about the usage of an EntityCache."""
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+class EntityCache:
+    """Bounded LRU cache of validated tagging entities.
+
+    Most workloads use a handful of tagging entities for a lot of tags.
+    When a cache is given to the parsers or the minter, the result of
+    validating each tagging entity is remembered, so the authority name
+    and the date are only validated the first time that the tagging
+    entity is seen.  Invalid tagging entities are remembered too, so a
+    flood of malformed tags stays cheap to reject.
+
+    When the cache is full, the least recently used tagging entity is
+    evicted.
+
+    Caches can be shared between threads.  The entities and the
+    statistics are updated under a lock, but tagging entities are
+    validated outside of it, so threads only wait for each other for
+    the few dict operations of each lookup.
+
+    Args:
+        maxsize (int): how many tagging entities to remember at most.
+
+    Raises:
+        ValueError: if the given maxsize is not a positive number.
+
+    Example:
+        >>> from taguri import TagUriParser
+        >>> cache = EntityCache(maxsize=128)
+        >>> parser = TagUriParser('tag:example.com,2018:Books', cache=cache)
+        >>> parser = TagUriParser('tag:example.com,2018:Films', cache=cache)
+        >>> cache.info()
+        CacheInfo(hits=1, misses=1, evictions=0, maxsize=128, currsize=1)
+    """
+
+    def __init__(self, maxsize: int=1024):
+        if maxsize < 1:
+            raise ValueError(f'Invalid maxsize: {maxsize}')
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__lock = Lock()
+
+    @property
+    def maxsize(self) -> int:
+        """int: How many tagging entities can be remembered at most."""
+        return self.__maxsize
+
+    def check(self, tagging_entity: str) -> Optional[str]:
+        """Validates a tagging entity, using the cached result if any.
+
+        Args:
+            tagging_entity (str): the tagging entity to validate.
+
+        Returns:
+            str: the invalid part of the tagging entity, as returned by
+                `tagging_entity_error`, or None if it is valid.
+        """
+        entries = self.__entries
+        with self.__lock:
+            try:
+                reason = entries[tagging_entity]
+            except KeyError:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                entries.move_to_end(tagging_entity)
+                return reason
+        reason = tagging_entity_error(tagging_entity)
+        with self.__lock:
+            entries[tagging_entity] = reason
+            if len(entries) > self.__maxsize:
+                entries.popitem(last=False)
+                self.__evictions += 1
+        return reason
+
+    def info(self) -> CacheInfo:
+        """Returns the statistics about the usage of this cache."""
+        with self.__lock:
+            return CacheInfo(
+                self.__hits,
+                self.__misses,
+                self.__evictions,
+                self.__maxsize,
+                len(self.__entries),
+            )
+
+    def clear(self):
+        """Forgets every tagging entity and resets the statistics."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, tagging_entity: str) -> bool:
+        return tagging_entity in self.__entries
@@ -0,0 +1,101 @@
+import re
+import string
+from .grammar import tag_offsets
+
+PCT_ENCODED_RE = re.compile(r"%([0-9a-fA-F]{2})")
+# Characters that never need to be pct-encoded, as per RFC 3986.
+UNRESERVED = frozenset(string.ascii_letters + string.digits + '-._~')
+
+def canonicalize(tag_uri: str) -> str:
+    """Returns the canonical form of a tag URI.
+
+    RFC 4151 says that two tags are equal only if they are equal
+    character by character.  However, tags that are not equal may still
+    have been meant to be the same tag by whoever minted them.  The
+    canonical form makes these tags equal, so it can be used as a key
+    to deduplicate them:
+
+        o The DNS name of the authority name is lowercased, because DNS
+          names are case insensitive.  The user part of an e-mail
+          address is kept as is.
+
+        o Pct-encoded tokens of the specific and fragment are written
+          using uppercase hexchars, and pct-encoded characters that do
+          not need to be encoded are decoded, as RFC 3986 recommends
+          when normalizing URIs.
+
+    Tags already in canonical form are returned as they are, without
+    making any copy.
+
+    Args:
+        tag_uri (str): the tag URI.
+
+    Returns:
+        str: the canonical form of the tag URI.
+
+    Raises:
+        AttributeError: if the given tag URI is not valid.
+
+    Example:
+        >>> canonicalize('tag:John@Example.COM,2018:hello%7eworld%2f')
+        'tag:John@example.com,2018:hello~world%2F'
+    """
+    comma, colon, _ = tag_offsets(tag_uri)
+    return canonical_form(tag_uri, comma, colon)
+
+def canonical_form(tag_uri: str, comma: int, colon: int) -> str:
+    """Returns the canonical form of an already parsed tag URI.
+
+    Args:
+        tag_uri (str): the valid tag URI.
+        comma (int): offset of the comma in the tagging entity.
+        colon (int): offset of the colon before the specific part.
+
+    Returns:
+        str: the canonical form of the tag URI.
+    """
+    user, at, dns_name = tag_uri[4:comma].rpartition('@')
+    canonical_dns_name = dns_name.lower()
+    specific = tag_uri[colon:]
+    rest = specific
+    if '%' in specific:
+        rest = PCT_ENCODED_RE.sub(_normalize_pct_encoded, specific)
+    if canonical_dns_name == dns_name and rest == specific:
+        return tag_uri
+    return f'tag:{user}{at}{canonical_dns_name}{tag_uri[comma:colon]}{rest}'
+
+def _normalize_pct_encoded(match) -> str:
+    char = chr(int(match.group(1), 16))
+    if char in UNRESERVED:
+        return char
+    return match.group().upper()
+
+def tags_equal(first: str, second: str, lenient: bool=False) -> bool:
+    """Tests whether two tag URIs are equal.
+
+    Args:
+        first (str): a tag URI.
+        second (str): another tag URI.
+        lenient (bool): if False, tags are compared character by
+            character, as RFC 4151 says.  If True, their canonical
+            forms are compared instead.
+
+    Returns:
+        bool: True if both tags are equal, otherwise False.
+
+    Raises:
+        AttributeError: if lenient and a tag URI is not valid.
+
+    Examples:
+        >>> tags_equal('tag:Example.com,2018:a%2f', 'tag:example.com,2018:a%2F')
+        False
+
+        >>> tags_equal('tag:Example.com,2018:a%2f', 'tag:example.com,2018:a%2F',
+        ...            lenient=True)
+        True
+    """
+    if first == second:
+        return True
+    if not lenient:
+        return False
+    return canonicalize(first) == canonicalize(second)
@@ -0,0 +1,211 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from .bulk import ErrorRecord, decode_line, parse_many
+from .cache import EntityCache
+
+# How many chunks each worker process gets, to balance the load.
+CHUNKS_PER_JOB = 4
+
+class ChunkReport(NamedTuple):
+    """The result of validating a range of lines of a file.
+
+    Attributes:
+        lines (int): how many lines were validated.
+        size (int): how many bytes were read.
+        invalid (int): how many lines were not valid.
+        errors_path (str): the file the invalid lines were written to,
+            as read by `read_errors`, or None if every line was valid.
+    """
+    lines: int
+    size: int
+    invalid: int
+    errors_path: Optional[str]
+
+def split_chunks(path: str, count: int) -> List[Tuple[int, int]]:
+    """Splits a file in byte ranges aligned to line boundaries.
+
+    Args:
+        path (str): the path to the file.
+        count (int): how many ranges to split the file in.  Fewer
+            ranges are returned if the file has fewer lines.
+
+    Returns:
+        list of (int, int): the offset of the first byte of each range
+            and the offset that comes after its last byte.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as source:
+        for chunk in range(1, count):
+            target = size * chunk // count
+            if target <= boundaries[-1]:
+                continue
+            # Move forward to the start of the next line.
+            source.seek(target - 1)
+            source.readline()
+            position = source.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+def read_lines(path: str, start: int, stop: int) -> Iterator[str]:
+    """Reads the lines of a range of a file, as given by split_chunks."""
+    with open(path, 'rb') as source:
+        source.seek(start)
+        position = start
+        while position < stop:
+            line = source.readline()
+            if not line:
+                break
+            position += len(line)
+            yield decode_line(line)
+
+def validate_chunk(path: str, start: int, stop: int,
+                   directory: Optional[str]=None) -> ChunkReport:
+    """Validates every line of a range of a file.
+
+    The invalid lines are written to a temporary file as they are
+    found, so memory does not grow with the number of invalid lines.
+    The caller must remove this file.
+
+    Args:
+        path (str): the path to the file.
+        start (int): the offset of the first byte of the range.
+        stop (int): the offset that comes after the end of the range.
+        directory (str, optional): where to write the invalid lines.
+            Defaults to the temporary directory of the system.
+
+    Returns:
+        ChunkReport: the number of lines and the invalid ones.
+    """
+    lines = invalid = 0
+    tags = parse_many(read_lines(path, start, stop), errors='record',
+                      cache=EntityCache())
+    # Values may have carriage returns, so newlines are not translated.
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='\n',
+                                     suffix='.errors', dir=directory,
+                                     delete=False) as errors:
+        for lines, result in enumerate(tags, start=1):
+            if isinstance(result, ErrorRecord):
+                invalid += 1
+                errors.write(f'{result.lineno}\t{result.reason}\t{result.value}\n')
+    if not invalid:
+        os.remove(errors.name)
+        return ChunkReport(lines, stop - start, 0, None)
+    return ChunkReport(lines, stop - start, invalid, errors.name)
+
+def read_errors(errors_path: str) -> Iterator[ErrorRecord]:
+    """Reads the invalid lines written by validate_chunk.
+
+    Args:
+        errors_path (str): the errors_path of a ChunkReport.
+
+    Yields:
+        ErrorRecord: each invalid line, numbered from the first line of
+            the chunk.
+    """
+    # Lines only end in line feeds, values may have carriage returns.
+    with open(errors_path, encoding='utf-8', newline='\n') as errors:
+        for line in errors:
+            # Reasons have no tabs, but values may have them.
+            lineno, reason, value = line[:-1].split('\t', 2)
+            yield ErrorRecord(int(lineno), value, reason)
+
+def validate(path: str, jobs: Optional[int]=None, output=None,
+             summary=None) -> int:
+    """Validates a file with a tag on each line, using many processes.
+
+    The file is split in byte ranges aligned to line boundaries, which
+    are validated in parallel by a pool of processes.  Every invalid
+    line is written to the output with its line number and the reason,
+    in the order they appear in the file.  Then, the aggregate counts
+    and the throughput are written to the summary.
+
+    Args:
+        path (str): the path to the file.
+        jobs (int, optional): how many processes to use.  Defaults to
+            the number of CPUs.
+        output: the file object to write the invalid lines to.
+            Defaults to the standard output.
+        summary: the file object to write the summary to.  Defaults
+            to the standard error.
+
+    Returns:
+        int: how many invalid lines were found.
+
+    Raises:
+        ValueError: if the number of processes is not positive.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    elif jobs < 1:
+        raise ValueError(f'Invalid jobs: {jobs}')
+    output = output or sys.stdout
+    summary = summary or sys.stderr
+    started = time.perf_counter()
+    chunks = split_chunks(path, jobs * CHUNKS_PER_JOB if jobs > 1 else 1)
+    # Workers write the invalid lines of each chunk here, and they are
+    # copied to the output in order, so they are never kept in memory.
+    directory = tempfile.TemporaryDirectory(prefix='taguri-')
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        reports = executor.map(validate_chunk, repeat(path), *zip(*chunks),
+                               repeat(directory.name)) if chunks else ()
+    else:
+        executor = None
+        reports = (validate_chunk(path, *chunk, directory.name) for chunk in chunks)
+
+    lines = size = invalid = 0
+    try:
+        for report in reports:
+            if report.errors_path is not None:
+                for error in read_errors(report.errors_path):
+                    print(f'{lines + error.lineno}: {error.reason}: {error.value}',
+                          file=output)
+                os.remove(report.errors_path)
+            lines += report.lines
+            size += report.size
+            invalid += report.invalid
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        directory.cleanup()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f'{lines} lines, {lines - invalid} valid, {invalid} invalid', file=summary)
+    print(f'{elapsed:.3f} s, {lines / elapsed:.0f} lines/s, '
+          f'{size / elapsed / 1e6:.1f} MB/s, {jobs} jobs', file=summary)
+    return invalid
+
+def positive_int(value: str) -> int:
+    """Parses a positive number given as a command line argument."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'invalid positive number: {value!r}')
+    return number
+
+def main(argv: Optional[List[str]]=None) -> int:
+    """Entry point of `python -m taguri`."""
+    parser = argparse.ArgumentParser(prog='python -m taguri',
+                                     description='Tag URI tools.')
+    commands = parser.add_subparsers(dest='command')
+    command = commands.add_parser(
+        'validate', help='validate a file with a tag URI on each line')
+    command.add_argument('path', help='the file to validate')
+    command.add_argument('-j', '--jobs', type=positive_int, default=None,
+                         help='how many processes to use (default: CPUs)')
+    arguments = parser.parse_args(argv)
+    if arguments.command != 'validate':
+        parser.print_usage(sys.stderr)
+        return 2
+    return 1 if validate(arguments.path, arguments.jobs) else 0
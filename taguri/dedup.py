@@ -0,0 +1,234 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+import zlib
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+from .tag import ParsedTag
+
+# How many new keys are kept in memory before writing them to disk.
+SPILL_BATCH_SIZE = 10000
+
+class BloomFilter:
+    """Probabilistic set of strings.
+
+    The filter tells for sure when a string was never added to it, and
+    may tell that a string was added when it was not with a given false
+    positive rate, provided no more strings than the given capacity are
+    added.  It needs about 1.44 * log2(1 / error_rate) bits per string.
+
+    Args:
+        capacity (int): how many strings are expected to be added.
+        error_rate (float): the acceptable rate of false positives.
+
+    Raises:
+        ValueError: if the capacity or the error rate are out of range.
+    """
+
+    def __init__(self, capacity: int, error_rate: float=0.001):
+        if capacity < 1:
+            raise ValueError(f'Invalid capacity: {capacity}')
+        if not 0 < error_rate < 1:
+            raise ValueError(f'Invalid error_rate: {error_rate}')
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.__bits = max(bits, 8)
+        self.__hashes = max(1, round(self.__bits / capacity * math.log(2)))
+        self.__array = bytearray((self.__bits + 7) // 8)
+
+    @property
+    def size(self) -> int:
+        """int: How many bits the filter uses."""
+        return self.__bits
+
+    def __positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        bits = self.__bits
+        for hash in range(self.__hashes):
+            yield (first + hash * second) % bits
+
+    def add(self, key: str) -> bool:
+        """Adds a string to the filter.
+
+        Returns:
+            bool: True if the string may have been added before, or
+                False if it was certainly not.
+        """
+        array = self.__array
+        seen = True
+        for position in self.__positions(key):
+            byte, bit = divmod(position, 8)
+            if not array[byte] >> bit & 1:
+                seen = False
+                array[byte] |= 1 << bit
+        return seen
+
+    def __contains__(self, key: str) -> bool:
+        array = self.__array
+        return all(array[position >> 3] >> (position & 7) & 1
+                   for position in self.__positions(key))
+
+class _Partition:
+    """A Bloom filter backed by an exact set of keys stored on disk."""
+
+    def __init__(self, path: str, capacity: int, error_rate: float):
+        self.filter = BloomFilter(capacity, error_rate)
+        self.pending = set()
+        self.database = sqlite3.connect(path)
+        self.database.execute('CREATE TABLE IF NOT EXISTS seen '
+                              '(key TEXT PRIMARY KEY) WITHOUT ROWID')
+        # Keys stored by a previous run have to be in the filter too.
+        for key, in self.database.execute('SELECT key FROM seen'):
+            self.filter.add(key)
+
+    def seen(self, key: str) -> bool:
+        row = self.database.execute('SELECT 1 FROM seen WHERE key = ?', (key,))
+        return row.fetchone() is not None
+
+    def spill(self):
+        with self.database:
+            self.database.executemany('INSERT OR IGNORE INTO seen VALUES (?)',
+                                      ((key,) for key in self.pending))
+        self.pending.clear()
+
+class DedupInfo(NamedTuple):
+    """Statistics about the work done by a Deduplicator."""
+    tags: int
+    duplicates: int
+    false_positives: int
+
+def partition_of(tag: ParsedTag, partitions: int, lenient: bool=False) -> int:
+    """Returns the partition of a tag, given by its tagging entity.
+
+    Tags with the same tagging entity always have the same partition, so
+    this can be used to send tags to different processes, each of them
+    running its own Deduplicator.  If lenient, the canonical form of the
+    tagging entity is used instead.
+    """
+    tagging_entity = tag.tagging_entity
+    if lenient:
+        # Canonical forms keep the length of the tagging entity.
+        tagging_entity = tag.canonical[4:4 + len(tagging_entity)]
+    return zlib.crc32(tagging_entity.encode('utf-8')) % partitions
+
+class Deduplicator:
+    """Streaming deduplication of tags with bounded memory.
+
+    Every tag is first checked against a Bloom filter, which tells for
+    sure when a tag was not seen before.  Only when the filter says
+    that the tag may have been seen, it is confirmed against the exact
+    set of seen tags, which is spilled to disk in SQLite databases.
+
+    Tags are split in partitions by their tagging entity, each one with
+    its own filter and database, so that memory is bounded by the
+    capacity of each partition.
+
+    Args:
+        capacity (int): how many distinct tags each partition is
+            expected to hold.
+        error_rate (float): the rate of false positives of the filters.
+            Every false positive costs a lookup on disk.
+        partitions (int): how many partitions to split tags in.
+        directory (str, optional): where to store the databases.  If
+            not given, a temporary directory is used and removed when
+            the deduplicator is closed.  Otherwise, the tags seen by a
+            previous deduplicator using the same directory are kept.
+        lenient (bool): if True, tags are compared using their
+            canonical form instead of character by character.
+
+    Example:
+        >>> with Deduplicator(capacity=1000) as deduplicator:
+        ...     list(deduplicator.unique(['tag:a,2018:x', 'tag:a,2018:x',
+        ...                               'tag:A,2018:x']))
+        [ParsedTag('tag:a,2018:x'), ParsedTag('tag:A,2018:x')]
+    """
+
+    def __init__(self, capacity: int, error_rate: float=0.001,
+                 partitions: int=1, directory: Optional[str]=None,
+                 lenient: bool=False):
+        if partitions < 1:
+            raise ValueError(f'Invalid partitions: {partitions}')
+        # Fail early if the filter parameters are not valid.
+        BloomFilter(capacity, error_rate)
+        self.__capacity = capacity
+        self.__error_rate = error_rate
+        self.__lenient = lenient
+        self.__temporary = None
+        if directory is None:
+            self.__temporary = tempfile.TemporaryDirectory()
+            directory = self.__temporary.name
+        self.__directory = directory
+        self.__partitions = [None] * partitions
+        self.__tags = 0
+        self.__duplicates = 0
+        self.__false_positives = 0
+
+    def add(self, tag: Union[str, ParsedTag]) -> bool:
+        """Adds a tag to the set of seen tags.
+
+        Args:
+            tag (str or ParsedTag): the tag to add.
+
+        Returns:
+            bool: True if the tag was not seen before, otherwise False.
+
+        Raises:
+            AttributeError: if the given tag is not valid.
+        """
+        if not isinstance(tag, ParsedTag):
+            tag = ParsedTag.parse(tag)
+        key = tag.canonical if self.__lenient else tag.tag
+        partition = self.__partition(
+            partition_of(tag, len(self.__partitions), self.__lenient))
+        self.__tags += 1
+        if partition.filter.add(key):
+            if key in partition.pending or partition.seen(key):
+                self.__duplicates += 1
+                return False
+            self.__false_positives += 1
+        partition.pending.add(key)
+        if len(partition.pending) >= SPILL_BATCH_SIZE:
+            partition.spill()
+        return True
+
+    def unique(self, tags: Iterable[Union[str, ParsedTag]]) -> Iterator[ParsedTag]:
+        """Yields the tags that were not seen before, as they come.
+
+        Raises:
+            AttributeError: if a given tag is not valid.
+        """
+        for tag in tags:
+            if not isinstance(tag, ParsedTag):
+                tag = ParsedTag.parse(tag)
+            if self.add(tag):
+                yield tag
+
+    def info(self) -> DedupInfo:
+        """Returns the statistics about the work done."""
+        return DedupInfo(self.__tags, self.__duplicates, self.__false_positives)
+
+    def close(self):
+        """Writes the pending tags to disk and closes the databases."""
+        for partition in self.__partitions:
+            if partition is not None:
+                partition.spill()
+                partition.database.close()
+        self.__partitions = [None] * len(self.__partitions)
+        if self.__temporary is not None:
+            self.__temporary.cleanup()
+
+    def __partition(self, number: int) -> _Partition:
+        partition = self.__partitions[number]
+        if partition is None:
+            path = os.path.join(self.__directory, f'seen-{number}.sqlite3')
+            partition = _Partition(path, self.__capacity, self.__error_rate)
+            self.__partitions[number] = partition
+        return partition
+
+    def __enter__(self) -> 'Deduplicator':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
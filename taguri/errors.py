@@ -0,0 +1,52 @@
+from enum import IntEnum
+from typing import NamedTuple
+
+class ErrorCode(IntEnum):
+    """The reasons why a tag URI, or a part of it, is not valid.
+
+    The codes are listed in the order the parts of a tag are checked,
+    so when a tag has many errors, the one reported is the first one.
+    """
+    MISSES_PARTS = 1
+    INVALID_PREFIX = 2
+    INVALID_TAGGING_ENTITY = 3
+    INVALID_AUTHORITY_NAME = 4
+    INVALID_DATE = 5
+    TOO_MANY_FRAGMENTS = 6
+    INVALID_FRAGMENT = 7
+    INVALID_SPECIFIC = 8
+
+    @property
+    def description(self) -> str:
+        """str: The error in words, such as `invalid date`."""
+        return self.name.lower().replace('_', ' ')
+
+    @property
+    def reason(self) -> str:
+        """str: A short identifier of the error, such as `date`."""
+        name = self.name.lower()
+        if name.startswith('invalid_'):
+            return name[len('invalid_'):]
+        return name
+
+    @property
+    def message(self) -> str:
+        """str: The message of the AttributeError raised by the parser."""
+        return f'Invalid tag_uri: {self.description}'
+
+class TagError(NamedTuple):
+    """An error found when validating a tag URI.
+
+    Attributes:
+        code (ErrorCode): what is wrong.
+        offset (int): the position in the tag of the first character
+            that could not be accepted.  When a part of the tag is
+            missing, this is where the part was expected.
+    """
+    code: ErrorCode
+    offset: int
+
+    @property
+    def message(self) -> str:
+        """str: The message of the AttributeError raised by the parser."""
+        return self.code.message
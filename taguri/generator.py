@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from itertools import count
+from typing import Iterator, Tuple
+from .minter import TagUriMinter
+from .validator import specific_validator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# The width of the numbers stored by BlockAllocator.
+STATE_WIDTH = 20
+
+class IdGenerator(ABC):
+    """Base class for the generators of unique tags.
+
+    Generators mint tags whose specific part is made of a fixed prefix
+    followed by a generated identifier, such as
+    `tag:example.com,2018:Books/1234`.  The prefix is validated once,
+    and the generated identifiers are always valid, so minting a tag
+    only costs formatting a string.
+
+    Generators are iterators, and they are safe to share between
+    threads.  Subclasses implement `next_id`.
+
+    Args:
+        minter (TagUriMinter): the minter with the tagging entity.
+        prefix (str): the start of the specific part of every tag.
+
+    Raises:
+        AttributeError: if the given prefix is not a valid specific.
+    """
+
+    def __init__(self, minter: TagUriMinter, prefix: str=''):
+        if not specific_validator(prefix):
+            raise AttributeError(f'Invalid specific: {prefix}')
+        self.__minter = minter
+        self.__prefix = f'{minter.prefix}:{prefix}'
+
+    @property
+    def minter(self) -> TagUriMinter:
+        """TagUriMinter: The minter with the tagging entity."""
+        return self.__minter
+
+    @abstractmethod
+    def next_id(self) -> str:
+        """Returns a new identifier, never returned before."""
+
+    def mint(self) -> str:
+        """Mints a new unique tag.
+
+        Returns:
+            str: the tag, made of the prefix and a new identifier.
+        """
+        return self.__prefix + self.next_id()
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        return self.__prefix + self.next_id()
+
+class SequenceIdGenerator(IdGenerator):
+    """Generator of tags using a monotonic counter.
+
+    The counter is only advanced under a lock, so threads can share the
+    generator on free-threaded builds too, where `itertools.count` is
+    not atomic.
+
+    Args:
+        minter (TagUriMinter): the minter with the tagging entity.
+        prefix (str): the start of the specific part of every tag.
+        start (int): the first number of the sequence.
+
+    Example:
+        >>> minter = TagUriMinter('example.com', '2018')
+        >>> books = SequenceIdGenerator(minter, 'Books/', start=1)
+        >>> books.mint()
+        'tag:example.com,2018:Books/1'
+        >>> next(books)
+        'tag:example.com,2018:Books/2'
+    """
+
+    def __init__(self, minter: TagUriMinter, prefix: str='', start: int=0):
+        super().__init__(minter, prefix)
+        self.__counter = count(start)
+        self.__lock = threading.Lock()
+
+    def next_id(self) -> str:
+        with self.__lock:
+            number = next(self.__counter)
+        return str(number)
+
+class TimeOrderedIdGenerator(IdGenerator):
+    """Generator of tags using time-ordered identifiers.
+
+    Identifiers are made of the current time in milliseconds, a node
+    number and a counter, as fixed-width hexadecimal numbers, so they
+    sort by the time they were generated at.  Give a different node
+    number to each process minting tags under the same prefix to keep
+    identifiers unique between processes.
+
+    Identifiers generated in the same millisecond are sorted by the
+    counter; if the system clock goes backwards, so do identifiers.
+
+    Args:
+        minter (TagUriMinter): the minter with the tagging entity.
+        prefix (str): the start of the specific part of every tag.
+        node (int): a number between 0 and 65535 identifying the
+            process that generates the identifiers.
+
+    Raises:
+        ValueError: if the node number is out of range.
+
+    Example:
+        >>> minter = TagUriMinter('example.com', '2018')
+        >>> events = TimeOrderedIdGenerator(minter, 'Events/', node=7)
+        >>> events.mint()  # doctest: +SKIP
+        'tag:example.com,2018:Events/0167a2b3c4d5-0007-00000000'
+    """
+
+    def __init__(self, minter: TagUriMinter, prefix: str='', node: int=0):
+        if not 0 <= node <= 0xffff:
+            raise ValueError(f'Invalid node: {node}')
+        super().__init__(minter, prefix)
+        self.__node = f'{node:04x}'
+        self.__counter = count()
+        self.__lock = threading.Lock()
+
+    def next_id(self) -> str:
+        with self.__lock:
+            sequence = next(self.__counter) & 0xffffffff
+        milliseconds = time.time_ns() // 1000000
+        return f'{milliseconds:012x}-{self.__node}-{sequence:08x}'
+
+class BlockAllocator:
+    """Reserves blocks of numbers shared by several processes.
+
+    The next free number is kept in a local file.  Reserving a block
+    locks the file, reads the number, and stores the number that comes
+    after the block, so every process that uses the same file gets
+    different blocks.  The file is created if it does not exist.
+
+    The number is overwritten in place, and always with the same width,
+    so if a process dies while writing it, the file keeps a number that
+    is not below the one it had: blocks are never handed out twice.
+
+    Note:
+        File locking relies on `fcntl`, so this class is only
+        available on POSIX systems.
+
+    Args:
+        path (str): the path to the file with the next free number.
+        block_size (int): how many numbers to reserve at once.
+        start (int): the first number, if the file does not exist yet.
+
+    Raises:
+        RuntimeError: if file locking is not available.
+        ValueError: if the block size is not a positive number.
+    """
+
+    def __init__(self, path: str, block_size: int=1000, start: int=0):
+        if fcntl is None:
+            raise RuntimeError('BlockAllocator requires fcntl')
+        if block_size < 1:
+            raise ValueError(f'Invalid block_size: {block_size}')
+        self.__path = path
+        self.__block_size = block_size
+        self.__start = start
+
+    @property
+    def block_size(self) -> int:
+        """int: How many numbers are reserved at once."""
+        return self.__block_size
+
+    def reserve(self) -> Tuple[int, int]:
+        """Reserves a new block of numbers.
+
+        Returns:
+            (int, int): the first number of the block, and the number
+                that comes after the last number of the block.
+        """
+        descriptor = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(descriptor, 'r+b') as state:
+            fcntl.flock(state, fcntl.LOCK_EX)
+            data = state.read().strip()
+            start = int(data) if data else self.__start
+            stop = start + self.__block_size
+            # Truncating before writing would leave the file empty if
+            # the write was interrupted.
+            state.seek(0)
+            state.write(f'{stop:0{STATE_WIDTH}d}'.encode('ascii'))
+            state.flush()
+            state.truncate()
+            os.fsync(state.fileno())
+        return start, stop
+
+class BlockIdGenerator(IdGenerator):
+    """Generator of tags using numbers from reserved blocks.
+
+    Numbers are taken from a block reserved through a BlockAllocator.
+    Taking a number only takes a lock of this generator; the file lock
+    is only taken to reserve a new block once the current one is
+    exhausted.  Processes
+    sharing the allocator file mint unique tags without coordinating
+    for every tag, although numbers are only increasing inside a
+    block, not between processes.
+
+    Args:
+        minter (TagUriMinter): the minter with the tagging entity.
+        allocator (BlockAllocator): the allocator that reserves blocks.
+        prefix (str): the start of the specific part of every tag.
+
+    Example:
+        >>> minter = TagUriMinter('example.com', '2018')
+        >>> allocator = BlockAllocator('/var/lib/app/books.seq', 10000)
+        >>> books = BlockIdGenerator(minter, allocator, 'Books/')
+        >>> books.mint()  # doctest: +SKIP
+        'tag:example.com,2018:Books/30000'
+    """
+
+    def __init__(self, minter: TagUriMinter, allocator: BlockAllocator,
+                 prefix: str=''):
+        super().__init__(minter, prefix)
+        self.__allocator = allocator
+        self.__lock = threading.Lock()
+        self.__block = iter(())
+
+    def next_id(self) -> str:
+        # Range iterators are not atomic on free-threaded builds.
+        with self.__lock:
+            number = next(self.__block, None)
+            if number is None:
+                self.__block = iter(range(*self.__allocator.reserve()))
+                number = next(self.__block)
+        return str(number)
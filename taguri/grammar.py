@@ -0,0 +1,412 @@
+import re
+import time
+from typing import Callable, Optional, Tuple, Union
+from .errors import ErrorCode, TagError
+from .instrumentation import state as _instrumentation
+from .validator import (
+    authority_name_validator,
+    date_validator,
+    days_in_month,
+    specific_validator,
+)
+
+# Building blocks of the RFC 4151 grammar.  These patterns only accept
+# the ASCII subset of the language that the validators accept.  The
+# DNS component is written as alnum runs separated by dashes so that
+# the pattern can never backtrack catastrophically.
+DNSCOMP = r"[a-zA-Z0-9]+(?:-+[a-zA-Z0-9]+)*"
+DNSNAME = DNSCOMP + r"(?:\." + DNSCOMP + r")*"
+AUTHORITY_NAME = r"(?:[0-9a-zA-Z\.\-\_\+]+@)?" + DNSNAME
+DATE = r"[0-9]{4}(?:-(?:0[1-9]|1[0-2])(?:-(?:0[1-9]|[12][0-9]|3[01]))?)?"
+PCHARS = r"[0-9a-zA-Z/?:@\-._~!$&'()*+,;=]"
+SPECIFIC = PCHARS + r"*(?:%[0-9a-fA-F]{2}" + PCHARS + r"*)*"
+
+SPECIFIC_RE = re.compile(
+    r"(?P<specific>" + SPECIFIC + r")(?:#(?P<fragment>" + SPECIFIC + r"))?"
+)
+AUTHORITY_NAME_RE = re.compile(AUTHORITY_NAME)
+DATE_PATTERN_RE = re.compile(DATE)
+SPECIFIC_PART_RE = re.compile(SPECIFIC)
+# The structure of a tag, with any content in its components.
+STRUCTURE_RE = re.compile(r"tag:[^:,]*(,)[^:,]*(:)[^#]*(#[^#]*)?")
+TAG_URI_RE = re.compile(
+    r"tag:(?P<authority_name>" + AUTHORITY_NAME + r")"
+    r",(?P<date>" + DATE + r")"
+    r":(?P<specific>" + SPECIFIC + r")"
+    r"(?:#(?P<fragment>" + SPECIFIC + r"))?"
+)
+
+def tag_offsets(tag_uri: str, cache=None) -> Tuple[int, int, int]:
+    """Parses a tag URI and returns the offsets of its components.
+
+    This is `scan_tag`, raising an error for invalid tags.
+
+    Args:
+        tag_uri (str): the tag URI to parse.
+        cache (:obj:`EntityCache`, optional): cache of validated
+            tagging entities to use.
+
+    Returns:
+        (int, int, int): the offsets of the comma, the colon and the
+            fragment separator.
+
+    Raises:
+        AttributeError: if the given tag URI is not valid, using the
+            same messages that TagUriParser raises.
+
+    Example:
+        >>> tag_offsets('tag:example.com,2018:Books#Doe')
+        (15, 20, 26)
+    """
+    result = scan_tag(tag_uri, cache)
+    if type(result) is TagError:
+        raise AttributeError(result.message)
+    return result
+
+def scan_tag(tag_uri: str, cache=None) -> Union[Tuple[int, int, int], TagError]:
+    """Parses a tag URI and returns the offsets of its components.
+
+    The whole tag is matched in a single left-to-right scan using one
+    compiled regular expression covering the RFC 4151 grammar.  Tags
+    that do not match it (either because they are invalid, or because
+    they use one of the rare forms that the validators accept but the
+    compiled grammar does not cover) are handed over to the step by
+    step parser, which decides whether the tag is valid and which
+    error message to raise.
+
+    If an EntityCache is given, the tagging entity is looked up in the
+    cache instead, and only the specific part and fragment are matched.
+
+    If some Instrumentation is installed, it is told about every parsed
+    or rejected tag.
+
+    The returned offsets are the position of the comma that separates
+    the authority name from the date, the position of the colon that
+    separates the tagging entity from the specific, and the position
+    of the `#` that starts the fragment.  If the tag has no fragment,
+    the last offset equals to the length of the tag.
+
+    Args:
+        tag_uri (str): the tag URI to parse.
+        cache (:obj:`EntityCache`, optional): cache of validated
+            tagging entities to use.
+
+    Returns:
+        (int, int, int): the offsets of the comma, the colon and the
+            fragment separator if the tag is valid; otherwise, the
+            TagError that tells what is wrong and where.  Nothing is
+            raised, so this is cheap for invalid tags.
+
+    Examples:
+        >>> scan_tag('tag:example.com,2018:Books#Doe')
+        (15, 20, 26)
+
+        >>> scan_tag('tag:example.com,2018:Books')
+        (15, 20, 26)
+
+        >>> scan_tag('tag:example.com,2018:Books#')
+        (15, 20, 26)
+
+        >>> scan_tag('tag:example.com,2018-02-30:Books')
+        TagError(code=<ErrorCode.INVALID_DATE: 5>, offset=24)
+    """
+    hooks = _instrumentation.hooks
+    if hooks is not None:
+        result = _instrumented_scan(tag_uri, cache, hooks)
+        if type(result) is TagError:
+            hooks.rejected(result.code.reason)
+        else:
+            hooks.parsed()
+        return result
+    if cache is not None:
+        return _cached_scan(tag_uri, cache)
+    match = TAG_URI_RE.fullmatch(tag_uri)
+    if match and calendar_date(tag_uri, match.start('date'), match.end('date')):
+        return match.end('authority_name'), match.end('date'), match.end('specific')
+    return _parse_step_by_step(tag_uri)
+
+def _instrumented_scan(tag_uri: str, cache, hooks) -> Union[Tuple[int, int, int], TagError]:
+    if hooks.timings:
+        # Stages can only be timed one after the other.
+        result = _parse_step_by_step(tag_uri, hooks)
+    elif cache is not None:
+        result = _cached_scan(tag_uri, cache)
+    else:
+        match = TAG_URI_RE.fullmatch(tag_uri)
+        if match and calendar_date(tag_uri, match.start('date'),
+                                   match.end('date')):
+            result = (match.end('authority_name'), match.end('date'),
+                      match.end('specific'))
+        else:
+            result = _parse_step_by_step(tag_uri)
+    return result
+
+def scan_owned_tag(tag_uri: str, cache, registry) -> Union[Tuple[int, int, int], TagError, str]:
+    """Parses a tag URI like `scan_tag`, also checking its ownership.
+
+    If some Instrumentation is installed, tags whose tagging entity is
+    not legitimate are told as rejected, not as parsed.
+
+    Args:
+        tag_uri (str): the tag URI to parse.
+        cache (:obj:`EntityCache`, optional): cache of validated
+            tagging entities to use.
+        registry (:obj:`OwnershipRegistry`): the registry that tells
+            whether the tagging entity is legitimate.
+
+    Returns:
+        (int, int, int): the offsets of the components if the tag is
+            valid and legitimate; otherwise, the TagError if it is not
+            valid, or why it is not legitimate, as returned by the
+            `check` method of the registry.
+    """
+    hooks = _instrumentation.hooks
+    if hooks is None:
+        result = scan_tag(tag_uri, cache)
+    else:
+        result = _instrumented_scan(tag_uri, cache, hooks)
+    if type(result) is TagError:
+        if hooks is not None:
+            hooks.rejected(result.code.reason)
+        return result
+    comma, colon, _ = result
+    reason = registry.check(tag_uri[4:comma], tag_uri[comma + 1:colon])
+    if hooks is not None:
+        # The tag is only parsed once its ownership is checked too.
+        if reason is None:
+            hooks.parsed()
+        else:
+            hooks.rejected(reason.replace(' ', '_'))
+    return result if reason is None else reason
+
+def tagging_entity_error(tagging_entity: str, hooks=None) -> Optional[str]:
+    """Tells which part of a tagging entity is not valid.
+
+    Args:
+        tagging_entity (str): the tagging entity to validate, that is,
+            the authority name and the date separated by a comma.
+        hooks (:obj:`Instrumentation`, optional): if given, told how
+            long the validation of each part took.
+
+    Returns:
+        str: `tagging entity` if the tagging entity cannot be split in
+            an authority name and a date, `authority name` or `date` if
+            either of them is not valid, or None if it is valid.
+
+    Examples:
+        >>> tagging_entity_error('example.com,2018') is None
+        True
+
+        >>> tagging_entity_error('example.com,2018-13')
+        'date'
+    """
+    # We can do this because commas are not allowed here.
+    entity_tokens = tagging_entity.split(',')
+    if len(entity_tokens) != 2:
+        return 'tagging entity'
+    authority_name, date = entity_tokens
+    if not _stage(hooks, 'authority_name', authority_name_validator,
+                  authority_name):
+        return 'authority name'
+    if not _stage(hooks, 'date', date_validator, date):
+        return 'date'
+    return None
+
+def _stage(hooks, stage: str, validator: Callable[[str], bool],
+           value: str) -> bool:
+    # Runs a validator, timing it if hooks are given.
+    if hooks is None:
+        return validator(value)
+    started = time.perf_counter()
+    valid = validator(value)
+    hooks.timed(stage, time.perf_counter() - started)
+    return valid
+
+def _cached_scan(tag_uri: str, cache) -> Union[Tuple[int, int, int], TagError]:
+    colon = tag_uri.find(':', 4)
+    if colon < 0 or not tag_uri.startswith('tag:'):
+        # Let the slow path tell whether parts or the prefix is missing.
+        return _parse_step_by_step(tag_uri)
+    reason = cache.check(tag_uri[4:colon])
+    if reason is not None:
+        return _entity_error(tag_uri, reason, colon)
+    comma = tag_uri.index(',', 4)
+    match = SPECIFIC_RE.fullmatch(tag_uri, colon + 1)
+    if match:
+        return comma, colon, match.end('specific')
+    hash = _specific_step_by_step(tag_uri, colon)
+    if type(hash) is TagError:
+        return hash
+    return comma, colon, hash
+
+def calendar_date(tag_uri: str, start: int, end: int) -> bool:
+    """Tests whether a date matched by the compiled grammar exists.
+
+    The grammar already checks the shape of the date, but not whether
+    the year is 0000 or the day exists in the given month.  A tag that
+    matches the grammar is valid if this test passes.
+
+    Args:
+        tag_uri (str): the matched tag URI.
+        start (int): the offset where the date starts.
+        end (int): the offset where the date ends.
+
+    Returns:
+        bool: True if the date exists, otherwise False.
+    """
+    if tag_uri.startswith('0000', start):
+        return False
+    if end - start < 10:
+        return True
+    day = int(tag_uri[end - 2:end])
+    if day <= 28:
+        return True
+    year = int(tag_uri[start:start + 4])
+    month = int(tag_uri[start + 5:start + 7])
+    return day <= days_in_month(year, month)
+
+def split_tag(tag_uri: str) -> Tuple[int, int, int]:
+    """Splits a tag URI in its components, without validating them.
+
+    Only the structure of the tag is checked: the prefix, the separators
+    between the components, and that there is at most one fragment.
+    Whether the authority name, the date, the specific and the fragment
+    are valid is left to the caller.
+
+    Args:
+        tag_uri (str): the tag URI to split.
+
+    Returns:
+        (int, int, int): the offsets of the comma, the colon and the
+            fragment separator, like `tag_offsets`.
+
+    Raises:
+        AttributeError: if the tag URI cannot be split, using the same
+            messages that TagUriParser raises.
+
+    Example:
+        >>> split_tag('tag:not a domain,9999-99:Books#Doe')
+        (16, 24, 30)
+    """
+    match = STRUCTURE_RE.fullmatch(tag_uri)
+    if match:
+        if match.start(3) < 0:
+            return match.start(1), match.start(2), len(tag_uri)
+        return match.start(1), match.start(2), match.start(3)
+
+    # Find out what is wrong, in the order the step by step parser does.
+    first = tag_uri.find(':')
+    colon = tag_uri.find(':', first + 1)
+    if first < 0 or colon < 0:
+        raise AttributeError('Invalid tag_uri: misses parts')
+    if first != 3 or not tag_uri.startswith('tag'):
+        raise AttributeError('Invalid tag_uri: invalid prefix')
+    comma = tag_uri.find(',', 4, colon)
+    if comma < 0 or tag_uri.find(',', comma + 1, colon) >= 0:
+        raise AttributeError('Invalid tag_uri: invalid tagging entity')
+    hash = tag_uri.find('#', colon + 1)
+    if hash < 0:
+        return comma, colon, len(tag_uri)
+    if tag_uri.find('#', hash + 1) >= 0:
+        raise AttributeError('Invalid tag_uri: too many fragments')
+    return comma, colon, hash
+
+def valid_authority_name(authority_name: str) -> bool:
+    """Tests whether an authority name is valid, trying the grammar first."""
+    return bool(AUTHORITY_NAME_RE.fullmatch(authority_name)
+                or authority_name_validator(authority_name))
+
+def valid_date(date: str) -> bool:
+    """Tests whether a date is valid, trying the grammar first."""
+    if DATE_PATTERN_RE.fullmatch(date):
+        return calendar_date(date, 0, len(date))
+    return date_validator(date)
+
+def valid_specific(specific: str) -> bool:
+    """Tests whether a specific or fragment is valid, trying the grammar first."""
+    return bool(SPECIFIC_PART_RE.fullmatch(specific)
+                or specific_validator(specific))
+
+def _parse_step_by_step(tag_uri: str, hooks=None) -> Union[Tuple[int, int, int], TagError]:
+    # Slow path.  Applies every validator one after the other in the
+    # same order TagUriParser always did, so the reported errors stay
+    # the same for every invalid tag.  Hooks are told the timings.
+    tokens = tag_uri.split(':', maxsplit=2)
+    if len(tokens) != 3:
+        return TagError(ErrorCode.MISSES_PARTS, len(tag_uri))
+
+    prefix, tagging_entity, specific = tokens
+    if prefix != 'tag':
+        # This is not a tag unless the prefix is given.
+        return TagError(ErrorCode.INVALID_PREFIX, 0)
+
+    colon = len(prefix) + 1 + len(tagging_entity)
+    reason = tagging_entity_error(tagging_entity, hooks)
+    if reason is not None:
+        return _entity_error(tag_uri, reason, colon)
+
+    comma = len(prefix) + 1 + tagging_entity.index(',')
+    hash = _specific_step_by_step(tag_uri, colon, hooks)
+    if type(hash) is TagError:
+        return hash
+    return comma, colon, hash
+
+def _specific_step_by_step(tag_uri: str, colon: int, hooks=None) -> Union[int, TagError]:
+    # Validates the specific and fragment after the given colon, and
+    # returns the offset of the fragment separator.
+    hash = tag_uri.find('#', colon + 1)
+    if hash < 0:
+        hash = len(tag_uri)
+    else:
+        # Extract and validate the fragment.
+        extra = tag_uri.find('#', hash + 1)
+        if extra >= 0:
+            return TagError(ErrorCode.TOO_MANY_FRAGMENTS, extra)
+        if not _stage(hooks, 'fragment', specific_validator, tag_uri[hash + 1:]):
+            return TagError(ErrorCode.INVALID_FRAGMENT,
+                            _first_invalid(tag_uri, SPECIFIC_PART_RE,
+                                           hash + 1, len(tag_uri)))
+
+    # Validate specific.
+    if not _stage(hooks, 'specific', specific_validator, tag_uri[colon + 1:hash]):
+        return TagError(ErrorCode.INVALID_SPECIFIC,
+                        _first_invalid(tag_uri, SPECIFIC_PART_RE, colon + 1, hash))
+    return hash
+
+def _entity_error(tag_uri: str, reason: str, colon: int) -> TagError:
+    # Builds the error for the invalid tagging entity before the colon,
+    # given the reason returned by tagging_entity_error.
+    comma = tag_uri.find(',', 4, colon)
+    if reason == 'tagging entity':
+        if comma < 0:
+            return TagError(ErrorCode.INVALID_TAGGING_ENTITY, colon)
+        return TagError(ErrorCode.INVALID_TAGGING_ENTITY,
+                        tag_uri.find(',', comma + 1, colon))
+    if reason == 'authority name':
+        return TagError(ErrorCode.INVALID_AUTHORITY_NAME,
+                        _first_invalid(tag_uri, AUTHORITY_NAME_RE, 4, comma))
+    offset = _first_invalid(tag_uri, DATE_PATTERN_RE, comma + 1, colon)
+    if offset == comma + 1 and colon - offset == 10 and \
+            not tag_uri.startswith('0000', offset):
+        # The date is well formed, but the day does not exist.
+        offset = colon - 2
+    return TagError(ErrorCode.INVALID_DATE, offset)
+
+def first_invalid_offset(value: str) -> int:
+    """Returns the offset of the first character not allowed in a specific.
+
+    Args:
+        value (str): a specific part or fragment that is not valid.
+
+    Returns:
+        int: the offset in the value where it stops being valid.
+    """
+    return _first_invalid(value, SPECIFIC_PART_RE, 0, len(value))
+
+def _first_invalid(tag_uri: str, pattern, start: int, end: int) -> int:
+    # The end of the longest valid start of the part between the given
+    # offsets, or its start if the whole part matches but is invalid.
+    match = pattern.match(tag_uri, start, end)
+    if match is None or match.end() == end:
+        return start
+    return match.end()
@@ -0,0 +1,257 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Union
+from .tag import ParsedTag
+from .validator import DatePrecision, TagDate, days_in_month, parse_date
+
+# Greater than any character allowed in a tag, to build range bounds.
+MAX_CHAR = '\U0010ffff'
+
+class _TrieNode:
+    """A node of the trie of specific parts, one per path segment."""
+
+    __slots__ = ('children', 'tags')
+
+    def __init__(self):
+        self.children = {}
+        self.tags = set()
+
+class TagIndex:
+    """In-memory index of parsed tags.
+
+    Tags can be looked up by authority name and by tagging entity using
+    hash indexes, by date ranges using a sorted index, and by the start
+    of their specific part using a trie of path segments split at `/`.
+    Tags can be added and removed at any time.  New dates are sorted
+    into the date index by the next query that needs it, so adding many
+    tags in a row costs a single sort.
+
+    Args:
+        tags (:obj:`iterable`, optional): tags to add to the index, as
+            strings or ParsedTag.
+
+    Raises:
+        AttributeError: if any given tag is not valid.
+
+    Example:
+        >>> index = TagIndex(['tag:example.com,2018:Books/1',
+        ...                   'tag:example.com,2019-05:Books/2',
+        ...                   'tag:example.org,2018:Films/1'])
+        >>> sorted(str(tag) for tag in index.by_authority_name('example.com'))
+        ['tag:example.com,2018:Books/1', 'tag:example.com,2019-05:Books/2']
+        >>> sorted(str(tag) for tag in index.by_date('2018', '2018'))
+        ['tag:example.com,2018:Books/1', 'tag:example.org,2018:Films/1']
+        >>> [str(tag) for tag in index.by_specific_prefix('Films/')]
+        ['tag:example.org,2018:Films/1']
+    """
+
+    def __init__(self, tags=()):
+        self.__tags = set()
+        self.__authority_names = {}
+        self.__tagging_entities = {}
+        self.__dates = []
+        self.__dates_sorted = True
+        self.__trie = _TrieNode()
+        for tag in tags:
+            self.add(tag)
+
+    def add(self, tag: Union[str, ParsedTag]) -> ParsedTag:
+        """Adds a tag to the index, unless it is already indexed.
+
+        Args:
+            tag (str or ParsedTag): the tag to add.
+
+        Returns:
+            ParsedTag: the indexed tag.
+
+        Raises:
+            AttributeError: if the given tag is not valid.
+        """
+        if not isinstance(tag, ParsedTag):
+            tag = ParsedTag.parse(tag)
+        if tag in self.__tags:
+            return tag
+        self.__tags.add(tag)
+        self.__authority_names.setdefault(tag.authority_name, set()).add(tag)
+        self.__tagging_entities.setdefault(tag.tagging_entity, set()).add(tag)
+        self.__dates.append((tag.date_value, tag.tag, tag))
+        self.__dates_sorted = False
+        node = self.__trie
+        for segment in tag.specific.split('/'):
+            node = node.children.setdefault(segment, _TrieNode())
+        node.tags.add(tag)
+        return tag
+
+    def discard(self, tag: Union[str, ParsedTag]):
+        """Removes a tag from the index, if it is indexed.
+
+        Args:
+            tag (str or ParsedTag): the tag to remove.
+        """
+        if not isinstance(tag, ParsedTag):
+            try:
+                tag = ParsedTag.parse(tag)
+            except AttributeError:
+                return
+        if tag not in self.__tags:
+            return
+        self.__tags.remove(tag)
+        _discard_from(self.__authority_names, tag.authority_name, tag)
+        _discard_from(self.__tagging_entities, tag.tagging_entity, tag)
+        dates = self.__sorted_dates()
+        del dates[bisect_left(dates, (tag.date_value, tag.tag))]
+
+        # Remove the tag from the trie, pruning the nodes left empty.
+        path = [self.__trie]
+        segments = tag.specific.split('/')
+        for segment in segments:
+            path.append(path[-1].children[segment])
+        path[-1].tags.discard(tag)
+        for segment, node, parent in zip(reversed(segments),
+                                         reversed(path), reversed(path[:-1])):
+            if node.tags or node.children:
+                break
+            del parent.children[segment]
+
+    def by_authority_name(self, authority_name: str) -> FrozenSet[ParsedTag]:
+        """Returns the tags of the given authority name."""
+        return frozenset(self.__authority_names.get(authority_name, ()))
+
+    def by_tagging_entity(self, tagging_entity: str) -> FrozenSet[ParsedTag]:
+        """Returns the tags of the given tagging entity."""
+        return frozenset(self.__tagging_entities.get(tagging_entity, ()))
+
+    def by_date(self, since: Optional[str]=None,
+                until: Optional[str]=None) -> List[ParsedTag]:
+        """Returns the tags whose date is in the given range.
+
+        Both ends of the range are included, and are given as tag dates
+        of any precision.  An end covers every date it contains, so the
+        range from 2018 until 2018 returns every tag dated 2018,
+        2018-11, or 2018-11-26.
+
+        Args:
+            since (str, optional): the start of the range.  If not
+                given, the range has no start.
+            until (str, optional): the end of the range.  If not given,
+                the range has no end.
+
+        Returns:
+            list of ParsedTag: the tags, sorted by date.
+
+        Raises:
+            AttributeError: if a given date is not valid.
+        """
+        dates = self.__sorted_dates()
+        start = 0
+        stop = len(dates)
+        if since is not None:
+            start = bisect_left(dates, (_first_day(_parse_date(since)),))
+        if until is not None:
+            last = _last_day(_parse_date(until))
+            stop = bisect_right(dates, (last, MAX_CHAR))
+        return [tag for _, _, tag in dates[start:stop]]
+
+    def by_specific_prefix(self, prefix: str) -> Set[ParsedTag]:
+        """Returns the tags whose specific part starts with a prefix.
+
+        Args:
+            prefix (str): the start of the specific parts to look for.
+
+        Returns:
+            set of ParsedTag: the tags whose specific starts with it.
+        """
+        *segments, partial = prefix.split('/')
+        node = self.__trie
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                return set()
+        found = set()
+        pending = [child for segment, child in node.children.items()
+                   if segment.startswith(partial)]
+        while pending:
+            node = pending.pop()
+            found.update(node.tags)
+            pending.extend(node.children.values())
+        return found
+
+    def search(self, authority_name: Optional[str]=None,
+               since: Optional[str]=None, until: Optional[str]=None,
+               specific_prefix: Optional[str]=None) -> Set[ParsedTag]:
+        """Returns the tags that match every given condition.
+
+        For example, every tag minted by example.com during 2018 under
+        Collections/Books is found by searching for the authority name
+        `example.com`, since `2018` until `2018`, and the specific
+        prefix `Collections/Books/`.
+
+        Args:
+            authority_name (str, optional): the authority name.
+            since (str, optional): the start of the date range.
+            until (str, optional): the end of the date range.
+            specific_prefix (str, optional): the start of the specific.
+
+        Returns:
+            set of ParsedTag: the tags that match.
+
+        Raises:
+            AttributeError: if a given date is not valid.
+        """
+        candidates = []
+        if authority_name is not None:
+            candidates.append(self.__authority_names.get(authority_name, set()))
+        if since is not None or until is not None:
+            candidates.append(set(self.by_date(since, until)))
+        if specific_prefix is not None:
+            candidates.append(self.by_specific_prefix(specific_prefix))
+        if not candidates:
+            return set(self.__tags)
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:])
+
+    def __sorted_dates(self) -> list:
+        # The dates appended since the last sort are sorted at once.
+        # Tag strings are unique, so parsed tags are never compared.
+        if not self.__dates_sorted:
+            self.__dates.sort()
+            self.__dates_sorted = True
+        return self.__dates
+
+    def __len__(self) -> int:
+        return len(self.__tags)
+
+    def __contains__(self, tag) -> bool:
+        if isinstance(tag, str):
+            try:
+                tag = ParsedTag.parse(tag)
+            except AttributeError:
+                return False
+        return tag in self.__tags
+
+    def __iter__(self) -> Iterator[ParsedTag]:
+        return iter(self.__tags)
+
+def _discard_from(index: Dict[str, Set[ParsedTag]], key: str, tag: ParsedTag):
+    tags = index[key]
+    tags.discard(tag)
+    if not tags:
+        del index[key]
+
+def _parse_date(date: str) -> TagDate:
+    parsed = parse_date(date)
+    if parsed is None:
+        raise AttributeError(f'Invalid date: {date}')
+    return parsed
+
+def _first_day(date: TagDate) -> TagDate:
+    # The smallest date sorting within the given date.
+    return TagDate(date.year, date.month, date.day, DatePrecision.YEAR)
+
+def _last_day(date: TagDate) -> TagDate:
+    # The greatest date sorting within the given date.
+    if date.precision == DatePrecision.YEAR:
+        return TagDate(date.year, 12, 31, DatePrecision.DAY)
+    if date.precision == DatePrecision.MONTH:
+        day = days_in_month(date.year, date.month)
+        return TagDate(date.year, date.month, day, DatePrecision.DAY)
+    return date
@@ -0,0 +1,222 @@
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+from .errors import ErrorCode
+from .ownership import FUTURE_DATE, UNKNOWN_AUTHORITY_NAME, UNOWNED_AUTHORITY_NAME
+
+# The reason of every rejection, by the message of the raised error.
+REJECTION_REASONS = {code.message: code.reason for code in ErrorCode}
+REJECTION_REASONS.update(
+    (f'Invalid tag_uri: {reason}', reason.replace(' ', '_'))
+    for reason in (FUTURE_DATE, UNOWNED_AUTHORITY_NAME, UNKNOWN_AUTHORITY_NAME)
+)
+# The validation stages that can be timed.
+STAGES = ('authority_name', 'date', 'specific', 'fragment')
+# Upper bounds of the buckets of the timing histograms, in seconds.
+DEFAULT_BUCKETS = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 1e-4, 1e-3)
+
+class Instrumentation:
+    """Hooks called by the parser, to observe what it does.
+
+    Subclass it and override the hooks you need.  Instrumentation is
+    disabled until an instance is installed using `set_instrumentation`
+    or `instrumented`, and when disabled the parser only pays for a
+    single attribute lookup per tag.
+
+    Attributes:
+        timings (bool): if True, tags are validated one stage after the
+            other and every stage is timed.  This is slower than the
+            single pass over the compiled grammar done otherwise, and
+            no EntityCache is used, so it should be enabled only when
+            timings are needed.
+    """
+
+    timings = False
+
+    def parsed(self):
+        """Called when a tag is parsed successfully."""
+
+    def rejected(self, reason: str):
+        """Called when a tag is rejected.
+
+        Args:
+            reason (str): one of the values of REJECTION_REASONS.
+        """
+
+    def timed(self, stage: str, seconds: float):
+        """Called after a validation stage, if timings are enabled.
+
+        Args:
+            stage (str): one of STAGES.
+            seconds (float): how long the stage took.
+        """
+
+class Histogram(NamedTuple):
+    """Distribution of the timings of a validation stage.
+
+    Attributes:
+        buckets (tuple of (float, int)): the upper bound of each bucket
+            and how many timings were at most that long, cumulatively.
+            The last bucket is unbounded.
+        count (int): how many timings were recorded.
+        sum (float): the sum of the timings, in seconds.
+    """
+    buckets: Tuple[Tuple[float, int], ...]
+    count: int
+    sum: float
+
+class MetricsRecorder(Instrumentation):
+    """Instrumentation that records counters and timing histograms.
+
+    Counts the parsed tags and the rejected tags by reason and, if
+    timings are enabled, records the time taken by each validation
+    stage in histograms.  Recording is thread-safe.  The recorded
+    metrics can be read using `snapshot`, or sent to any metrics
+    system using `export`.
+
+    Args:
+        timings (bool): whether to time each validation stage.
+        buckets (tuple of float): the upper bounds of the histogram
+            buckets, in seconds, sorted.
+
+    Example:
+        >>> from taguri import parse_many
+        >>> recorder = MetricsRecorder()
+        >>> with instrumented(recorder):
+        ...     tags = list(parse_many(['tag:example.com,2018:a',
+        ...                             'tag:example.com,2018-13:a'], 'skip'))
+        >>> recorder.parsed_count, recorder.rejections()
+        (1, {'date': 1})
+    """
+
+    def __init__(self, timings: bool=False, buckets=DEFAULT_BUCKETS):
+        self.timings = timings
+        self.__bounds = tuple(buckets)
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forgets every recorded metric."""
+        with self.__lock:
+            self.__parsed = 0
+            self.__rejected = {}
+            self.__counts = {stage: [0] * (len(self.__bounds) + 1)
+                             for stage in STAGES}
+            self.__sums = dict.fromkeys(STAGES, 0.0)
+
+    def parsed(self):
+        with self.__lock:
+            self.__parsed += 1
+
+    def rejected(self, reason: str):
+        with self.__lock:
+            self.__rejected[reason] = self.__rejected.get(reason, 0) + 1
+
+    def timed(self, stage: str, seconds: float):
+        bucket = bisect_left(self.__bounds, seconds)
+        with self.__lock:
+            self.__counts[stage][bucket] += 1
+            self.__sums[stage] += seconds
+
+    @property
+    def parsed_count(self) -> int:
+        """int: How many tags were parsed successfully."""
+        return self.__parsed
+
+    def rejections(self) -> Dict[str, int]:
+        """Returns how many tags were rejected, by reason."""
+        with self.__lock:
+            return dict(self.__rejected)
+
+    def histogram(self, stage: str) -> Histogram:
+        """Returns the histogram of the timings of a validation stage."""
+        with self.__lock:
+            counts = list(self.__counts[stage])
+            total = self.__sums[stage]
+        cumulative = []
+        seen = 0
+        for bound, count in zip(self.__bounds + (float('inf'),), counts):
+            seen += count
+            cumulative.append((bound, seen))
+        return Histogram(tuple(cumulative), seen, total)
+
+    def snapshot(self) -> Dict:
+        """Returns every recorded metric in a dict."""
+        return {
+            'parsed': self.parsed_count,
+            'rejected': self.rejections(),
+            'stages': {stage: self.histogram(stage) for stage in STAGES}
+                      if self.timings else {},
+        }
+
+    def export(self, emit: Callable[[str, float, Dict[str, str]], None],
+               prefix: str='taguri'):
+        """Sends every recorded metric to a metrics system.
+
+        The metrics follow the Prometheus conventions, so they map
+        directly onto Prometheus, StatsD or OpenTelemetry clients:
+
+            o `<prefix>_parsed_total`: the count of parsed tags.
+            o `<prefix>_rejected_total`: the count of rejected tags,
+              labelled by `reason`.
+            o `<prefix>_stage_seconds_bucket`, `_sum` and `_count`: the
+              histogram of each stage, labelled by `stage` and, for
+              buckets, by their upper bound `le`.
+
+        Args:
+            emit (callable): called with the name, the value and the
+                labels of every metric.
+            prefix (str): the prefix of the metric names.
+        """
+        emit(f'{prefix}_parsed_total', self.parsed_count, {})
+        for reason, count in sorted(self.rejections().items()):
+            emit(f'{prefix}_rejected_total', count, {'reason': reason})
+        if not self.timings:
+            return
+        for stage in STAGES:
+            histogram = self.histogram(stage)
+            for bound, count in histogram.buckets:
+                emit(f'{prefix}_stage_seconds_bucket', count,
+                     {'stage': stage, 'le': _format_bound(bound)})
+            emit(f'{prefix}_stage_seconds_sum', histogram.sum, {'stage': stage})
+            emit(f'{prefix}_stage_seconds_count', histogram.count, {'stage': stage})
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+class _State:
+    __slots__ = ('hooks',)
+
+    def __init__(self):
+        self.hooks = None
+
+# The installed instrumentation, looked up by the parser on every tag.
+state = _State()
+
+def get_instrumentation() -> Optional[Instrumentation]:
+    """Returns the installed instrumentation, or None if disabled."""
+    return state.hooks
+
+def set_instrumentation(hooks: Optional[Instrumentation]) -> Optional[Instrumentation]:
+    """Installs the instrumentation used by every parser.
+
+    Args:
+        hooks (Instrumentation, optional): the hooks to call, or None
+            to disable instrumentation.
+
+    Returns:
+        Instrumentation: the previously installed hooks, if any.
+    """
+    previous = state.hooks
+    state.hooks = hooks
+    return previous
+
+@contextmanager
+def instrumented(hooks: Instrumentation) -> Iterator[Instrumentation]:
+    """Installs some instrumentation while the context is active."""
+    previous = set_instrumentation(hooks)
+    try:
+        yield hooks
+    finally:
+        set_instrumentation(previous)
@@ -1,10 +1,22 @@
 import unittest
+from itertools import islice, repeat, zip_longest
+from typing import Iterable, Iterator, Optional
+from taguri.bulk import ErrorRecord, check_error_policy
+from taguri.errors import ErrorCode, TagError
+from taguri.grammar import first_invalid_offset
+from taguri.template import TagTemplate
 from taguri.validator import (
     authority_name_validator,
     date_validator,
     specific_validator,
+    validate_specifics,
 )
 
+# How many tags are validated together by mint_many.
+MINT_BATCH_SIZE = 1024
+# Pads the shorter of the specifics and fragments given to mint_many.
+_MISSING = object()
+
 class TagUriMinter:
     """Minter to build tag URIs.
 
@@ -33,6 +45,9 @@ class TagUriMinter:
             to see appropiate authority names.
         date (str): Date to set the tagging entity part of the tag to.
             It has to be a date compliant with RFC 3339 (or ISO 8601).
+        cache (:obj:`EntityCache`, optional): if given, the tagging
+            entity is validated using this cache, so that creating many
+            minters for the same tagging entity only validates it once.
     
     Raises:
         AttributeError: if the given authority name or date cannot be
@@ -42,18 +57,25 @@ class TagUriMinter:
             the RFC.
     """
 
-    def __init__(self, authority_name: str, date: str):
-        if not authority_name_validator(authority_name):
-            # The authority name is not valid.
-            raise AttributeError(f'Invalid authority name: {authority_name}')
-        else:
-            self.__authority_name = authority_name
-        
-        if not date_validator(date):
-            # The date is not valid.
-            raise AttributeError(f'Invalid date: {date}')
+    def __init__(self, authority_name: str, date: str, cache=None):
+        if cache is not None and ',' not in authority_name + date:
+            reason = cache.check(f'{authority_name},{date}')
+            if reason == 'authority name':
+                raise AttributeError(f'Invalid authority name: {authority_name}')
+            if reason == 'date':
+                raise AttributeError(f'Invalid date: {date}')
         else:
-            self.__date = date
+            if not authority_name_validator(authority_name):
+                # The authority name is not valid.
+                raise AttributeError(f'Invalid authority name: {authority_name}')
+            if not date_validator(date):
+                # The date is not valid.
+                raise AttributeError(f'Invalid date: {date}')
+
+        self.__authority_name = authority_name
+        self.__date = date
+        # Built once, since every minted tag starts with it.
+        self.__prefix = f'tag:{authority_name},{date}'
     
     @property
     def authority_name(self) -> str:
@@ -101,7 +123,7 @@ class TagUriMinter:
             >>> minter.prefix
             'tag:alice.example.com,2018-11-26'
         """
-        return f"tag:{self.authority_name},{self.date}"
+        return self.__prefix
     
     def mint(self, specific: str, fragment: str=None) -> str:
         """
@@ -134,11 +156,148 @@ class TagUriMinter:
             >>> minter.mint('Collections/Books', 'Doe')
             'tag:alice.example.com,2018-11:Collections/Books#Doe'
         """
-        if not specific_validator(specific):
-            raise AttributeError(f'Invalid specific: {specific}')
+        error = self.check(specific, fragment)
+        if error is not None:
+            value = specific if error.code == ErrorCode.INVALID_SPECIFIC else fragment
+            raise AttributeError(f'{error.code.description.capitalize()}: {value}')
         if fragment:
-            if not specific_validator(fragment):
-                raise AttributeError(f'Invalid fragment: {fragment}')
-            return f'{self.prefix}:{specific}#{fragment}'
+            return f'{self.__prefix}:{specific}#{fragment}'
         else:
-            return f'{self.prefix}:{specific}'
\ No newline at end of file
+            return f'{self.__prefix}:{specific}'
+
+    def check(self, specific: str, fragment: str=None) -> Optional[TagError]:
+        """
+        Validates a specific and fragment as `mint` does, without raising.
+
+        Args:
+            specific (str): the specific part of the tag to use.
+            fragment (obj:`str`, optional): if given, the fragment part
+                of the tag.
+
+        Returns:
+            TagError: why the tag cannot be minted, or None if it can.
+                The offset points into the tag that would be minted.
+
+        Example:
+            >>> minter = TagUriMinter('alice.example.com', '2018-11')
+            >>> minter.check('Collections Books')
+            TagError(code=<ErrorCode.INVALID_SPECIFIC: 8>, offset=41)
+        """
+        start = len(self.__prefix) + 1
+        if not specific_validator(specific):
+            return TagError(ErrorCode.INVALID_SPECIFIC,
+                            start + first_invalid_offset(specific))
+        if fragment and not specific_validator(fragment):
+            return TagError(ErrorCode.INVALID_FRAGMENT,
+                            start + len(specific) + 1 + first_invalid_offset(fragment))
+        return None
+
+    def template(self, template: str) -> TagTemplate:
+        """
+        Compiles a template of the specific part and fragment of tags.
+
+        The template is validated once, and only the values of its
+        fields are checked when minting each tag.  See TagTemplate.
+
+        Args:
+            template (str): the specific part of the tags, and optionally
+                their fragment, with a field such as `{id:int}` for every
+                part that changes.
+
+        Returns:
+            TagTemplate: the compiled template, which mints tags when
+                called with the values of its fields.
+
+        Raises:
+            AttributeError: if a literal part of the template is not a
+                valid specific or fragment.
+            ValueError: if the template or a field is not well formed.
+
+        Example:
+            >>> minter = TagUriMinter('alice.example.com', '2018-11')
+            >>> books = minter.template('Books/{id:int}')
+            >>> books(1984)
+            'tag:alice.example.com,2018-11:Books/1984'
+        """
+        return TagTemplate(self, template)
+
+    def mint_many(self, specifics: Iterable[str],
+                  fragments: Optional[Iterable[str]]=None,
+                  errors: str='raise') -> Iterator:
+        """
+        Mints a new tag URI for each given specific and fragment.
+
+        This is the streaming version of `mint`.  The input is consumed
+        and validated in batches, and the tags are yielded one by one,
+        so any number of tags can be minted using constant memory.
+
+        Args:
+            specifics (iterable of str): the specific parts of the tags.
+            fragments (:obj:`iterable of str`, optional): if given, the
+                fragment for each specific, in the same order.  Empty
+                or None fragments are not appended, like in `mint`.
+                There must be as many fragments as specifics.
+            errors (str): what to do when a specific or fragment is not
+                valid.  Use `raise` to raise the AttributeError, `skip`
+                to silently ignore it, or `record` to yield an
+                ErrorRecord with the position and the rejected value.
+
+        Yields:
+            str: the built tags, or ErrorRecord for every rejected input
+                if the error policy is `record`.
+
+        Raises:
+            AttributeError: if a specific or fragment is not valid and
+                the error policy is `raise`.  The tags of the inputs
+                that came before are yielded before raising.
+            ValueError: if the given error policy is not known, or if
+                there are more specifics than fragments or the other way
+                around.  The tags of the inputs that came before are
+                yielded before raising.
+
+        Example:
+            >>> minter = TagUriMinter('alice.example.com', '2018-11')
+            >>> list(minter.mint_many(['Books', 'Films'], ['Doe', None]))
+            ['tag:alice.example.com,2018-11:Books#Doe', 'tag:alice.example.com,2018-11:Films']
+        """
+        check_error_policy(errors)
+        if fragments is None:
+            return self.__mint_many(zip(specifics, repeat(None)), errors)
+        return self.__mint_many(zip_longest(specifics, fragments, fillvalue=_MISSING),
+                                errors)
+
+    def __mint_many(self, inputs, errors: str) -> Iterator:
+        prefix = self.__prefix
+        lineno = 0
+        while True:
+            batch = list(islice(inputs, MINT_BATCH_SIZE))
+            if not batch:
+                return
+            # Once the specifics or the fragments run out, only the
+            # other ones are left, so only the last input is checked.
+            mismatched = _MISSING in batch[-1]
+            if mismatched:
+                batch = [item for item in batch if _MISSING not in item]
+            specifics = [specific for specific, _ in batch]
+            fragments = [fragment for _, fragment in batch if fragment]
+            valid_specifics = validate_specifics(specifics)
+            valid_fragments = iter(validate_specifics(fragments))
+            for (specific, fragment), valid in zip(batch, valid_specifics):
+                lineno += 1
+                valid_fragment = next(valid_fragments) if fragment else True
+                if not valid:
+                    value, reason = specific, f'Invalid specific: {specific}'
+                elif not valid_fragment:
+                    value, reason = fragment, f'Invalid fragment: {fragment}'
+                elif fragment:
+                    yield f'{prefix}:{specific}#{fragment}'
+                    continue
+                else:
+                    yield f'{prefix}:{specific}'
+                    continue
+                if errors == 'raise':
+                    raise AttributeError(reason)
+                if errors == 'record':
+                    yield ErrorRecord(lineno, value, reason)
+            if mismatched:
+                raise ValueError('Different number of specifics and fragments')
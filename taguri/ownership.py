@@ -0,0 +1,222 @@
+import time
+from bisect import bisect_right
+from datetime import date as Date
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+from .validator import DatePrecision, days_in_month, parse_date
+
+# Ordinal of the first day of the Unix epoch, to get the UTC day.
+EPOCH_ORDINAL = Date(1970, 1, 1).toordinal()
+
+# Why a tagging entity is not legitimate.
+FUTURE_DATE = 'future date'
+UNOWNED_AUTHORITY_NAME = 'unowned authority name'
+UNKNOWN_AUTHORITY_NAME = 'unknown authority name'
+
+class OwnershipRegistry:
+    """Registry of the periods when each authority name was owned.
+
+    RFC 4151 says that a tagging entity is only legitimate if the
+    authority name was owned by whoever minted the tag at the given
+    date, and that dates in the future cannot be used.  The registry
+    knows the ownership periods of a set of authority names, and tells
+    whether a tagging entity is legitimate.
+
+    Tag dates stand for their first day, so `2014` is 2014-01-01.  The
+    periods of every authority name are merged and kept sorted, so each
+    check is a hash lookup plus a binary search, and millions of tags
+    can be checked quickly.  The DNS name of authority names is case
+    insensitive, as in `canonicalize`.
+
+    Args:
+        today (str or date, optional): the last date that is not in
+            the future, given as a tag date or a `datetime.date`.  If
+            not given, the current UTC day is used for every check.
+        strict (bool): if True, authority names with no periods are
+            not legitimate.  Otherwise, only their date is checked.
+
+    Raises:
+        AttributeError: if the given today is not a valid date.
+
+    Example:
+        >>> registry = OwnershipRegistry(today='2018-06-01')
+        >>> registry.add('alice.example.org', '2014-04-20')
+        >>> registry.check('alice.example.org', '2014-04') is None
+        False
+        >>> registry.check('alice.example.org', '2015') is None
+        True
+        >>> registry.check('hp.com', '2999')
+        'future date'
+    """
+
+    def __init__(self, today: Union[None, str, Date]=None, strict: bool=False):
+        if today is None or isinstance(today, Date):
+            self.__today = today and today.toordinal()
+        else:
+            self.__today = _first_ordinal(today)
+        self.__strict = strict
+        self.__periods = {}
+
+    @classmethod
+    def load(cls, path: str, today: Union[None, str, Date]=None,
+             strict: bool=False) -> 'OwnershipRegistry':
+        """Loads a registry from a local file.
+
+        Every line of the file has an authority name, the date when it
+        was first owned, and optionally the last date when it was still
+        owned, separated by spaces.  Empty lines and lines starting
+        with `#` are ignored.  For example:
+
+            # authority name   since       until
+            example.com        2001-05-01  2010-12
+            example.com        2015
+            alice@example.org  2018-11-26
+
+        Dates are tag dates.  A start stands for its first day, and an
+        end for its last day, so `2010-12` means until 2010-12-31.
+
+        Args:
+            path (str): the path to the file.
+            today (str or date, optional): see OwnershipRegistry.
+            strict (bool): see OwnershipRegistry.
+
+        Returns:
+            OwnershipRegistry: the registry with the loaded periods.
+
+        Raises:
+            ValueError: if a line of the file is not valid.
+        """
+        registry = cls(today, strict)
+        with open(path) as source:
+            for lineno, line in enumerate(source, start=1):
+                fields = line.split()
+                if not fields or fields[0].startswith('#'):
+                    continue
+                if len(fields) not in (2, 3):
+                    raise ValueError(f'Invalid period at line {lineno}: {line.strip()}')
+                try:
+                    registry.add(*fields)
+                except (AttributeError, ValueError) as error:
+                    raise ValueError(f'Invalid period at line {lineno}: {error}')
+        return registry
+
+    def add(self, authority_name: str, since: str, until: Optional[str]=None):
+        """Adds a period when an authority name was owned.
+
+        Periods that overlap or follow each other are merged.
+
+        Args:
+            authority_name (str): the authority name.
+            since (str): the first date when it was owned.
+            until (str, optional): the last date when it was still
+                owned.  If not given, it is still owned.
+
+        Raises:
+            AttributeError: if a given date is not valid.
+            ValueError: if the period ends before it starts.
+        """
+        start = _first_ordinal(since)
+        end = float('inf') if until is None else _last_ordinal(until)
+        if end < start:
+            raise ValueError(f'Invalid period: {since} until {until}')
+        starts, ends = self.__periods.setdefault(_key(authority_name), ([], []))
+
+        # Merge the period with every period it overlaps or touches.
+        first = bisect_right(ends, start - 2)
+        last = bisect_right(starts, end + 1)
+        if first < last:
+            start = min(start, starts[first])
+            end = max(end, ends[last - 1])
+        starts[first:last] = [start]
+        ends[first:last] = [end]
+
+    def periods(self, authority_name: str) -> List[Tuple[Date, Optional[Date]]]:
+        """Returns the periods when an authority name was owned.
+
+        Returns:
+            list of (date, date): the first and last day of every
+                period, sorted.  The last day is None if it is still
+                owned.
+        """
+        starts, ends = self.__periods.get(_key(authority_name), ((), ()))
+        return [(Date.fromordinal(start),
+                 None if end == float('inf') else Date.fromordinal(end))
+                for start, end in zip(starts, ends)]
+
+    def check(self, authority_name: str, date: str) -> Optional[str]:
+        """Tells whether a tagging entity is legitimate.
+
+        Args:
+            authority_name (str): the valid authority name of the tag.
+            date (str): the valid date of the tag.
+
+        Returns:
+            str: `future date` if the date is after today, `unowned
+                authority name` if the authority name was not owned at
+                the date, `unknown authority name` if the registry is
+                strict and has no periods for it, or None if the
+                tagging entity is legitimate.
+        """
+        day = _first_ordinal(date)
+        today = self.__today
+        if today is None:
+            today = int(time.time() // 86400) + EPOCH_ORDINAL
+        if day > today:
+            return FUTURE_DATE
+        periods = self.__periods.get(authority_name)
+        if periods is None:
+            periods = self.__periods.get(_key(authority_name))
+            if periods is None:
+                return UNKNOWN_AUTHORITY_NAME if self.__strict else None
+        starts, ends = periods
+        index = bisect_right(starts, day) - 1
+        if index < 0 or day > ends[index]:
+            return UNOWNED_AUTHORITY_NAME
+        return None
+
+    def validate(self, authority_name: str, date: str):
+        """Raises an error unless a tagging entity is legitimate.
+
+        Args:
+            authority_name (str): the valid authority name of the tag.
+            date (str): the valid date of the tag.
+
+        Raises:
+            AttributeError: if the tagging entity is not legitimate.
+                The message tells why, as returned by `check`.
+        """
+        reason = self.check(authority_name, date)
+        if reason is not None:
+            raise AttributeError(f'Invalid tag_uri: {reason}')
+
+    def __len__(self) -> int:
+        return len(self.__periods)
+
+    def __contains__(self, authority_name: str) -> bool:
+        return _key(authority_name) in self.__periods
+
+def _key(authority_name: str) -> str:
+    # The DNS name is case insensitive, the user of an e-mail address is not.
+    user, at, dns_name = authority_name.rpartition('@')
+    return user + at + dns_name.lower()
+
+@lru_cache(maxsize=4096)
+def _first_ordinal(date: str) -> int:
+    # The ordinal of the first day of a tag date.  Tags use a handful
+    # of dates, so these are cached.
+    parsed = parse_date(date)
+    if parsed is None:
+        raise AttributeError(f'Invalid date: {date}')
+    return Date(parsed.year, parsed.month, parsed.day).toordinal()
+
+def _last_ordinal(date: str) -> int:
+    # The ordinal of the last day of a tag date.
+    parsed = parse_date(date)
+    if parsed is None:
+        raise AttributeError(f'Invalid date: {date}')
+    if parsed.precision == DatePrecision.YEAR:
+        return Date(parsed.year, 12, 31).toordinal()
+    if parsed.precision == DatePrecision.MONTH:
+        day = days_in_month(parsed.year, parsed.month)
+        return Date(parsed.year, parsed.month, day).toordinal()
+    return Date(parsed.year, parsed.month, parsed.day).toordinal()
@@ -0,0 +1,168 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from .bulk import check_error_policy, iter_lines, parse_many
+from .errors import TagError
+from .grammar import scan_tag
+
+# How many tags each thread parses at a time.
+PARALLEL_CHUNK_SIZE = 2048
+# How many chunks per thread are parsed ahead of the consumer.
+CHUNKS_AHEAD = 2
+
+def free_threaded() -> bool:
+    """Tells whether Python threads run in parallel in this interpreter.
+
+    Returns:
+        bool: True on free-threaded builds of CPython with the GIL
+            disabled, False otherwise.
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+def default_threads() -> int:
+    """Returns how many threads the parallel parsers use by default.
+
+    Parsing is CPU bound, so threads only speed it up when they run in
+    parallel: this is the number of CPUs on free-threaded interpreters,
+    and 1 otherwise, which parses in the calling thread.
+    """
+    if free_threaded():
+        return os.cpu_count() or 1
+    return 1
+
+def parse_parallel(source: Iterable[str], errors: str='raise', cache=None,
+                   registry=None, threads: Optional[int]=None) -> Iterator:
+    """Parses many tag URIs using a pool of threads.
+
+    This is `parse_many` spread over threads.  The source is read in
+    chunks, which are parsed by the threads while the results of the
+    previous ones are yielded, in the same order as the source.  The
+    compiled grammar, the cache and the registry are shared by every
+    thread.  Only a few chunks are kept ahead of the consumer, so any
+    number of tags can be parsed using constant memory.
+
+    Args:
+        source: an iterable of tag URIs, or a file object.
+        errors (str): what to do when a tag is not valid, as in
+            `parse_many`.
+        cache (:obj:`EntityCache`, optional): if given, the cache used
+            to validate the tagging entities.
+        registry (:obj:`OwnershipRegistry`, optional): if given, tags
+            whose tagging entity is not legitimate are invalid too.  It
+            must not be changed while parsing.
+        threads (int, optional): how many threads to use.  Defaults to
+            `default_threads()`.  With a single thread, tags are parsed
+            in the calling thread.
+
+    Yields:
+        ParsedTag: the parsed tag for each valid tag; or an ErrorRecord
+            for each invalid tag if the error policy is `record`.
+
+    Raises:
+        AttributeError: if a tag is not valid and the error policy is
+            `raise`.  The results of the tags before it are yielded
+            first.
+        ValueError: if the given error policy or number of threads is
+            not valid.
+
+    Example:
+        >>> tags = ['tag:example.com,2018:Books', 'tag:example.com:Books']
+        >>> [str(tag) for tag in parse_parallel(tags, errors='skip', threads=2)]
+        ['tag:example.com,2018:Books']
+    """
+    check_error_policy(errors)
+    threads = _check_threads(threads)
+    tags = iter_lines(source)
+    if threads == 1:
+        return parse_many(tags, errors, cache, registry)
+    return _parse_parallel(tags, errors, cache, registry, threads)
+
+def check_parallel(tags: Sequence[str], cache=None,
+                   threads: Optional[int]=None) -> List[Optional[TagError]]:
+    """Validates many tag URIs using a pool of threads.
+
+    This is `check` for a whole batch of tags, spread over threads.
+
+    Args:
+        tags (list of str): the tag URIs to validate.
+        cache (:obj:`EntityCache`, optional): if given, the cache used
+            to validate the tagging entities.
+        threads (int, optional): how many threads to use.  Defaults to
+            `default_threads()`.
+
+    Returns:
+        list: the TagError of each tag, or None for the valid ones, in
+            the same order as the tags.
+
+    Raises:
+        ValueError: if the given number of threads is not valid.
+
+    Example:
+        >>> check_parallel(['tag:example.com,2018:a', 'tag:example.com,2018:a b'], threads=2)
+        [None, TagError(code=<ErrorCode.INVALID_SPECIFIC: 8>, offset=22)]
+    """
+    threads = _check_threads(threads)
+    if not isinstance(tags, (list, tuple)):
+        tags = list(tags)
+    if threads == 1:
+        return _check_chunk(tags, cache)
+    chunks = [tags[start:start + PARALLEL_CHUNK_SIZE]
+              for start in range(0, len(tags), PARALLEL_CHUNK_SIZE)]
+    errors = []
+    with ThreadPoolExecutor(threads) as executor:
+        for chunk_errors in executor.map(_check_chunk, chunks, [cache] * len(chunks)):
+            errors += chunk_errors
+    return errors
+
+def _check_threads(threads: Optional[int]) -> int:
+    if threads is None:
+        return default_threads()
+    if threads < 1:
+        raise ValueError(f'Invalid threads: {threads}')
+    return threads
+
+def _parse_parallel(tags: Iterator[str], errors: str, cache, registry,
+                    threads: int) -> Iterator:
+    executor = ThreadPoolExecutor(threads)
+    pending = deque()
+    start = 1
+    try:
+        while True:
+            while len(pending) < threads * CHUNKS_AHEAD:
+                chunk = list(islice(tags, PARALLEL_CHUNK_SIZE))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_parse_chunk, chunk, errors,
+                                               cache, start, registry))
+                start += len(chunk)
+            if not pending:
+                return
+            results, error = pending.popleft().result()
+            yield from results
+            if error is not None:
+                raise error
+    finally:
+        # The chunks after an error, or after the consumer stops, are
+        # not needed anymore.
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+
+def _parse_chunk(chunk: List[str], errors: str, cache, start: int,
+                 registry) -> Tuple[List, Optional[AttributeError]]:
+    # The results before an error are kept, to be yielded before it.
+    results = []
+    try:
+        for result in parse_many(chunk, errors, cache, registry, start):
+            results.append(result)
+    except AttributeError as error:
+        return results, error
+    return results, None
+
+def _check_chunk(tags: Sequence[str], cache) -> List[Optional[TagError]]:
+    results = [scan_tag(tag, cache) for tag in tags]
+    return [result if type(result) is TagError else None for result in results]
@@ -1,9 +1,32 @@
-from typing import Tuple
-from .validator import (
-    authority_name_validator,
-    date_validator,
-    specific_validator,
+from typing import Optional, Tuple
+from .errors import TagError
+from .grammar import (
+    scan_owned_tag,
+    split_tag,
+    valid_authority_name,
+    valid_date,
+    valid_specific,
 )
+from .tag import ParsedTag
+
+# The components of the tag that are still to be validated, as bits.
+AUTHORITY_NAME = 1
+DATE = 2
+SPECIFIC = 4
+FRAGMENT = 8
+ALL_COMPONENTS = AUTHORITY_NAME | DATE | SPECIFIC | FRAGMENT
+VALIDATORS = {
+    AUTHORITY_NAME: valid_authority_name,
+    DATE: valid_date,
+    SPECIFIC: valid_specific,
+    FRAGMENT: valid_specific,
+}
+NAMES = {
+    AUTHORITY_NAME: 'authority name',
+    DATE: 'date',
+    SPECIFIC: 'specific',
+    FRAGMENT: 'fragment',
+}
 
 class TagUriParser:
     """Parser used to parse tag URIs.
@@ -13,63 +36,115 @@ class TagUriParser:
     authority name, date, specific, and fragment part of the URI,
     and putting them in properties that can be accessed by Python code.
 
+    In lazy mode, the tag is only split in its components when the
+    parser is instantiated, and each component is validated the first
+    time it is accessed.  This is meant for tags that come from trusted
+    sources, where most components are never read.  Use `validate` to
+    validate the components that were not accessed yet.
+
     Args:
         tag_uri (str): the tag URI to parse.
+        cache (:obj:`EntityCache`, optional): if given, the tagging
+            entity is validated using this cache, so that tagging
+            entities that were seen before are not validated again.
+        lazy (bool): if True, defer the validation of each component
+            until it is accessed.
+        registry (:obj:`OwnershipRegistry`, optional): if given, the
+            tagging entity must also be legitimate according to it.  In
+            lazy mode, this is checked along with the date.
     
     Raises:
         AttributeError: if the given tag URI is not valid.  The message
         of the raised error will have more information about which part
-        of the tag was invalid.
+        of the tag was invalid.  In lazy mode, only errors in the
+        structure of the tag are raised here, and the errors of each
+        component are raised when it is accessed.
+
+    Example:
+        >>> parser = TagUriParser('tag:example.com,2018-13:Books', lazy=True)
+        >>> parser.specific
+        'Books'
+        >>> parser.date
+        Traceback (most recent call last):
+            ...
+        AttributeError: Invalid tag_uri: invalid date
     """
 
-    def __init__(self, tag_uri: str):
-        tokens = tag_uri.split(':', maxsplit=2)
-        if len(tokens) != 3:
-            raise AttributeError('Invalid tag_uri: misses parts')
+    __slots__ = ('__parsed', '__pending', '__cache', '__registry')
+
+    def __init__(self, tag_uri: str, cache=None, lazy: bool=False,
+                 registry=None):
+        if lazy:
+            self.__parsed = ParsedTag(tag_uri, *split_tag(tag_uri))
+            self.__pending = ALL_COMPONENTS
+        elif registry is None:
+            self.__parsed = ParsedTag.parse(tag_uri, cache)
+            self.__pending = 0
         else:
-            self.__tag = tag_uri
-        
-        prefix, tagging_entity, specific = tokens
-
-        if prefix != 'tag':
-            # This is not a tag unless the prefix is given.
-            raise AttributeError('Invalid tag_uri: invalid prefix')
-        
-        try:
-            # We can do this because commas are not allowed here.
-            authority_name, date = tagging_entity.split(',')
-
-            # Validates authority name.
-            if not authority_name_validator(authority_name):
-                raise AttributeError('Invalid tag_uri: invalid authority name')
-            self.__authority = authority_name
-
-            # Validates date.
-            if not date_validator(date):
-                raise AttributeError('Invalid tag_uri: invalid date')
-            self.__date = date
-        except ValueError:
-            # Raised by Python if tagging_entity.split cannot be destructured.
-            raise AttributeError('Invalid tag_uri: invalid tagging entity')
-        
-        # Extract and validate the fragment.
-        if '#' in specific:
-            try:
-                specific, fragment = specific.split('#')
-                if not specific_validator(fragment):
-                    raise AttributeError('Invalid tag_uri: invalid fragment')
-                self.__fragment = fragment
-            except ValueError:
-                # Raised if specific.split cannot be destructured.
-                raise AttributeError('Invalid tag_uri: too many fragments')
+            result = scan_owned_tag(tag_uri, cache, registry)
+            if type(result) is TagError:
+                raise AttributeError(result.message)
+            if type(result) is str:
+                raise AttributeError(f'Invalid tag_uri: {result}')
+            self.__parsed = ParsedTag(tag_uri, *result)
+            self.__pending = 0
+        self.__cache = cache if lazy else None
+        self.__registry = registry if lazy else None
+
+    def validate(self):
+        """Validates every component that was not validated yet.
+
+        This does nothing unless the parser is lazy.  Afterwards, the
+        parser gives the same guarantees as a parser that is not lazy.
+
+        Raises:
+            AttributeError: if a component of the tag is not valid.
+        """
+        if self.__pending:
+            self.__validate(ALL_COMPONENTS)
+
+    @property
+    def validated(self) -> bool:
+        """bool: Whether every component of the tag was validated."""
+        return not self.__pending
+
+    def __validate(self, components: int):
+        # Validates the given pending components, in the same order as
+        # the parser that is not lazy.
+        parsed = self.__parsed
+        if self.__pending & components & AUTHORITY_NAME:
+            self.__check(AUTHORITY_NAME, parsed.authority_name)
+        if self.__pending & components & DATE:
+            self.__check(DATE, parsed.date)
+        if self.__pending & components & FRAGMENT:
+            self.__check(FRAGMENT, parsed.fragment)
+        if self.__pending & components & SPECIFIC:
+            self.__check(SPECIFIC, parsed.specific)
+
+    def __check(self, component: int, value: Optional[str]):
+        # Validates a pending component, given its value.
+        cached = component & (AUTHORITY_NAME | DATE) and self.__cache is not None
+        reason = self.__cache.check(self.__parsed.tagging_entity) if cached else None
+        if cached and reason is None:
+            # The whole tagging entity was validated, but the date is
+            # only done once its ownership is checked too.
+            validated = AUTHORITY_NAME | DATE if self.__registry is None else component
+        elif reason == NAMES[component]:
+            raise AttributeError(f'Invalid tag_uri: invalid {reason}')
+        elif value is not None and not VALIDATORS[component](value):
+            # Also reached when the cache rejected the other part of the
+            # tagging entity, which says nothing about this component.
+            raise AttributeError(f'Invalid tag_uri: invalid {NAMES[component]}')
         else:
-            self.__fragment = None
-        
-        # Validate specific.
-        if not specific_validator(specific):
-            raise AttributeError('Invalid tag_uri: invalid specific')
-        self.__specific = specific
-    
+            validated = component
+        if component & DATE and self.__registry is not None:
+            # Ownership can only be checked for valid authority names.
+            if self.__pending & ~validated & AUTHORITY_NAME:
+                self.__check(AUTHORITY_NAME, self.__parsed.authority_name)
+            self.__registry.validate(self.__parsed.authority_name,
+                                     self.__parsed.date)
+        self.__pending &= ~validated
+
     @property
     def tag(self) -> str:
         """str: The complete tag as parsed by the instantiator.
@@ -83,7 +158,9 @@ class TagUriParser:
             >>> parser.tag
             'tag:alice.example.com,2018:Hi'
         """
-        return self.__tag
+        if self.__pending:
+            self.__validate(ALL_COMPONENTS)
+        return self.__parsed.tag
     
     @property
     def authority_name(self) -> str:
@@ -94,7 +171,10 @@ class TagUriParser:
             >>> parser.authority_name
             'alice.example.com'
         """
-        return self.__authority
+        authority_name = self.__parsed.authority_name
+        if self.__pending & AUTHORITY_NAME:
+            self.__check(AUTHORITY_NAME, authority_name)
+        return authority_name
     
     @property
     def date(self) -> str:
@@ -105,7 +185,10 @@ class TagUriParser:
             >>> parser.date
             '2018'
         """
-        return self.__date
+        date = self.__parsed.date
+        if self.__pending & DATE:
+            self.__check(DATE, date)
+        return date
     
     @property
     def tagging_entity(self) -> str:
@@ -116,7 +199,9 @@ class TagUriParser:
             >>> parser.tagging_entity
             'alice.example.com,2018'
         """
-        return f"{self.authority_name},{self.date}"
+        if self.__pending & (AUTHORITY_NAME | DATE):
+            self.__validate(AUTHORITY_NAME | DATE)
+        return self.__parsed.tagging_entity
     
     @property
     def specific(self) -> str:
@@ -131,7 +216,10 @@ class TagUriParser:
             >>> parser.specific
             ''
         """
-        return self.__specific
+        specific = self.__parsed.specific
+        if self.__pending & SPECIFIC:
+            self.__check(SPECIFIC, specific)
+        return specific
     
     @property
     def fragment(self) -> str:
@@ -146,9 +234,12 @@ class TagUriParser:
             >>> parser.fragment
             None
         """
-        return self.__fragment
+        fragment = self.__parsed.fragment
+        if self.__pending & FRAGMENT:
+            self.__check(FRAGMENT, fragment)
+        return fragment
     
-    def tagtuple(self) -> Tuple[str, str, str, str]:
+    def tagtuple(self) -> Tuple[str, str, str, Optional[str]]:
         """A tuple with the extracted parts of the parsed tag.
 
         This function will return a tuple containing four items, each
@@ -158,13 +249,30 @@ class TagUriParser:
         Returns:
             (str, str, str, str): a tuple containing the authority
                 name, date, specific part, and possible fragment.
+
+        Raises:
+            AttributeError: if the parser is lazy and a component of
+                the tag is not valid.
+        """
+        return tuple(self.parsed_tag())
+
+    def parsed_tag(self) -> ParsedTag:
+        """The parsed tag, as a compact ParsedTag.
+
+        The ParsedTag keeps the offsets of each part in the tag instead
+        of copies of them, and it is hashable and comparable, so it is
+        cheap to keep in memory and use in sets and dicts.
+
+        Returns:
+            ParsedTag: the parsed tag.
+
+        Raises:
+            AttributeError: if the parser is lazy and a component of
+                the tag is not valid.
         """
-        return (
-            self.authority_name,
-            self.date,
-            self.specific,
-            self.fragment
-        )
+        if self.__pending:
+            self.__validate(ALL_COMPONENTS)
+        return self.__parsed
 
     def __str__(self):
-        return self.__tag
\ No newline at end of file
+        return self.__parsed.tag
\ No newline at end of file
@@ -0,0 +1,81 @@
+import mmap
+import re
+from typing import Iterator, Tuple
+from .grammar import DATE, TAG_URI_RE, calendar_date
+from .validator import date_validator
+
+# The date validator also accepts months and days of a single digit,
+# and days padded with a space, which the grammar leaves out.  These
+# are matched as loose dates.
+LOOSE_DATE = r"[0-9]{4}(?:-[0-9]{1,2}(?:-(?:[0-9]{1,2}| [1-9]))?)?"
+
+# The tag grammar, for bytes.  Candidates must not be preceded by a
+# letter or digit, so that words such as `hashtag:` are not matched.
+# The lookbehind goes after the literal prefix, which is much faster
+# to search for.
+CANDIDATE_RE = re.compile(
+    TAG_URI_RE.pattern.replace(
+        f'(?P<date>{DATE})',
+        f'(?:(?P<date>{DATE})|(?P<loose_date>{LOOSE_DATE}))', 1
+    ).encode('ascii').replace(b'tag:', b'tag:(?<![a-zA-Z0-9]tag:)', 1)
+)
+
+def scan(data) -> Iterator[Tuple[int, str]]:
+    """Finds the tag URIs embedded in some arbitrary data.
+
+    The data is searched as bytes using the compiled tag grammar, so it
+    is never decoded as a whole; only the spans that match the grammar
+    are decoded, and their dates are then checked as the parser does.
+    The grammar accepts the same ASCII tags as the validators, so the
+    tags found are the ones that `scan_tag` accepts, except for those
+    with dates written in digits that are not ASCII, which are never
+    found.  Any bytes-like object can be scanned, including
+    memory-mapped files.
+
+    Tags are matched greedily, so characters that are allowed at the
+    end of a tag, such as a full stop or a closing parenthesis, are
+    considered part of the tag when the tag is followed by them.
+
+    Args:
+        data: the bytes-like object to scan.
+
+    Yields:
+        (int, str): the offset where each valid tag starts, and the tag.
+
+    Example:
+        >>> text = b'<id>tag:example.com,2018:Books</id> tag:x,2018-13:y'
+        >>> list(scan(text))
+        [(4, 'tag:example.com,2018:Books')]
+    """
+    for match in CANDIDATE_RE.finditer(data):
+        tag = match.group().decode('ascii')
+        start = match.start()
+        if match.start('date') >= 0:
+            valid = calendar_date(tag, match.start('date') - start,
+                                  match.end('date') - start)
+        else:
+            valid = date_validator(tag[match.start('loose_date') - start:
+                                       match.end('loose_date') - start])
+        if valid:
+            yield start, tag
+
+def scan_file(path: str) -> Iterator[Tuple[int, str]]:
+    """Finds the tag URIs embedded in a file.
+
+    The file is memory-mapped and scanned using `scan`, so it does not
+    need to fit in memory.
+
+    Args:
+        path (str): the path to the file to scan.
+
+    Yields:
+        (int, str): the offset where each valid tag starts, and the tag.
+    """
+    with open(path, 'rb') as source:
+        try:
+            data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped, and have no tags anyway.
+            return
+        with data:
+            yield from scan(data)
@@ -0,0 +1,127 @@
+import os
+from typing import Iterable, Optional, Union
+from .table import TagTable, encode_table
+from .tag import ParsedTag
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    shared_memory = None
+
+class SharedTagTable(TagTable):
+    """A TagTable in shared memory, read by many processes.
+
+    One process publishes the table, and every other process attaches
+    to it by name, such as the workers of a pool.  Workers read the tags
+    straight from the shared memory, so the table is stored once for all
+    of them, and it is neither copied, unpickled nor validated again
+    when attaching.  Tags are built on demand, as in TagTable.
+
+    Every process closes the table when done.  The publisher also
+    unlinks it, once no more processes are going to attach to it.
+
+    Use `publish` and `attach` to get a table.
+
+    Args:
+        memory (SharedMemory): the shared memory holding the table.
+        verify (bool): whether to check the checksum of the table.
+
+    Raises:
+        ValueError: if the memory does not hold a table, or it is
+            corrupt.
+
+    Example:
+        >>> table = SharedTagTable.publish(['tag:example.com,2018:Books/1'])
+        >>> with SharedTagTable.attach(table.name) as attached:
+        ...     attached[0]
+        ParsedTag('tag:example.com,2018:Books/1')
+        >>> table.close()
+        >>> table.unlink()
+    """
+
+    def __init__(self, memory, verify: bool=True):
+        self.__memory = memory
+        super().__init__(memory.buf, verify)
+
+    @classmethod
+    def publish(cls, tags: Iterable[Union[str, ParsedTag]], name: Optional[str]=None,
+                validate: bool=True) -> 'SharedTagTable':
+        """Encodes some tags as a table in a new block of shared memory.
+
+        Args:
+            tags (iterable of str or ParsedTag): the tags to store.
+            name (str, optional): the name of the shared memory.  If not
+                given, a unique name is chosen.
+            validate (bool): see `encode_table`.
+
+        Returns:
+            SharedTagTable: the table.  Its name is given to the other
+                processes so they can attach to it.
+
+        Raises:
+            AttributeError: if a tag is not valid.
+            FileExistsError: if there is shared memory with that name.
+            RuntimeError: if shared memory is not available.
+        """
+        _check_shared_memory()
+        data = encode_table(tags, validate)
+        memory = shared_memory.SharedMemory(name, create=True, size=len(data))
+        memory.buf[:len(data)] = data
+        # The table was just encoded, so there is no need to verify it.
+        return cls(memory, verify=False)
+
+    @classmethod
+    def attach(cls, name: str, verify: bool=True) -> 'SharedTagTable':
+        """Attaches to a table published by another process.
+
+        Args:
+            name (str): the name of the shared memory of the table.
+            verify (bool): whether to check the checksum of the table,
+                which reads it whole.
+
+        Returns:
+            SharedTagTable: the table.
+
+        Raises:
+            FileNotFoundError: if there is no shared memory with that name.
+            RuntimeError: if shared memory is not available.
+            ValueError: if the shared memory does not hold a table.
+        """
+        _check_shared_memory()
+        return cls(_attach(name), verify)
+
+    @property
+    def name(self) -> str:
+        """str: The name of the shared memory of the table."""
+        return self.__memory.name
+
+    def close(self):
+        """Detaches from the table.  The table is kept for other processes."""
+        super().close()
+        self.__memory.close()
+
+    def unlink(self):
+        """Destroys the shared memory of the table, once it is detached
+        from every process.  Only the publisher should call it."""
+        self.__memory.unlink()
+
+def _check_shared_memory():
+    if shared_memory is None:
+        raise RuntimeError('SharedTagTable requires multiprocessing.shared_memory')
+
+def _attach(name: str):
+    # Attaching processes must not unlink the memory when they exit.
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    # Before Python 3.13, attaching registers the memory in the resource
+    # tracker, which unlinks it when the processes using the tracker
+    # exit.  That is only right if the tracker is the publisher's, which
+    # processes started by the publisher inherit.
+    tracker = getattr(resource_tracker, '_resource_tracker', None)
+    inherited = getattr(tracker, '_fd', None) is not None
+    memory = shared_memory.SharedMemory(name)
+    if os.name == 'posix' and not inherited:
+        resource_tracker.unregister('/' + memory.name, 'shared_memory')
+    return memory
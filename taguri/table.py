@@ -0,0 +1,597 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from .grammar import split_tag
+from .tag import ParsedTag
+
+MAGIC = b'TAGT'
+VERSION = 1
+# Set in the header flags if every tag was validated when written.
+PRE_VALIDATED = 1
+# Set in the header flags if the tags are sorted, so lookups can bisect.
+SORTED = 2
+# How many values of a prefix-compressed column follow each value that
+# is stored in full, and whose offset is kept in the column index.
+RESTART_INTERVAL = 16
+# The sections of a table, in the order they are stored.
+SECTIONS = (
+    'entity_offsets',       # offsets of each tagging entity, as Q
+    'entities',             # the tagging entities, in UTF-8
+    'row_entities',         # the tagging entity of each tag
+    'entity_row_offsets',   # where the tags of each entity start, as I
+    'entity_rows',          # the tags of each tagging entity, as I
+    'specific_index',       # offsets of the restart values, as Q
+    'specifics',            # the prefix-compressed specific parts
+    'fragment_index',       # offsets of the restart values, as Q
+    'fragments',            # the prefix-compressed fragments
+)
+# Magic, version, flags, typecode of row_entities, count of tags and of
+# tagging entities, and the offset and length of every section.
+HEADER = struct.Struct('<4sBBxcII' + 'QQ' * len(SECTIONS))
+# The CRC-32 of the header and of every section follows the header.
+CRC = struct.Struct('<I')
+# Sections are aligned so that they can be read as arrays in place.
+ALIGNMENT = 8
+
+class TagTable:
+    """Compact binary columnar table of parsed tags.
+
+    Tables are meant to ship big collections of tags between services
+    without parsing them again on arrival.  Tagging entities are stored
+    once in a dictionary, and each tag only keeps the number of its
+    tagging entity.  Specific parts and fragments are stored in blocks of
+    sixteen values, where each value only keeps what differs from the
+    first value of its block, so tags that are sorted take little space.
+    Blocks are indexed, so any value is decoded from its own bytes and
+    those of the first value of its block.  The tags of every tagging entity
+    are indexed too.  A CRC-32 checksum covers the whole table.
+
+    Tables are built using `encode_table` or `write_table`.  If every tag
+    was validated when the table was written, the table is flagged as
+    pre-validated and the tags read from it are trusted; otherwise they
+    are validated when they are read.  Tags can be looked up using `in`
+    or `index`, which bisect the tags if they were written sorted.
+
+    A table reads from any bytes-like object, which is not copied.  Use
+    `TagTable.open` to memory-map a table file, so that only the pages
+    used are read, and close it when done.
+
+    Args:
+        data: the bytes-like object with the table.
+        verify (bool): whether to check the checksum of the table,
+            which reads it whole.
+
+    Raises:
+        ValueError: if the data is not a table, or it is corrupt.
+
+    Example:
+        >>> table = TagTable(encode_table(['tag:example.com,2018:Books/1',
+        ...                                'tag:example.com,2018:Books/2#Doe',
+        ...                                'tag:example.org,2018:Films/1']))
+        >>> len(table), table.entities
+        (3, ['example.com,2018', 'example.org,2018'])
+        >>> table[1]
+        ParsedTag('tag:example.com,2018:Books/2#Doe')
+        >>> [tag.specific for tag in table.by_tagging_entity('example.com,2018')]
+        ['Books/1', 'Books/2']
+    """
+
+    def __init__(self, data, verify: bool=True):
+        self.__views = []
+        self.__mapping = None
+        view = self.__view(memoryview(data))
+        if view.format != 'B' or view.ndim != 1:
+            view = self.__view(view.cast('B'))
+        if len(view) < HEADER.size + CRC.size or view[:4] != MAGIC:
+            self.close()
+            raise ValueError('Invalid tag table: bad magic number')
+        magic, version, flags, typecode, count, entity_count, *sections = \
+            HEADER.unpack_from(view)
+        if version != VERSION:
+            self.close()
+            raise ValueError(f'Invalid tag table: unknown version {version}')
+        end = max(offset + length for offset, length
+                  in zip(sections[::2], sections[1::2]))
+        if end > len(view):
+            self.close()
+            raise ValueError('Invalid tag table: truncated')
+        if verify:
+            crc, = CRC.unpack_from(view, HEADER.size)
+            body = HEADER.size + CRC.size
+            if zlib.crc32(view[body:end], zlib.crc32(view[:HEADER.size])) != crc:
+                self.close()
+                raise ValueError('Invalid tag table: bad checksum')
+
+        self.__count = count
+        self.__pre_validated = bool(flags & PRE_VALIDATED)
+        self.__sorted = bool(flags & SORTED)
+        columns = {}
+        for name, offset, length in zip(SECTIONS, sections[::2], sections[1::2]):
+            columns[name] = self.__view(view[offset:offset + length])
+        entity_offsets = self.__array(columns['entity_offsets'], 'Q')
+        entities = columns['entities']
+        self.__entities = [str(entities[entity_offsets[n]:entity_offsets[n + 1]], 'utf-8')
+                           for n in range(entity_count)]
+        self.__entity_ids = {entity: n for n, entity in enumerate(self.__entities)}
+        self.__commas = [4 + entity.index(',') for entity in self.__entities]
+        self.__row_entities = self.__array(columns['row_entities'],
+                                           typecode.decode('ascii'))
+        self.__entity_row_offsets = self.__array(columns['entity_row_offsets'], 'I')
+        self.__entity_rows = self.__array(columns['entity_rows'], 'I')
+        # Columns are sliced from the data itself when that gives bytes,
+        # which is faster than slicing a memoryview.
+        source = data if type(data) in (bytes, mmap.mmap) else view
+        self.__specifics = (self.__array(columns['specific_index'], 'Q'),
+                            source, sections[SECTIONS.index('specifics') * 2])
+        self.__fragments = (self.__array(columns['fragment_index'], 'Q'),
+                            source, sections[SECTIONS.index('fragments') * 2])
+
+    @classmethod
+    def open(cls, path: str, verify: bool=True) -> 'TagTable':
+        """Memory-maps a table file.
+
+        Args:
+            path (str): the path to the table file.
+            verify (bool): whether to check the checksum of the table.
+
+        Returns:
+            TagTable: the table.  Close it to unmap the file.
+
+        Raises:
+            ValueError: if the file is not a table, or it is corrupt.
+        """
+        with open(path, 'rb') as source:
+            try:
+                mapping = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError('Invalid tag table: empty file') from None
+        try:
+            table = cls(mapping, verify)
+        except ValueError:
+            mapping.close()
+            raise
+        table.__mapping = mapping
+        return table
+
+    def close(self):
+        """Releases the data of the table, unmapping it if mapped."""
+        for view in reversed(self.__views):
+            view.release()
+        self.__views = []
+        if self.__mapping is not None:
+            self.__mapping.close()
+            self.__mapping = None
+
+    def __enter__(self) -> 'TagTable':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __view(self, view: memoryview) -> memoryview:
+        # Keeps every view, to release them all when closing.
+        self.__views.append(view)
+        return view
+
+    def __array(self, view: memoryview, typecode: str):
+        # Reads an array of little-endian numbers, in place if possible.
+        if sys.byteorder == 'little':
+            return self.__view(view.cast(typecode))
+        numbers = array(typecode, view)
+        numbers.byteswap()
+        return numbers
+
+    @property
+    def pre_validated(self) -> bool:
+        """bool: Whether every tag was validated when written."""
+        return self.__pre_validated
+
+    @property
+    def entities(self) -> List[str]:
+        """list of str: The distinct tagging entities of the tags."""
+        return list(self.__entities)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __getitem__(self, index: int) -> ParsedTag:
+        """Returns the tag at the given position.
+
+        Only the values of the indexed block of each column holding the
+        tag are decoded.
+
+        Raises:
+            IndexError: if there is no tag at that position.
+            AttributeError: if the table is not pre-validated and the
+                tag is not valid.
+        """
+        if index < 0:
+            index += self.__count
+        if not 0 <= index < self.__count:
+            raise IndexError('tag table index out of range')
+        specific = _decode_value(self.__specifics, index)
+        fragment = _decode_value(self.__fragments, index)
+        return self.__tag(self.__row_entities[index], specific, fragment)
+
+    def __iter__(self) -> Iterator[ParsedTag]:
+        return self.__rows(0, self.__count)
+
+    def __contains__(self, tag: Union[str, ParsedTag]) -> bool:
+        return self.__find(tag) is not None
+
+    def index(self, tag: Union[str, ParsedTag]) -> int:
+        """Returns the position of a tag in the table.
+
+        Tags are compared as they were written, without canonicalizing
+        them.  If the tags of the table are sorted, the tags of its
+        tagging entity are bisected; otherwise they are all compared.
+
+        Args:
+            tag (str or ParsedTag): the tag to find.
+
+        Returns:
+            int: the position of the first occurrence of the tag.
+
+        Raises:
+            ValueError: if the tag is not in the table.
+        """
+        position = self.__find(tag)
+        if position is None:
+            raise ValueError(f'{tag} is not in the tag table')
+        return position
+
+    def __find(self, tag: Union[str, ParsedTag]) -> Optional[int]:
+        if isinstance(tag, ParsedTag):
+            comma, colon, hash = tag.offsets
+            tag = tag.tag
+        else:
+            try:
+                comma, colon, hash = split_tag(tag)
+            except AttributeError:
+                return None
+        entity = self.__entity_ids.get(tag[4:colon])
+        if entity is None:
+            return None
+        # What follows the tagging entity: the specific part and the
+        # fragment, with its separator.
+        key = tag[colon + 1:]
+        first = self.__entity_row_offsets[entity]
+        last = self.__entity_row_offsets[entity + 1]
+        if self.__sorted:
+            # The tags of a tagging entity are stored one after the other.
+            low = self.__entity_rows[first] if first < last else 0
+            end = high = low + last - first
+            while low < high:
+                middle = (low + high) // 2
+                if self.__key(middle) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < end and self.__key(low) == key:
+                return low
+            return None
+        for row in self.__entity_rows[first:last]:
+            if self.__key(row) == key:
+                return row
+        return None
+
+    def __key(self, row: int) -> str:
+        specific = _decode_value(self.__specifics, row)
+        fragment = _decode_value(self.__fragments, row)
+        return specific if fragment is None else f'{specific}#{fragment}'
+
+    def by_tagging_entity(self, tagging_entity: str) -> Iterator[ParsedTag]:
+        """Iterates the tags of a tagging entity, in the table order.
+
+        The tags are found using the index of each tagging entity, and
+        the tags of other tagging entities are not decoded, unless they
+        share a block of the columns.
+
+        Args:
+            tagging_entity (str): the tagging entity.
+
+        Yields:
+            ParsedTag: the tags of the tagging entity.
+        """
+        entity = self.__entity_ids.get(tagging_entity)
+        if entity is None:
+            return
+        rows = self.__entity_rows[self.__entity_row_offsets[entity]:
+                                  self.__entity_row_offsets[entity + 1]]
+        # Tags stored one after the other are decoded in a single run.
+        start = previous = None
+        for row in rows:
+            if start is None:
+                start = row
+            elif row != previous + 1:
+                yield from self.__rows(start, previous + 1)
+                start = row
+            previous = row
+        if start is not None:
+            yield from self.__rows(start, previous + 1)
+
+    def __rows(self, start: int, stop: int) -> Iterator[ParsedTag]:
+        # Decodes the tags in the given range of positions.
+        specifics = _decode_column(self.__specifics, start, stop)
+        fragments = _decode_column(self.__fragments, start, stop)
+        row_entities = self.__row_entities
+        for row, specific, fragment in zip(range(start, stop), specifics, fragments):
+            yield self.__tag(row_entities[row], specific, fragment)
+
+    def __tag(self, entity: int, specific: str, fragment: Optional[str]) -> ParsedTag:
+        tagging_entity = self.__entities[entity]
+        if fragment is None:
+            tag = f'tag:{tagging_entity}:{specific}'
+        else:
+            tag = f'tag:{tagging_entity}:{specific}#{fragment}'
+        if not self.__pre_validated:
+            return ParsedTag.parse(tag)
+        colon = 4 + len(tagging_entity)
+        return ParsedTag(tag, self.__commas[entity], colon, colon + 1 + len(specific))
+
+def encode_table(tags: Iterable[Union[str, ParsedTag]], validate: bool=True) -> bytes:
+    """Encodes some tags as a TagTable.
+
+    Tags are stored in the given order.  Sorting them first makes the
+    table smaller, since consecutive specific parts share prefixes.
+
+    Args:
+        tags (iterable of str or ParsedTag): the tags to store.
+        validate (bool): if True, tags given as strings are validated
+            and the table is flagged as pre-validated.  Otherwise, they
+            are only split in their components, and they are validated
+            when read instead.
+
+    Returns:
+        bytes: the table.  It is flagged as sorted if the tags were
+            given sorted, which speeds up `TagTable.index`.
+
+    Raises:
+        AttributeError: if a tag is not valid, or cannot be split if
+            validate is False.
+    """
+    entity_ids = {}
+    entities = []
+    row_entities = []
+    specifics = []
+    fragments = []
+    ordered = True
+    previous = ''
+    for tag in tags:
+        if not isinstance(tag, ParsedTag):
+            tag = ParsedTag.parse(tag) if validate else ParsedTag(tag, *split_tag(tag))
+        if ordered:
+            ordered = previous <= tag.tag
+            previous = tag.tag
+        entity = entity_ids.get(tag.tagging_entity)
+        if entity is None:
+            entity = entity_ids[tag.tagging_entity] = len(entities)
+            entities.append(tag.tagging_entity)
+        row_entities.append(entity)
+        specifics.append(tag.specific)
+        fragments.append(tag.fragment)
+
+    # Group the tags of every entity, keeping their order.
+    entity_row_offsets = array('I', [0] * (len(entities) + 1))
+    for entity in row_entities:
+        entity_row_offsets[entity + 1] += 1
+    for entity in range(len(entities)):
+        entity_row_offsets[entity + 1] += entity_row_offsets[entity]
+    positions = entity_row_offsets[:-1]
+    entity_rows = array('I', [0] * len(row_entities))
+    for row, entity in enumerate(row_entities):
+        entity_rows[positions[entity]] = row
+        positions[entity] += 1
+
+    encoded_entities = [entity.encode('utf-8') for entity in entities]
+    entity_offsets = array('Q', [0])
+    for entity in encoded_entities:
+        entity_offsets.append(entity_offsets[-1] + len(entity))
+    typecode = 'B' if len(entities) <= 0x100 else 'H' if len(entities) <= 0x10000 else 'I'
+    specific_index, specific_data = _encode_column(specifics)
+    fragment_index, fragment_data = _encode_column(fragments)
+    sections = (
+        _little_endian(entity_offsets),
+        b''.join(encoded_entities),
+        _little_endian(array(typecode, row_entities)),
+        _little_endian(entity_row_offsets),
+        _little_endian(entity_rows),
+        _little_endian(specific_index),
+        specific_data,
+        _little_endian(fragment_index),
+        fragment_data,
+    )
+
+    base = HEADER.size + CRC.size
+    body = bytearray()
+    locations = []
+    for section in sections:
+        body += bytes(_aligned(base + len(body)) - base - len(body))
+        locations += [base + len(body), len(section)]
+        body += section
+    flags = (PRE_VALIDATED if validate else 0) | (SORTED if ordered else 0)
+    header = HEADER.pack(MAGIC, VERSION, flags, typecode.encode('ascii'),
+                         len(row_entities), len(entities), *locations)
+    crc = zlib.crc32(body, zlib.crc32(header))
+    return header + CRC.pack(crc) + bytes(body)
+
+def write_table(tags: Iterable[Union[str, ParsedTag]], path: str,
+                validate: bool=True):
+    """Writes some tags to a TagTable file.
+
+    The file is written to a temporary file first and then renamed, so
+    readers never see a partial table.
+
+    Args:
+        tags (iterable of str or ParsedTag): the tags to store.
+        path (str): the path of the table file.
+        validate (bool): see `encode_table`.
+
+    Raises:
+        AttributeError: if a tag is not valid.
+    """
+    data = encode_table(tags, validate)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as target:
+        target.write(data)
+    os.replace(temporary, path)
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _little_endian(numbers: array) -> bytes:
+    if sys.byteorder != 'little':
+        numbers = array(numbers.typecode, numbers)
+        numbers.byteswap()
+    return numbers.tobytes()
+
+def _encode_column(values: List[Optional[str]]) -> Tuple[array, bytes]:
+    # Every value is the length of the prefix it shares with the first
+    # value of its block, and the length plus one of the rest of the
+    # value followed by it, as varints.  None is stored as a zero
+    # length, and the first value that is not None starts the block.
+    # Sharing the prefix of the first value instead of the previous one
+    # takes a little more space, but any value is decoded from its own
+    # bytes plus those of the first value alone.  Blocks of None values
+    # only, such as the fragments of most tags, are left empty.  The
+    # index has the offset of every block, and the end of the data.
+    index = array('Q')
+    data = bytearray()
+    for block in range(0, len(values), RESTART_INTERVAL):
+        index.append(len(data))
+        values_of_block = values[block:block + RESTART_INTERVAL]
+        if values_of_block.count(None) == len(values_of_block):
+            continue
+        first = None
+        for value in values_of_block:
+            if value is None:
+                data += b'\x00\x00'
+                continue
+            encoded = value.encode('utf-8')
+            if first is None:
+                first = encoded
+                shared = 0
+            else:
+                shared = len(os.path.commonprefix((first, encoded)))
+            data += _varint(shared)
+            data += _varint(len(encoded) - shared + 1)
+            data += encoded[shared:]
+    index.append(len(data))
+    return index, bytes(data)
+
+def _decode_column(column: Tuple, start: int, stop: int) -> Iterator[Optional[str]]:
+    # Decodes the values in the given range of positions of a column,
+    # starting at the indexed block holding the first of them.
+    index, data, base = column
+    position = start - start % RESTART_INTERVAL
+    offset = 0
+    first = None
+    while position < stop:
+        if position % RESTART_INTERVAL == 0:
+            block = position // RESTART_INTERVAL
+            if index[block] == index[block + 1]:
+                # A block of None values only.
+                for _ in range(max(position, start),
+                               min(position + RESTART_INTERVAL, stop)):
+                    yield None
+                position = (block + 1) * RESTART_INTERVAL
+                continue
+            offset = base + index[block]
+            first = None
+        # Most varints take a single byte.
+        shared = data[offset]
+        if shared < 0x80:
+            offset += 1
+        else:
+            shared, offset = _read_varint(data, offset)
+        length = data[offset]
+        if length < 0x80:
+            offset += 1
+        else:
+            length, offset = _read_varint(data, offset)
+        if length:
+            end = offset + length - 1
+            # No slice of the data is kept while suspended, so that the
+            # table can be closed with unfinished iterators.
+            if first is None:
+                first = bytes(data[offset:end])
+                if position >= start:
+                    yield str(first, 'utf-8')
+            elif position >= start:
+                if shared:
+                    yield str(first[:shared] + data[offset:end], 'utf-8')
+                else:
+                    yield str(data[offset:end], 'utf-8')
+            offset = end
+        elif position >= start:
+            yield None
+        position += 1
+
+def _decode_value(column: Tuple, position: int) -> Optional[str]:
+    # Decodes the value at a position of a column.  The values before
+    # it in its block are skipped, except for the first one.
+    index, data, base = column
+    block = position // RESTART_INTERVAL
+    offset = index[block]
+    if offset == index[block + 1]:
+        return None
+    offset += base
+    first = None
+    for _ in range(position - block * RESTART_INTERVAL):
+        shared = data[offset]
+        if shared < 0x80:
+            offset += 1
+        else:
+            shared, offset = _read_varint(data, offset)
+        length = data[offset]
+        if length < 0x80:
+            offset += 1
+        else:
+            length, offset = _read_varint(data, offset)
+        if length:
+            if first is None:
+                first = bytes(data[offset:offset + length - 1])
+            offset += length - 1
+    shared = data[offset]
+    if shared < 0x80:
+        offset += 1
+    else:
+        shared, offset = _read_varint(data, offset)
+    length = data[offset]
+    if length < 0x80:
+        offset += 1
+    else:
+        length, offset = _read_varint(data, offset)
+    if not length:
+        return None
+    value = data[offset:offset + length - 1]
+    if shared:
+        # Slices of bytes joined to a memoryview give bytes too.
+        value = first[:shared] + value
+    return str(value, 'utf-8')
+
+def _varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append(value & 0x7f | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return encoded
+
+def _read_varint(data, offset: int) -> Tuple[int, int]:
+    byte = data[offset]
+    if byte < 0x80:
+        return byte, offset + 1
+    value = byte & 0x7f
+    shift = 7
+    while True:
+        offset += 1
+        byte = data[offset]
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset + 1
+        shift += 7
@@ -0,0 +1,383 @@
+from typing import Iterator, NamedTuple, Optional
+from .canonical import canonical_form
+from .errors import TagError
+from .grammar import scan_tag
+from .validator import (
+    TagDate,
+    authority_name_validator,
+    date_validator,
+    parse_date,
+    specific_validator,
+)
+
+# Tells replace to keep the fragment, since None removes it.
+_KEEP = object()
+
+class ParsedTag:
+    """Compact and immutable representation of a parsed tag URI.
+
+    A parsed tag keeps a reference to the original tag string plus the
+    offsets of the separators between its components.  The components
+    are sliced from the tag string when they are accessed, so no copy
+    of them is kept in memory.  Instances have no `__dict__`.
+
+    Parsed tags are hashable, and they compare and sort by their tag
+    string.  `TagUriParser.parsed_tag` returns them.  They also behave
+    like the tuple returned by `TagUriParser.tagtuple`, so they can be
+    unpacked into the authority name, date, specific part, and fragment.
+
+    Use `ParsedTag.parse` to parse and validate a tag.  The constructor
+    trusts the given offsets and is meant to be used by the parsers.
+    Use `replace` and `append` to derive new tags from a parsed tag,
+    validating only what changes.
+
+    Args:
+        tag (str): the tag URI.
+        comma (int): offset of the comma in the tagging entity.
+        colon (int): offset of the colon before the specific part.
+        hash (int): offset of the `#` before the fragment, or the
+            length of the tag if the tag has no fragment.
+
+    Example:
+        >>> parsed = ParsedTag.parse('tag:example.com,2018:Books#Doe')
+        >>> authority_name, date, specific, fragment = parsed
+        >>> specific
+        'Books'
+    """
+
+    __slots__ = ('__tag', '__comma', '__colon', '__hash', '__canonical')
+
+    def __init__(self, tag: str, comma: int, colon: int, hash: int):
+        self.__tag = tag
+        self.__comma = comma
+        self.__colon = colon
+        self.__hash = hash
+        self.__canonical = None
+
+    @classmethod
+    def parse(cls, tag_uri: str, cache=None) -> 'ParsedTag':
+        """Parses and validates the given tag URI.
+
+        Args:
+            tag_uri (str): the tag URI to parse.
+            cache (:obj:`EntityCache`, optional): if given, the cache
+                used to validate the tagging entity.
+
+        Raises:
+            AttributeError: if the given tag URI is not valid.  Use
+                `try_parse` to get the error instead.
+        """
+        result = scan_tag(tag_uri, cache)
+        if type(result) is TagError:
+            raise AttributeError(result.message)
+        return cls(tag_uri, *result)
+
+    @property
+    def tag(self) -> str:
+        """str: The complete tag URI."""
+        return self.__tag
+
+    @property
+    def authority_name(self) -> str:
+        """str: The authority name of the tag."""
+        return self.__tag[4:self.__comma]
+
+    @property
+    def date(self) -> str:
+        """str: The date component of the tag."""
+        return self.__tag[self.__comma + 1:self.__colon]
+
+    @property
+    def date_value(self) -> TagDate:
+        """TagDate: The date component of the tag, parsed."""
+        return parse_date(self.date)
+
+    @property
+    def tagging_entity(self) -> str:
+        """str: The tagging entity part of the tag."""
+        return self.__tag[4:self.__colon]
+
+    @property
+    def specific(self) -> str:
+        """str: The specific part of the tag."""
+        return self.__tag[self.__colon + 1:self.__hash]
+
+    @property
+    def fragment(self) -> Optional[str]:
+        """str: The fragment of the tag, or None if there is none."""
+        if self.__hash < len(self.__tag):
+            return self.__tag[self.__hash + 1:]
+        return None
+
+    @property
+    def canonical(self) -> str:
+        """str: The canonical form of the tag, see `canonicalize`.
+
+        It is computed the first time it is used, and then kept.  Use it
+        as a key to deduplicate tags that are only lenient-equal.  When
+        the tag is already canonical, this is the tag string itself, so
+        no memory is used and its hash is shared with the tag.
+        """
+        if self.__canonical is None:
+            self.__canonical = canonical_form(self.__tag, self.__comma,
+                                              self.__colon)
+        return self.__canonical
+
+    def equals(self, other: 'ParsedTag', lenient: bool=False) -> bool:
+        """Tests whether two parsed tags are equal.
+
+        Args:
+            other (ParsedTag): the parsed tag to compare to.
+            lenient (bool): if False, tags are compared character by
+                character, as RFC 4151 says and as `==` does.  If True,
+                their canonical forms are compared instead.
+
+        Returns:
+            bool: True if both tags are equal, otherwise False.
+        """
+        if self.__tag == other.__tag:
+            return True
+        return lenient and self.canonical == other.canonical
+
+    def replace(self, authority_name: Optional[str]=None, date: Optional[str]=None,
+                specific: Optional[str]=None, fragment=_KEEP,
+                registry=None, cache=None) -> 'ParsedTag':
+        """Returns a copy of the tag with some of its components changed.
+
+        Only the given components are validated, since the others were
+        validated when this tag was parsed.  That is much cheaper than
+        formatting the new tag and parsing it again.
+
+        Args:
+            authority_name (str, optional): the new authority name.
+            date (str, optional): the new date.
+            specific (str, optional): the new specific part.
+            fragment (str, optional): the new fragment, or None or an
+                empty string to remove the fragment.  If not given, the
+                fragment is kept.
+            registry (:obj:`OwnershipRegistry`, optional): if given, the
+                tagging entity of the new tag must be legitimate too.
+                Otherwise ownership is not checked, even if this tag was
+                parsed with a registry.
+            cache (:obj:`EntityCache`, optional): if given, the new
+                tagging entity is validated using this cache, as
+                TagUriMinter does.
+
+        Returns:
+            ParsedTag: the new tag.
+
+        Raises:
+            AttributeError: if a given component is not valid, using the
+                same messages that TagUriMinter raises; or if the tagging
+                entity is not legitimate, using the same messages that
+                parse_many raises.
+
+        Example:
+            >>> parsed = ParsedTag.parse('tag:example.com,2018:Books#Doe')
+            >>> parsed.replace(date='2019', fragment=None)
+            ParsedTag('tag:example.com,2019:Books')
+        """
+        tag = self.__tag
+        comma = self.__comma
+        colon = self.__colon
+        hash = self.__hash
+        # Unchanged parts are sliced from the tag as they are, separators
+        # included, and keep their offsets.
+        if authority_name is None and date is None:
+            entity = tag[:colon]
+        else:
+            check_authority_name = authority_name is not None
+            check_date = date is not None
+            if authority_name is None:
+                authority_name = tag[4:comma]
+            if date is None:
+                date = tag[comma + 1:colon]
+            if cache is not None and ',' not in authority_name + date:
+                reason = cache.check(f'{authority_name},{date}')
+            elif check_authority_name and not authority_name_validator(authority_name):
+                reason = 'authority name'
+            elif check_date and not date_validator(date):
+                reason = 'date'
+            else:
+                reason = None
+            if reason == 'authority name':
+                raise AttributeError(f'Invalid authority name: {authority_name}')
+            if reason == 'date':
+                raise AttributeError(f'Invalid date: {date}')
+            entity = f'tag:{authority_name},{date}'
+            comma = 4 + len(authority_name)
+            colon = len(entity)
+        if registry is not None:
+            reason = registry.check(entity[4:comma], entity[comma + 1:colon])
+            if reason is not None:
+                raise AttributeError(f'Invalid tag_uri: {reason}')
+        if specific is None:
+            specific = tag[self.__colon:hash]
+        elif specific_validator(specific):
+            specific = ':' + specific
+        else:
+            raise AttributeError(f'Invalid specific: {specific}')
+        if fragment is _KEEP:
+            fragment = tag[hash:]
+        elif not fragment:
+            # Empty fragments are left out, as TagUriMinter.mint does.
+            fragment = ''
+        elif specific_validator(fragment):
+            fragment = '#' + fragment
+        else:
+            raise AttributeError(f'Invalid fragment: {fragment}')
+        return ParsedTag(entity + specific + fragment, comma, colon, colon + len(specific))
+
+    def append(self, segment: str, separator: str='/') -> 'ParsedTag':
+        """Returns a copy of the tag with a segment added to its specific part.
+
+        Only the segment is validated, and the fragment is kept.  The
+        tagging entity does not change, so ownership is not checked.
+
+        Args:
+            segment (str): the segment to append.
+            separator (str): what goes between the specific part and the
+                segment.  It may be empty.
+
+        Returns:
+            ParsedTag: the new tag.
+
+        Raises:
+            AttributeError: if the segment or the separator are not valid
+                in a specific part.
+
+        Example:
+            >>> ParsedTag.parse('tag:example.com,2018:Books#Doe').append('1984')
+            ParsedTag('tag:example.com,2018:Books/1984#Doe')
+        """
+        # Valid specifics have no partial pct-encoded tokens, so joining
+        # valid pieces gives a valid specific.
+        if not specific_validator(segment) or \
+                separator != '/' and not specific_validator(separator):
+            raise AttributeError(f'Invalid specific: {separator}{segment}')
+        tag = self.__tag
+        hash = self.__hash
+        return ParsedTag(f'{tag[:hash]}{separator}{segment}{tag[hash:]}',
+                         self.__comma, self.__colon, hash + len(separator) + len(segment))
+
+    @property
+    def offsets(self):
+        """(int, int, int): The offsets of the comma, colon and `#`."""
+        return self.__comma, self.__colon, self.__hash
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        yield self.authority_name
+        yield self.date
+        yield self.specific
+        yield self.fragment
+
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, ParsedTag):
+            return self.__tag == other.__tag
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, ParsedTag):
+            return self.__tag != other.__tag
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, ParsedTag):
+            return self.__tag < other.__tag
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, ParsedTag):
+            return self.__tag <= other.__tag
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, ParsedTag):
+            return self.__tag > other.__tag
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, ParsedTag):
+            return self.__tag >= other.__tag
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.__tag)
+
+    def __reduce__(self):
+        return type(self), (self.__tag, self.__comma, self.__colon, self.__hash)
+
+    def __repr__(self):
+        return f'ParsedTag({self.__tag!r})'
+
+    def __str__(self):
+        return self.__tag
+
+class ParseResult(NamedTuple):
+    """The result of `try_parse`.
+
+    A result is true if the tag is valid, so it can be tested directly.
+
+    Attributes:
+        tag (ParsedTag): the parsed tag, or None if it is not valid.
+        error (TagError): why the tag is not valid, or None if it is.
+    """
+    tag: Optional[ParsedTag]
+    error: Optional[TagError]
+
+    def __bool__(self):
+        return self.error is None
+
+def try_parse(tag_uri: str, cache=None) -> ParseResult:
+    """Parses and validates the given tag URI, without raising.
+
+    Invalid tags are reported through the returned result instead of an
+    AttributeError, which is much cheaper when many tags are invalid.
+
+    Args:
+        tag_uri (str): the tag URI to parse.
+        cache (:obj:`EntityCache`, optional): if given, the cache used
+            to validate the tagging entity.
+
+    Returns:
+        ParseResult: the parsed tag, or the error if it is not valid.
+
+    Examples:
+        >>> result = try_parse('tag:example.com,2018:Books#Doe')
+        >>> result.tag.specific
+        'Books'
+
+        >>> result = try_parse('tag:example.com,2018:Bo oks')
+        >>> bool(result), result.error.code.name, result.error.offset
+        (False, 'INVALID_SPECIFIC', 23)
+    """
+    result = scan_tag(tag_uri, cache)
+    if type(result) is TagError:
+        return ParseResult(None, result)
+    return ParseResult(ParsedTag(tag_uri, *result), None)
+
+def check(tag_uri: str, cache=None) -> Optional[TagError]:
+    """Validates the given tag URI, without raising.
+
+    Args:
+        tag_uri (str): the tag URI to validate.
+        cache (:obj:`EntityCache`, optional): if given, the cache used
+            to validate the tagging entity.
+
+    Returns:
+        TagError: why the tag is not valid, or None if it is valid.
+
+    Example:
+        >>> check('tag:example.com,2018-13:Books')
+        TagError(code=<ErrorCode.INVALID_DATE: 5>, offset=20)
+    """
+    result = scan_tag(tag_uri, cache)
+    if type(result) is TagError:
+        return result
+    return None
@@ -0,0 +1,217 @@
+import keyword
+import re
+from string import Formatter
+from typing import Callable, List, Tuple
+from uuid import UUID
+from taguri.validator import specific_validator
+
+# The UUIDs accepted as strings, in their canonical form.
+UUID_RE = re.compile(r"[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}")
+# The types of the fields of a template.
+FIELD_TYPES = ('str', 'int', 'uuid')
+# How many valid values of each text field are remembered, so that
+# values used again, which is the common case, are not validated again.
+SEEN_VALUES = 4096
+
+class TagTemplate:
+    """Minter of tags that follow a fixed shape.
+
+    A template is the specific part of the tags, and optionally their
+    fragment, with a field between braces for every part that changes,
+    such as `Collections/{kind}/{id:int}#{section}`.  The template is
+    validated once, when it is compiled, and then only the values given
+    for its fields are checked when minting a tag.  Fields may have a
+    type after a colon:
+
+    * `str`, the default: any valid specific or fragment token.  The
+      last valid values are remembered, so repeated values are only
+      validated once.
+    * `int`: an integer, which is always valid, so it is not checked.
+    * `uuid`: a `uuid.UUID`, or a string with a UUID.
+
+    The template is compiled to a function that formats the whole tag
+    at once, the way `collections.namedtuple` builds its classes, so
+    minting a tag costs little more than formatting a string.  The
+    function is `mint`, which takes the values of the fields in the
+    order they first appear, or by name.  Templates are callable too.
+    Use `TagUriMinter.template` to compile a template.
+
+    Args:
+        minter (TagUriMinter): the minter with the tagging entity.
+        template (str): the template of the specific part and fragment.
+
+    Raises:
+        AttributeError: if a literal part of the template is not valid
+            for the specific part or fragment where it is.
+        ValueError: if the template is not well formed, or a field has
+            no valid name or type.
+
+    Example:
+        >>> from taguri import TagUriMinter
+        >>> minter = TagUriMinter('example.com', '2018')
+        >>> template = minter.template('Collections/{kind}/{id:int}#{section}')
+        >>> template('Books', 42, 'Doe')
+        'tag:example.com,2018:Collections/Books/42#Doe'
+        >>> template.mint(kind='Films', id=7, section='Cast')
+        'tag:example.com,2018:Collections/Films/7#Cast'
+    """
+
+    def __init__(self, minter, template: str):
+        self.__minter = minter
+        self.__template = template
+        self.__fields, source, literals = _compile(minter.prefix, template)
+        namespace = {
+            '_check_text': _check_text,
+            '_int': _int,
+            '_uuid': _uuid,
+            '_INT': int,
+            '_STR': str,
+            '_UUID': UUID,
+        }
+        for name, _, _ in self.__fields:
+            namespace[f'_seen_{name}'] = set()
+        exec(source, namespace)
+        self.__mint = namespace['_make'](*literals)
+
+    @property
+    def minter(self):
+        """TagUriMinter: The minter with the tagging entity."""
+        return self.__minter
+
+    @property
+    def template(self) -> str:
+        """str: The template, as given."""
+        return self.__template
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """tuple of str: The names of the fields, in order."""
+        return tuple(name for name, _, _ in self.__fields)
+
+    @property
+    def mint(self) -> Callable[..., str]:
+        """function: Mints a tag, given the values of the fields.
+
+        Keep the function and call it to mint many tags, which avoids
+        calling the template object.
+
+        Raises:
+            AttributeError: if a value is not valid for its field.
+            TypeError: if the values do not match the fields.
+        """
+        return self.__mint
+
+    def __call__(self, *args, **kwargs) -> str:
+        return self.__mint(*args, **kwargs)
+
+    def __repr__(self):
+        return f'TagTemplate({self.__minter.prefix!r}, {self.__template!r})'
+
+def _compile(prefix: str, template: str) -> Tuple[List[Tuple[str, str, str]], str, List[str]]:
+    # Returns every field as its name, type and the part of the tag
+    # where it is first used; the source of a function that makes the
+    # mint function; and the literals that the maker function takes.
+    # Only field names, which are identifiers, are written in the
+    # source, and the literals are given as arguments.
+    part = 'specific'
+    fields = {}
+    pieces = {'specific': [prefix + ':'], 'fragment': []}
+    try:
+        parsed = list(Formatter().parse(template))
+    except ValueError as error:
+        raise ValueError(f'Invalid template: {error}') from None
+    for literal, name, field_type, conversion in parsed:
+        if part == 'specific' and '#' in literal:
+            specific, _, literal = literal.partition('#')
+            _check_literal(part, specific)
+            pieces[part].append(specific)
+            part = 'fragment'
+        _check_literal(part, literal)
+        pieces[part].append(literal)
+        if name is None:
+            continue
+        if not name.isidentifier() or keyword.iskeyword(name) or name.startswith('_'):
+            raise ValueError(f'Invalid field name: {name!r}')
+        if conversion is not None:
+            raise ValueError(f'Invalid field conversion: {name}!{conversion}')
+        field_type = field_type or 'str'
+        if field_type not in FIELD_TYPES:
+            raise ValueError(f'Invalid field type: {name}:{field_type}')
+        if fields.setdefault(name, (field_type, part))[0] != field_type:
+            raise ValueError(f'Invalid field type: {name}:{field_type}')
+        pieces[part].append(_Field(name))
+
+    literals = []
+
+    def format_pieces(values) -> str:
+        # The f-string that joins some pieces, with adjacent literals
+        # merged in a single argument of the maker function.
+        formatted = []
+        for piece in values:
+            if isinstance(piece, _Field):
+                formatted.append(f'{{{piece}}}')
+            elif piece:
+                if formatted and formatted[-1].startswith('{_literal'):
+                    literals[-1] += piece
+                else:
+                    formatted.append(f'{{_literal{len(literals)}}}')
+                    literals.append(piece)
+        return f'f"{"".join(formatted)}"'
+
+    specific = format_pieces(pieces['specific'])
+    fragment = format_pieces(pieces['fragment'])
+    lines = [f'def mint({", ".join(fields)}):']
+    for name, (field_type, part) in fields.items():
+        if field_type == 'str':
+            # The type is checked first, since unhashable values cannot
+            # be looked up in the set.
+            lines.append(f'    if {name}.__class__ is not _STR or {name} not in _seen_{name}: '
+                         f'_check_text(_seen_{name}, {part!r}, {name})')
+        elif field_type == 'int':
+            lines.append(f'    if {name}.__class__ is not _INT: {name} = _int({part!r}, {name})')
+        else:
+            lines.append(f'    if {name}.__class__ is not _UUID: {name} = _uuid({part!r}, {name})')
+    # Empty fragments are left out, as TagUriMinter.mint does.  Only
+    # fragments made of text fields and nothing else can be empty.
+    may_be_empty = all(fields[piece][0] == 'str' if isinstance(piece, _Field) else not piece
+                       for piece in pieces['fragment'])
+    if fragment == 'f""':
+        lines.append(f'    return {specific}')
+    elif not may_be_empty:
+        lines.append(f'    return {specific[:-1]}#{fragment[2:]}')
+    else:
+        # The fragment is empty when all of its fields are.
+        names = ' or '.join(dict.fromkeys(piece for piece in pieces['fragment'] if piece))
+        lines.append(f'    if {names}: return {specific[:-1]}#{fragment[2:]}')
+        lines.append(f'    return {specific}')
+    source = f'def _make({", ".join(f"_literal{n}" for n in range(len(literals)))}):\n'
+    source += ''.join(f'    {line}\n' for line in lines) + '    return mint\n'
+    return [(name, field_type, part) for name, (field_type, part) in fields.items()], \
+        source, literals
+
+class _Field(str):
+    """The name of a field, told apart from the literals."""
+
+def _check_literal(part: str, literal: str):
+    # Each literal is checked alone, so pct-encoded tokens cannot span
+    # a literal and a value.
+    if not specific_validator(literal):
+        raise AttributeError(f'Invalid {part}: {literal}')
+
+def _check_text(seen: set, part: str, value: str):
+    if value.__class__ is not str or not specific_validator(value):
+        raise AttributeError(f'Invalid {part}: {value}')
+    if len(seen) < SEEN_VALUES:
+        seen.add(value)
+
+def _int(part: str, value) -> int:
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise AttributeError(f'Invalid {part}: {value}')
+    return int(value)
+
+def _uuid(part: str, value) -> str:
+    if isinstance(value, UUID):
+        return str(value)
+    if value.__class__ is not str or not UUID_RE.fullmatch(value):
+        raise AttributeError(f'Invalid {part}: {value}')
+    return value
@@ -1,9 +1,60 @@
 import re
-from datetime import datetime
+import string
+from enum import IntEnum
+from typing import List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 EMAIL_USER_RE = re.compile(r"^([0-9a-zA-Z\.\-\_\+]+)$")
 DNSCOMP_RE = re.compile(r"^([a-zA-Z0-9](?:[a-zA-Z0-9\-]*[a-zA-Z0-9])?)$")
 PCT_HEX_TOKEN_RE = re.compile(r"^([0-9a-fA-F]{2})")
+# Same month and day forms accepted by datetime.strptime for %m and %d.
+DATE_RE = re.compile(
+    r"(\d\d\d\d)(?:-(1[0-2]|0[1-9]|[1-9])(?:-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9]))?)?"
+)
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+PCHARS = (
+    string.ascii_letters + string.digits +
+    '/?' + # as per specific in RFC 4151
+    ':@' + # as per pchar in RFC 3986
+    '-._~' + # as per unreserved in RFC 3986
+    "!$&'()*+,;=" # sub-delims
+)
+# Translation table that deletes every allowed character, so that a
+# specific is valid when nothing is left after translating it.  The
+# % symbol is deleted too once the pct-encoded tokens are checked.
+PCHARS_TABLE = str.maketrans('', '', PCHARS + '%')
+# Minimum batch size for which validate_specifics uses NumPy.
+NUMPY_BATCH_SIZE = 1024
+
+class DatePrecision(IntEnum):
+    """How many components were given in the date of a tag."""
+    YEAR = 1
+    MONTH = 2
+    DAY = 3
+
+class TagDate(NamedTuple):
+    """A parsed date of a tagging entity.
+
+    Omitted components are set to 1, as the RFC says.  The precision
+    is also kept, since 2018 and 2018-01-01 are not the same date when
+    used in a tag; because of that, tag dates sort by day first and
+    then by precision.
+    """
+    year: int
+    month: int
+    day: int
+    precision: DatePrecision
+
+def days_in_month(year: int, month: int) -> int:
+    """Returns the number of days of the given month of the given year."""
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return DAYS_IN_MONTH[month - 1]
 
 def authority_name_validator(authority_name: str) -> bool:
     """Tests whether the given authority_name is valid per the RFC.
@@ -73,7 +124,44 @@ def authority_name_validator(authority_name: str) -> bool:
     else:
         return validate_dns_name(authority_name)
 
-def date_validator(date: str) -> str:
+def parse_date(date: str) -> Optional[TagDate]:
+    """Parses the given date of a tagging entity.
+
+    The date is checked structurally in a single match, and then the
+    day is checked against the calendar, leap years included.  This
+    accepts the same dates as `date_validator`.
+
+    Args:
+        date (str): the given date to parse.
+
+    Returns:
+        TagDate: the parsed date, or None if the date is not valid.
+
+    Examples:
+        >>> parse_date('2018-04')
+        TagDate(year=2018, month=4, day=1, precision=<DatePrecision.MONTH: 2>)
+
+        >>> parse_date('2018-02-29') is None
+        True
+    """
+    match = DATE_RE.fullmatch(date)
+    if not match:
+        return None
+    year, month, day = match.groups()
+    year = int(year)
+    if year == 0:
+        return None
+    if month is None:
+        return TagDate(year, 1, 1, DatePrecision.YEAR)
+    month = int(month)
+    if day is None:
+        return TagDate(year, month, 1, DatePrecision.MONTH)
+    day = int(day)
+    if day > 28 and day > days_in_month(year, month):
+        return None
+    return TagDate(year, month, day, DatePrecision.DAY)
+
+def date_validator(date: str) -> bool:
     """Tests whether the given date is valid according to the RFC.
 
     Valid dates are instances of the RFC 3339, which is at the same
@@ -81,7 +169,8 @@ def date_validator(date: str) -> str:
     optionally the month; and if the month is provided, then optionally
     a day.
 
-    Examples of valid dates are 2018, 2018-11 and 2018-11-22.
+    Examples of valid dates are 2018, 2018-11 and 2018-11-22.  Use
+    `parse_date` to get the components of the date.
 
     Args:
         date (str): the given date to validate.
@@ -114,16 +203,9 @@ def date_validator(date: str) -> str:
         >>> date_validator('1999-12-32')
         False
     """
-    for format in ('%Y-%m-%d', '%Y-%m', '%Y'):
-        try:
-            datetime.strptime(date, format)
-        except ValueError:
-            pass
-        else:
-            return True
-    return False
+    return parse_date(date) is not None
 
-def specific_validator(specific: str) -> str:
+def specific_validator(specific: str) -> bool:
     """Validates the specifics or fragment tokens of a tag.
 
     The specific has to be a string of characters specifically allowed
@@ -131,6 +213,12 @@ def specific_validator(specific: str) -> str:
     considers valid tokens <pchar>, `/` and `?`, being pchar defined
     in RFC 3986.
 
+    Note:
+        The grammar only allows ASCII characters.  Any other character,
+        including non-ASCII letters and digits, has to be pct-encoded
+        as UTF-8 octets, as RFC 3986 says; so 'Caf%C3%A9' is valid but
+        'Café' is not.
+
     Args:
         specific (str): a specific string to validate.
     
@@ -149,29 +237,79 @@ def specific_validator(specific: str) -> str:
 
         >>> specific_validator('a space')
         False
-    """
-    pchar_tokens = (
-        '/', '?', # as per specific in RFC 4151
-        ':', '@', # as per pchar in RFC 3986
-        '-', '.', '_', '~', # as per unreserved in RFC 3986
-        '!', '$', '&', "'", '(', ')', '*', '+', ',', ';', '=', # sub-delims
-    )
 
+        >>> specific_validator('Café')
+        False
+    """
     # Test for pct-encoded, although discouraged by spec.
-    pct_encoded_tokens = specific.split('%')
-    remainder = [pct_encoded_tokens[0]]
-    for pct_encoded_token in pct_encoded_tokens[1:]:
-        # Test that they are hexchars.
+    if '%' in specific and not _valid_pct_encoded(specific):
+        return False
+    # Test for pchar tokens.
+    return not specific.translate(PCHARS_TABLE)
+
+def _valid_pct_encoded(specific: str) -> bool:
+    # Tests that every % symbol is followed by two hexchars.
+    for pct_encoded_token in specific.split('%')[1:]:
         if not PCT_HEX_TOKEN_RE.match(pct_encoded_token):
             return False
-        remainder.append(pct_encoded_token[2:])
-    specific_without_pct_tokens = ''.join(remainder)
-    
-    # Test for pchar tokens.
-    for pchar in list(specific_without_pct_tokens):
-        if any((pchar.isdigit(), pchar.isalpha(), pchar in pchar_tokens)):
-            continue
-        return False
-    
-    # Valid.
     return True
+
+def validate_specifics(specifics: Sequence[str]) -> List[bool]:
+    """Validates many specifics or fragment tokens in a single call.
+
+    This is the batch version of `specific_validator`.  If every
+    specific in the batch is valid, which is the common case, the whole
+    batch is checked at once.  Otherwise, if NumPy is installed and the
+    batch is large, every character of the batch is classified using a
+    vectorised lookup table; or else each specific is validated on its
+    own.
+
+    Args:
+        specifics (list of str): the specifics to validate.
+
+    Returns:
+        list of bool: whether each specific is valid, in order.
+
+    Example:
+        >>> validate_specifics(['Books', 'a space', 'hello%20world'])
+        [True, False, True]
+    """
+    if not isinstance(specifics, (list, tuple)):
+        specifics = list(specifics)
+    # The / separator keeps pct-encoded tokens from spanning specifics.
+    if specific_validator('/'.join(specifics)):
+        return [True] * len(specifics)
+    if numpy is not None and len(specifics) >= NUMPY_BATCH_SIZE:
+        return _validate_specifics_numpy(specifics)
+    return [specific_validator(specific) for specific in specifics]
+
+if numpy is not None:
+    # Character classes of the code points up to 127, plus a last
+    # entry that is used for every code point out of the ASCII range.
+    NUMPY_PCHARS = numpy.zeros(129, dtype=bool)
+    NUMPY_PCHARS[[ord(char) for char in PCHARS]] = True
+    NUMPY_HEXDIGITS = numpy.zeros(129, dtype=bool)
+    NUMPY_HEXDIGITS[[ord(char) for char in string.hexdigits]] = True
+
+def _validate_specifics_numpy(specifics: Sequence[str]) -> List[bool]:
+    lengths = numpy.fromiter(map(len, specifics), dtype=numpy.intp,
+                             count=len(specifics))
+    data = ''.join(specifics).encode('utf-32-le')
+    codes = numpy.minimum(numpy.frombuffer(data, dtype=numpy.uint32), 128)
+
+    # Which specific and where it ends, for every character.
+    owners = numpy.repeat(numpy.arange(len(specifics)), lengths)
+    ends = numpy.cumsum(lengths)[owners]
+
+    # A % symbol is valid when followed by two hexchars of its specific.
+    hexdigits = NUMPY_HEXDIGITS[codes]
+    positions = numpy.arange(len(codes))
+    pct = codes == ord('%')
+    pct[pct] &= positions[pct] + 2 < ends[pct]
+    pct[:-2] &= hexdigits[1:-1] & hexdigits[2:]
+    pct[-2:] = False
+
+    invalid = ~(NUMPY_PCHARS[codes] | pct)
+    valid = numpy.ones(len(specifics), dtype=bool)
+    valid[owners[invalid]] = False
+    return valid.tolist()
@@ -0,0 +1,8 @@
+"""Tags of the synthetic benchmark corpus, shared by the tests."""
+from typing import List
+
+from benchmarks.corpus import generate
+
+def corpus_tags(count: int, invalid_share: float=0.0, seed: int=0) -> List[str]:
+    """Returns the tags of a corpus generated by benchmarks.corpus."""
+    return [sample.tag for sample in generate(count, invalid_share, seed)]
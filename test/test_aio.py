@@ -0,0 +1,250 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import TestCase
+
+from taguri.aio import iter_batches, mint_stream, parse_stream
+from taguri.bulk import ErrorRecord
+from taguri.cache import EntityCache
+from taguri.minter import TagUriMinter
+
+TAGS = [f'tag:example.com,2018:Books/{n}' for n in range(100)]
+TAGS[42] = 'tag:example.com:Books/42'
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+async def collect(results):
+    return [result async for result in results]
+
+def feed(reader, data: bytes, size: int):
+    # Feeds the data in small chunks, as a socket would, splitting lines.
+    for start in range(0, len(data), size):
+        reader.feed_data(data[start:start + size])
+    reader.feed_eof()
+
+class IterBatchesTestCase(TestCase):
+
+    def test_stream_lines(self):
+        async def main():
+            reader = asyncio.StreamReader()
+            feed(reader, b'a\r\nbb\n\nccc', 3)
+            return await collect(iter_batches(reader))
+        batches = run(main())
+        self.assertListEqual(['a', 'bb', '', 'ccc'], sum(batches, []))
+
+    def test_stream_batch_size(self):
+        async def main():
+            reader = asyncio.StreamReader()
+            feed(reader, b'x\n' * 10, 100)
+            return await collect(iter_batches(reader, batch_size=4))
+        self.assertListEqual([4, 4, 2], [len(batch) for batch in run(main())])
+
+    def test_queue_takes_available_items(self):
+        async def main():
+            queue = asyncio.Queue()
+            for item in ('a', b'b', 'c'):
+                queue.put_nowait(item)
+            batches = iter_batches(queue)
+            first = await batches.__anext__()
+            queue.put_nowait('d')
+            queue.put_nowait(None)
+            return [first] + await collect(batches)
+        self.assertListEqual([['a', 'b', 'c'], ['d']], run(main()))
+
+    def test_async_iterable(self):
+        async def source():
+            yield 'a'
+            yield b'b\n'
+            for item in 'cdefg':
+                yield item
+        self.assertListEqual([['a', 'b', 'c', 'd', 'e', 'f', 'g']],
+                             run(collect(iter_batches(source()))))
+        self.assertListEqual([['a', 'b', 'c'], ['d', 'e', 'f'], ['g']],
+                             run(collect(iter_batches(source(), batch_size=3))))
+
+    def test_slow_async_iterable(self):
+        async def source():
+            yield 'a'
+            yield 'b'
+            await asyncio.sleep(0.01)
+            yield 'c'
+        self.assertListEqual([['a', 'b'], ['c']], run(collect(iter_batches(source()))))
+
+    def test_async_iterable_errors(self):
+        async def source():
+            yield 'a'
+            await asyncio.sleep(0.01)
+            raise OSError('closed')
+        async def main():
+            batches = iter_batches(source())
+            self.assertListEqual(['a'], await batches.__anext__())
+            with self.assertRaisesRegex(OSError, 'closed'):
+                await batches.__anext__()
+        run(main())
+
+    def test_async_iterable_stops_early(self):
+        read = []
+        async def source():
+            for item in range(100):
+                read.append(item)
+                yield str(item)
+        async def main():
+            batches = iter_batches(source(), batch_size=10)
+            first = await batches.__anext__()
+            await batches.aclose()
+            await asyncio.sleep(0)
+            return first
+        self.assertListEqual([str(n) for n in range(10)], run(main()))
+        # Read ahead by one batch at most.
+        self.assertLessEqual(len(read), 21)
+
+    def test_rejects_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            iter_batches(asyncio.Queue(), batch_size=0)
+
+class ParseStreamTestCase(TestCase):
+
+    def parse(self, **kwargs):
+        async def main():
+            reader = asyncio.StreamReader()
+            feed(reader, '\n'.join(TAGS).encode(), 97)
+            return await collect(parse_stream(reader, **kwargs))
+        return run(main())
+
+    def test_record_policy(self):
+        for batch_size in (1, 7, 1024):
+            with self.subTest(batch_size=batch_size):
+                results = self.parse(errors='record', batch_size=batch_size)
+                self.assertEqual(100, len(results))
+                self.assertEqual(TAGS[41], str(results[41]))
+                expected = ErrorRecord(43, TAGS[42],
+                                       'Invalid tag_uri: invalid tagging entity')
+                self.assertEqual(expected, results[42])
+                self.assertEqual(TAGS[99], str(results[99]))
+
+    def test_skip_policy(self):
+        results = self.parse(errors='skip', batch_size=10)
+        self.assertListEqual(TAGS[:42] + TAGS[43:], [str(tag) for tag in results])
+
+    def test_raise_policy_yields_previous_tags(self):
+        async def main():
+            results = []
+            with self.assertRaises(AttributeError):
+                async for tag in parse_stream(source(), batch_size=10):
+                    results.append(str(tag))
+            return results
+
+        async def source():
+            for tag in TAGS:
+                yield tag
+
+        self.assertListEqual(TAGS[:42], run(main()))
+
+    def test_offloads_to_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = self.parse(errors='record', batch_size=50,
+                                 executor=executor, offload_threshold=20)
+        self.assertEqual(100, len(results))
+        self.assertIsInstance(results[42], ErrorRecord)
+        self.assertEqual(43, results[42].lineno)
+
+    def test_offloads_to_processes_with_cache(self):
+        cache = EntityCache()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = self.parse(errors='record', batch_size=50, cache=cache,
+                                 executor=executor, offload_threshold=20)
+        self.assertListEqual(self.parse(errors='record'), results)
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            parse_stream(asyncio.Queue(), errors='ignore')
+
+    def test_backpressure(self):
+        async def main():
+            queue = asyncio.Queue(maxsize=4)
+            produced = []
+
+            async def producer():
+                for tag in TAGS:
+                    await queue.put(tag)
+                    produced.append(tag)
+                await queue.put(None)
+
+            task = asyncio.ensure_future(producer())
+            results = parse_stream(queue, errors='skip', batch_size=4)
+            await results.__anext__()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            stalled = len(produced)
+            rest = await collect(results)
+            await task
+            return stalled, 1 + len(rest)
+
+        stalled, parsed = run(main())
+        self.assertLess(stalled, 20)
+        self.assertEqual(99, parsed)
+
+    def test_does_not_block_other_tasks(self):
+        async def main():
+            ticks = []
+
+            async def ticker():
+                while True:
+                    ticks.append(len(ticks))
+                    await asyncio.sleep(0)
+
+            reader = asyncio.StreamReader()
+            feed(reader, '\n'.join(TAGS * 10).encode(), 4096)
+            task = asyncio.ensure_future(ticker())
+            await collect(parse_stream(reader, errors='skip', batch_size=50))
+            task.cancel()
+            return len(ticks)
+
+        self.assertGreater(run(main()), 5)
+
+class MintStreamTestCase(TestCase):
+
+    def setUp(self):
+        self.minter = TagUriMinter('example.com', '2018')
+
+    def test_mints_specifics_and_fragments(self):
+        async def source():
+            yield 'Books'
+            yield ('Films', 'Doe')
+            yield 'Bad specific'
+            yield ('Music', None)
+        results = run(collect(mint_stream(self.minter, source(), errors='record')))
+        self.assertListEqual([
+            'tag:example.com,2018:Books',
+            'tag:example.com,2018:Films#Doe',
+            ErrorRecord(3, 'Bad specific', 'Invalid specific: Bad specific'),
+            'tag:example.com,2018:Music',
+        ], results)
+
+    def test_offloads_to_executor(self):
+        async def main():
+            queue = asyncio.Queue()
+            for n in range(300):
+                queue.put_nowait(f'Books/{n}' if n != 250 else 'Books 250')
+            queue.put_nowait(None)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return await collect(mint_stream(
+                    self.minter, queue, errors='record', batch_size=100,
+                    executor=executor, offload_threshold=100))
+        results = run(main())
+        self.assertEqual(300, len(results))
+        self.assertEqual('tag:example.com,2018:Books/299', results[-1])
+        self.assertEqual(ErrorRecord(251, 'Books 250', 'Invalid specific: Books 250'),
+                         results[250])
+
+    def test_raise_policy(self):
+        async def source():
+            yield 'Books'
+            yield 'Bad specific'
+        async def main():
+            results = []
+            with self.assertRaises(AttributeError):
+                async for tag in mint_stream(self.minter, source()):
+                    results.append(tag)
+            return results
+        self.assertListEqual(['tag:example.com,2018:Books'], run(main()))
@@ -0,0 +1,71 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import TestCase
+
+from benchmarks.corpus import generate
+from benchmarks.suite import BENCHMARKS, main
+from taguri import ParsedTag
+
+class CorpusTestCase(TestCase):
+
+    def test_validity_matches_parser(self):
+        for sample in generate(2000, invalid_share=0.3):
+            with self.subTest(tag=sample.tag):
+                try:
+                    ParsedTag.parse(sample.tag)
+                    valid = True
+                except AttributeError:
+                    valid = False
+                self.assertEqual(sample.valid, valid)
+
+    def test_is_deterministic(self):
+        self.assertListEqual(generate(100, seed=3), generate(100, seed=3))
+        self.assertNotEqual(generate(100, seed=3), generate(100, seed=4))
+
+    def test_covers_every_shape(self):
+        tags = [sample.tag for sample in generate(2000)]
+        self.assertTrue(any('@' in tag for tag in tags))
+        self.assertTrue(any('%' in tag for tag in tags))
+        self.assertTrue(any('#' in tag for tag in tags))
+        dates = {len(sample.date) for sample in generate(2000)}
+        self.assertTrue({4, 7, 10} <= dates)
+
+class SuiteTestCase(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.baselines = os.path.join(directory.name, 'baselines.json')
+
+    def run_suite(self, *arguments):
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            status = main(['--count', '200', '--repeat', '1',
+                           '--baselines', self.baselines, *arguments])
+        return status, output.getvalue()
+
+    def test_saves_and_compares_baselines(self):
+        self.assertEqual(0, self.run_suite('--save')[0])
+        with open(self.baselines) as source:
+            self.assertSetEqual(set(BENCHMARKS), set(json.load(source)['benchmarks']))
+        self.assertEqual(0, self.run_suite('--tolerance', '100')[0])
+
+    def test_regressions_fail(self):
+        self.run_suite('--save', '-k', 'validator.parse_date')
+        with open(self.baselines) as source:
+            baselines = json.load(source)
+        baselines['benchmarks']['validator.parse_date'] /= 100
+        with open(self.baselines, 'w') as target:
+            json.dump(baselines, target)
+        status, output = self.run_suite('-k', 'validator.parse_date')
+        self.assertEqual(1, status)
+        self.assertIn('REGRESSION', output)
+
+    @unittest.skipUnless(os.environ.get('TAGURI_BENCHMARKS'),
+                         'set TAGURI_BENCHMARKS=1 to check the stored baselines')
+    def test_stored_baselines(self):
+        self.assertEqual(0, main([]))
@@ -0,0 +1,141 @@
+import mmap
+import os
+import tempfile
+from unittest import TestCase
+
+from corpus import corpus_tags
+from taguri.buffer import BytesTag, parse_buffer, parse_bytes, try_parse_bytes
+from taguri.bulk import ErrorRecord, parse_many
+from taguri.errors import ErrorCode, TagError
+from taguri.instrumentation import MetricsRecorder, instrumented
+from taguri.tag import try_parse
+
+TAGS = (
+    b'tag:example.com,2018:Books',
+    b'tag:example.com:Books',
+    b'tag:john@example.org,2016-01:Memoir#Intro',
+)
+
+class ParseBytesTestCase(TestCase):
+
+    def test_components(self):
+        for kind in (bytes, bytearray, memoryview):
+            with self.subTest(kind=kind):
+                data = kind(b'tag:alice.example.org,2018-11-22:Books#Doe')
+                parsed = parse_bytes(data)
+                self.assertEqual(b'alice.example.org', parsed.authority_name)
+                self.assertEqual(b'2018-11-22', parsed.date)
+                self.assertEqual(b'alice.example.org,2018-11-22', parsed.tagging_entity)
+                self.assertEqual(b'Books', parsed.specific)
+                self.assertEqual(b'Doe', parsed.fragment)
+                self.assertEqual(bytes(data), bytes(parsed))
+
+    def test_components_are_views(self):
+        data = bytearray(b'tag:example.org,2018:Books')
+        parsed = parse_bytes(data)
+        self.assertIsInstance(parsed.specific, memoryview)
+        self.assertIs(data, parsed.specific.obj)
+        data[-1:] = b'S'
+        self.assertEqual(b'BookS', parsed.specific)
+        self.assertIsNone(parsed.fragment)
+
+    def test_offsets_into_buffer(self):
+        data = b'<id>tag:example.org,2018:Books#Doe</id>'
+        parsed = parse_bytes(data, 4, 34)
+        self.assertEqual((4, 34), parsed.span)
+        self.assertEqual((19, 24, 30), parsed.offsets)
+        self.assertEqual(b'Books', parsed.specific)
+        error = try_parse_bytes(data, 4, 35).error
+        self.assertEqual(TagError(ErrorCode.INVALID_FRAGMENT, 34), error)
+
+    def test_decode(self):
+        parsed = parse_bytes(b'  tag:example.org,2018:Books#Doe', 2).decode()
+        self.assertEqual('tag:example.org,2018:Books#Doe', parsed.tag)
+        self.assertEqual('Doe', parsed.fragment)
+
+    def test_same_results_as_str(self):
+        tags = corpus_tags(2000, invalid_share=0.3)
+        tags += ['tag:a+b@example.com,2018-1-5:x', 'tag:exámple.com,2018:x',
+                 'tag:example.com,2016-02-29:x', 'tag:example.com,2018:xÿ']
+        for tag in tags:
+            with self.subTest(tag=tag):
+                expected = try_parse(tag)
+                result = try_parse_bytes(tag.encode('utf-8'))
+                if expected:
+                    self.assertEqual(expected.tag, result.tag.decode())
+                    self.assertEqual(expected.tag.offsets, result.tag.offsets)
+                elif tag.isascii():
+                    self.assertEqual(expected.error, result.error)
+                else:
+                    self.assertEqual(expected.error.code, result.error.code)
+
+    def test_raises(self):
+        with self.assertRaisesRegex(AttributeError, 'invalid tagging entity'):
+            parse_bytes(TAGS[1])
+
+    def test_instrumented(self):
+        recorder = MetricsRecorder()
+        with instrumented(recorder):
+            list(parse_buffer(b'\n'.join(TAGS), 'skip'))
+        self.assertEqual(2, recorder.parsed_count)
+        self.assertDictEqual({'tagging_entity': 1}, recorder.rejections())
+
+class ParseBufferTestCase(TestCase):
+
+    def test_record_policy(self):
+        results = list(parse_buffer(b'\r\n'.join(TAGS) + b'\n', 'record'))
+        self.assertEqual(3, len(results))
+        self.assertIsInstance(results[0], BytesTag)
+        self.assertEqual(TAGS[0], bytes(results[0]))
+        expected = ErrorRecord(2, TAGS[1].decode(),
+                               'Invalid tag_uri: invalid tagging entity')
+        self.assertEqual(expected, results[1])
+        self.assertEqual(TAGS[2], bytes(results[2]))
+
+    def test_policies(self):
+        data = b'\n'.join(TAGS)
+        skipped = [bytes(result) for result in parse_buffer(data, 'skip')]
+        self.assertListEqual([TAGS[0], TAGS[2]], skipped)
+        results = parse_buffer(data)
+        self.assertEqual(TAGS[0], bytes(next(results)))
+        with self.assertRaises(AttributeError):
+            next(results)
+        with self.assertRaises(ValueError):
+            parse_buffer(data, 'ignore')
+
+    def test_same_results_as_parse_many(self):
+        lines = corpus_tags(2000, invalid_share=0.3)
+        lines += ['', 'tag:a+b@example.com,2018-1-5:x', 'foo\rbar',
+                  'tag:example.com,2018:x tag:example.com,2018:y']
+        data = '\r\n'.join(lines).encode('utf-8')
+        expected = [result if isinstance(result, ErrorRecord) else result.tag
+                    for result in parse_many(lines, 'record')]
+        results = [result if isinstance(result, ErrorRecord)
+                   else result.decode().tag
+                   for result in parse_buffer(data, 'record')]
+        self.assertListEqual(expected, results)
+
+    def test_empty_lines(self):
+        results = list(parse_buffer(b'\n' + TAGS[0], 'record'))
+        self.assertEqual(ErrorRecord(1, '', 'Invalid tag_uri: misses parts'),
+                         results[0])
+        self.assertEqual(TAGS[0], bytes(results[1]))
+        self.assertListEqual([], list(parse_buffer(b'')))
+
+    def test_shares_buffer(self):
+        data = b'\n'.join([TAGS[0], TAGS[2]])
+        first, second = parse_buffer(memoryview(data))
+        self.assertIs(data, first.tag.obj)
+        self.assertIs(data, second.tag.obj)
+        self.assertEqual(b'Intro', second.fragment)
+
+    def test_mmap(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tags.txt')
+            with open(path, 'wb') as output:
+                output.write(b'\n'.join(TAGS))
+            with open(path, 'rb') as source:
+                with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    specifics = [bytes(tag.specific)
+                                 for tag in parse_buffer(data, 'skip')]
+        self.assertListEqual([b'Books', b'Memoir'], specifics)
@@ -0,0 +1,71 @@
+import io
+from unittest import TestCase
+
+from taguri.bulk import ErrorRecord, parse_many
+from taguri.ownership import OwnershipRegistry
+
+TAGS = (
+    'tag:example.com,2018:Books',
+    'tag:example.com:Books',
+    'tag:john@example.org,2016-01:Memoir#Intro',
+)
+
+class ParseManyTestCase(TestCase):
+
+    def test_yields_parsers(self):
+        results = list(parse_many(TAGS[::2]))
+        self.assertEqual(2, len(results))
+        self.assertEqual('Books', results[0].specific)
+        self.assertEqual('Intro', results[1].fragment)
+
+    def test_is_lazy(self):
+        def source():
+            yield TAGS[0]
+            raise RuntimeError('should not be consumed')
+        results = parse_many(source())
+        self.assertEqual(TAGS[0], str(next(results)))
+
+    def test_raise_policy(self):
+        results = parse_many(TAGS)
+        self.assertEqual(TAGS[0], str(next(results)))
+        with self.assertRaises(AttributeError):
+            next(results)
+
+    def test_skip_policy(self):
+        results = [str(result) for result in parse_many(TAGS, errors='skip')]
+        self.assertListEqual([TAGS[0], TAGS[2]], results)
+
+    def test_record_policy(self):
+        results = list(parse_many(TAGS, errors='record'))
+        expected = ErrorRecord(2, TAGS[1],
+                               'Invalid tag_uri: invalid tagging entity')
+        self.assertEqual(expected, results[1])
+        self.assertEqual(TAGS[2], str(results[2]))
+
+    def test_checks_ownership(self):
+        registry = OwnershipRegistry(today='2018-06')
+        registry.add('john@example.org', '2017')
+        results = list(parse_many(TAGS, errors='record', registry=registry))
+        self.assertEqual(TAGS[0], str(results[0]))
+        self.assertEqual(ErrorRecord(3, TAGS[2], 'Invalid tag_uri: unowned authority name'),
+                         results[2])
+        with self.assertRaisesRegex(AttributeError, 'future date'):
+            list(parse_many(['tag:hp.com,2999:x'], registry=registry))
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            parse_many(TAGS, errors='ignore')
+
+    def test_reads_text_files(self):
+        source = io.StringIO('\r\n'.join(TAGS) + '\n')
+        results = list(parse_many(source, errors='record'))
+        self.assertEqual(TAGS[0], str(results[0]))
+        self.assertEqual(2, results[1].lineno)
+        self.assertEqual(TAGS[2], str(results[2]))
+
+    def test_reads_binary_files(self):
+        source = io.BytesIO('\n'.join(TAGS + ('tag:é,2018:x',)).encode())
+        results = list(parse_many(source, errors='record'))
+        self.assertEqual(TAGS[2], str(results[2]))
+        self.assertEqual('tag:é,2018:x', results[3].value)
+        self.assertEqual(4, results[3].lineno)
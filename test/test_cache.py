@@ -0,0 +1,110 @@
+import sys
+import threading
+from unittest import mock, TestCase
+
+from taguri.cache import CacheInfo, EntityCache
+from taguri.parser import TagUriParser
+
+class EntityCacheTestCase(TestCase):
+
+    def test_remembers_valid_entities(self):
+        cache = EntityCache()
+        self.assertIsNone(cache.check('example.com,2018'))
+        with mock.patch('taguri.grammar.authority_name_validator') as validator:
+            self.assertIsNone(cache.check('example.com,2018'))
+            self.assertFalse(validator.called)
+        self.assertEqual(CacheInfo(1, 1, 0, 1024, 1), cache.info())
+
+    def test_remembers_invalid_entities(self):
+        cache = EntityCache()
+        for _ in range(2):
+            self.assertEqual('authority name', cache.check('-example,2018'))
+            self.assertEqual('date', cache.check('example.com,2018-13'))
+            self.assertEqual('tagging entity', cache.check('a,b,2018'))
+        self.assertEqual(CacheInfo(3, 3, 0, 1024, 3), cache.info())
+
+    def test_evicts_least_recently_used(self):
+        cache = EntityCache(maxsize=2)
+        cache.check('a,2018')
+        cache.check('b,2018')
+        cache.check('a,2018')
+        cache.check('c,2018')
+        self.assertIn('a,2018', cache)
+        self.assertNotIn('b,2018', cache)
+        self.assertIn('c,2018', cache)
+        self.assertEqual(CacheInfo(1, 3, 1, 2, 2), cache.info())
+
+    def test_clear(self):
+        cache = EntityCache()
+        cache.check('a,2018')
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(CacheInfo(0, 0, 0, 1024, 0), cache.info())
+
+    def test_shared_between_threads(self):
+        # A small cache keeps evicting the entities other threads use.
+        cache = EntityCache(maxsize=4)
+        entities = [f'host{n}.example.com,2018' for n in range(16)] + ['-a,2018']
+        failures = []
+
+        def run():
+            try:
+                for n in range(5000):
+                    entity = entities[n % len(entities)]
+                    if cache.check(entity) != (None if entity[0] != '-' else 'authority name'):
+                        failures.append(entity)
+            except Exception as error:
+                failures.append(error)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=run) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertListEqual([], failures)
+        info = cache.info()
+        self.assertLessEqual(info.currsize, 4)
+        self.assertEqual(8 * 5000, info.hits + info.misses)
+
+    def test_rejects_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            EntityCache(maxsize=0)
+
+class CachedParserTestCase(TestCase):
+
+    def test_parses_with_cache(self):
+        cache = EntityCache()
+        for specific in ('Books', 'Films#Doe', 'a%20b', 'Caf%C3%A9'):
+            tag_uri = f'tag:example.org,2018:{specific}'
+            with self.subTest(tag_uri=tag_uri):
+                uncached = TagUriParser(tag_uri)
+                cached = TagUriParser(tag_uri, cache=cache)
+                self.assertEqual(uncached.tagtuple(), cached.tagtuple())
+        self.assertEqual(CacheInfo(3, 1, 0, 1024, 1), cache.info())
+
+    def test_raises_same_messages_with_cache(self):
+        test_cases = (
+            'hello.example.com',
+            'urn:example.com,2018:Book',
+            'tag:a,b,2018:Book',
+            'tag:-a,2018:Book',
+            'tag:a,2018-02-30:Book',
+            'tag:a,2018:Book#a b',
+            'tag:a,2018:Book#a#b',
+            'tag:a,2018:Bo ok',
+        )
+        cache = EntityCache()
+        for tag_uri in test_cases:
+            with self.subTest(tag_uri=tag_uri):
+                with self.assertRaises(AttributeError) as expected:
+                    TagUriParser(tag_uri)
+                for _ in range(2):
+                    with self.assertRaises(AttributeError) as context:
+                        TagUriParser(tag_uri, cache=cache)
+                    self.assertEqual(str(expected.exception),
+                                     str(context.exception))
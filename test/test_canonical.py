@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from taguri.canonical import canonicalize, tags_equal
+from taguri.tag import ParsedTag
+
+class CanonicalizeTestCase(TestCase):
+
+    def test_canonical_tags_are_kept(self):
+        tag_uri = 'tag:john@example.com,2018:Books/a%2F#Doe'
+        self.assertIs(tag_uri, canonicalize(tag_uri))
+        tag_uri = 'tag:example.com,2018:Books'
+        self.assertIs(tag_uri, canonicalize(tag_uri))
+
+    def test_lowercases_dns_names(self):
+        self.assertEqual('tag:example.com,2018:Books',
+                         canonicalize('tag:Example.COM,2018:Books'))
+        self.assertEqual('tag:John.Doe@example.com,2018:Books',
+                         canonicalize('tag:John.Doe@EXAMPLE.com,2018:Books'))
+
+    def test_normalizes_pct_encoding(self):
+        test_cases = (
+            ('a%2f', 'a%2F'),
+            ('%7e%41%30%2D', '~A0-'),
+            ('%3a%23#%5fx%c3%a9', '%3A%23#_x%C3%A9'),
+        )
+        for specific, expected in test_cases:
+            with self.subTest(specific=specific):
+                self.assertEqual(f'tag:a,2018:{expected}',
+                                 canonicalize(f'tag:a,2018:{specific}'))
+
+    def test_rejects_invalid_tags(self):
+        with self.assertRaises(AttributeError):
+            canonicalize('tag:example.com:Books')
+
+    def test_tags_equal(self):
+        first = 'tag:Example.com,2018:a%7e'
+        second = 'tag:example.com,2018:a~'
+        self.assertTrue(tags_equal(first, first))
+        self.assertFalse(tags_equal(first, second))
+        self.assertTrue(tags_equal(first, second, lenient=True))
+        self.assertFalse(tags_equal(first, 'tag:example.com,2019:a~',
+                                    lenient=True))
+
+class ParsedTagCanonicalTestCase(TestCase):
+
+    def test_canonical_is_cached(self):
+        parsed = ParsedTag.parse('tag:Example.com,2018:a%7e')
+        self.assertEqual('tag:example.com,2018:a~', parsed.canonical)
+        self.assertIs(parsed.canonical, parsed.canonical)
+
+    def test_equals(self):
+        first = ParsedTag.parse('tag:Example.com,2018:a%7e')
+        second = ParsedTag.parse('tag:example.com,2018:a~')
+        self.assertNotEqual(first, second)
+        self.assertFalse(first.equals(second))
+        self.assertTrue(first.equals(second, lenient=True))
+
+    def test_deduplicates_by_canonical_form(self):
+        tags = [ParsedTag.parse(tag) for tag in (
+            'tag:Example.com,2018:a%7e',
+            'tag:example.com,2018:a~',
+            'tag:EXAMPLE.COM,2018:a%7E',
+            'tag:example.com,2018:b',
+        )]
+        self.assertEqual(4, len(set(tags)))
+        self.assertEqual(2, len({tag.canonical for tag in tags}))
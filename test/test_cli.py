@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr
+from unittest import TestCase
+
+from taguri.cli import main, read_errors, split_chunks, validate, validate_chunk
+
+LINES = [f'tag:example.org,2018:Books/{n}' for n in range(100)]
+LINES[10] = 'tag:example.org:Books/10'
+LINES[77] = 'tag:example.org,2018:Books 77'
+
+class CliTestCase(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'tags.txt')
+        with open(self.path, 'w') as tags:
+            tags.write('\n'.join(LINES) + '\n')
+
+    def test_split_chunks_aligns_to_lines(self):
+        chunks = split_chunks(self.path, 7)
+        self.assertEqual(7, len(chunks))
+        self.assertEqual(0, chunks[0][0])
+        self.assertEqual(os.path.getsize(self.path), chunks[-1][1])
+        with open(self.path, 'rb') as tags:
+            for start, stop in chunks[1:]:
+                tags.seek(start - 1)
+                self.assertEqual(b'\n', tags.read(1))
+
+    def test_split_chunks_of_small_files(self):
+        with open(self.path, 'w') as tags:
+            tags.write(LINES[0])
+        self.assertListEqual([(0, len(LINES[0]))], split_chunks(self.path, 8))
+
+    def test_validate_chunk(self):
+        start, stop = split_chunks(self.path, 1)[0]
+        report = validate_chunk(self.path, start, stop)
+        self.addCleanup(os.remove, report.errors_path)
+        self.assertEqual(100, report.lines)
+        self.assertEqual(2, report.invalid)
+        errors = list(read_errors(report.errors_path))
+        self.assertListEqual([11, 78], [error.lineno for error in errors])
+        self.assertEqual(LINES[77], errors[1].value)
+
+    def test_validate_chunk_without_errors(self):
+        start, stop = split_chunks(self.path, 1)[0]
+        report = validate_chunk(self.path, start, start + len(LINES[0]) + 1)
+        self.assertEqual(1, report.lines)
+        self.assertEqual(0, report.invalid)
+        self.assertIsNone(report.errors_path)
+
+    def test_read_errors_keeps_tabs(self):
+        with open(self.path, 'w') as tags:
+            tags.write('tag:example.org,2018:a\tb\n')
+        report = validate_chunk(self.path, *split_chunks(self.path, 1)[0])
+        self.addCleanup(os.remove, report.errors_path)
+        self.assertEqual('tag:example.org,2018:a\tb',
+                         next(read_errors(report.errors_path)).value)
+
+    def test_read_errors_keeps_carriage_returns(self):
+        with open(self.path, 'wb') as tags:
+            tags.write(b'tag:a,2018:x\ry\ntag:a,2018:z\n')
+        report = validate_chunk(self.path, *split_chunks(self.path, 1)[0])
+        self.addCleanup(os.remove, report.errors_path)
+        errors = list(read_errors(report.errors_path))
+        self.assertEqual(1, len(errors))
+        self.assertEqual(1, errors[0].lineno)
+        self.assertEqual('tag:a,2018:x\ry', errors[0].value)
+
+    def test_validate_reports_invalid_lines(self):
+        for jobs in (1, 3):
+            with self.subTest(jobs=jobs):
+                output, summary = io.StringIO(), io.StringIO()
+                self.assertEqual(2, validate(self.path, jobs, output, summary))
+                self.assertListEqual([
+                    '11: Invalid tag_uri: invalid tagging entity: '
+                    'tag:example.org:Books/10',
+                    '78: Invalid tag_uri: invalid specific: '
+                    'tag:example.org,2018:Books 77',
+                ], output.getvalue().splitlines())
+                self.assertTrue(summary.getvalue().startswith(
+                    '100 lines, 98 valid, 2 invalid'))
+
+    def test_rejects_invalid_jobs(self):
+        for jobs in (0, -2):
+            with self.subTest(jobs=jobs):
+                with self.assertRaisesRegex(ValueError, 'Invalid jobs'):
+                    validate(self.path, jobs, io.StringIO(), io.StringIO())
+                with redirect_stderr(io.StringIO()) as error:
+                    with self.assertRaises(SystemExit):
+                        main(['validate', self.path, '--jobs', str(jobs)])
+                self.assertIn('invalid positive number', error.getvalue())
+
+    def test_main_exit_status(self):
+        with open(self.path, 'w') as tags:
+            tags.write('\n'.join(LINES[:10]))
+        summary = io.StringIO()
+        with redirect_stderr(summary):
+            self.assertEqual(0, main(['validate', self.path, '--jobs', '1']))
@@ -0,0 +1,86 @@
+import tempfile
+from unittest import mock, TestCase
+
+from taguri import dedup
+from taguri.dedup import BloomFilter, DedupInfo, Deduplicator, partition_of
+from taguri.tag import ParsedTag
+
+class BloomFilterTestCase(TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f'tag:example.com,2018:{n}' for n in range(1000)]
+        self.assertFalse(any(bloom.add(key) for key in keys[:1]))
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        self.assertTrue(bloom.add(keys[0]))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(2000, 0.01)
+        for n in range(2000):
+            bloom.add(f'seen-{n}')
+        false_positives = sum(f'unseen-{n}' in bloom for n in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_rejects_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            BloomFilter(0)
+        with self.assertRaises(ValueError):
+            BloomFilter(10, 1.5)
+
+class DeduplicatorTestCase(TestCase):
+
+    def test_unique(self):
+        tags = [f'tag:example{n % 3}.com,2018:{n % 50}' for n in range(500)]
+        with Deduplicator(capacity=100, partitions=2) as deduplicator:
+            unique = list(deduplicator.unique(tags))
+            self.assertEqual(150, len(unique))
+            self.assertEqual(len(unique), len(set(unique)))
+            info = deduplicator.info()
+        self.assertEqual(500, info.tags)
+        self.assertEqual(350, info.duplicates)
+
+    def test_confirms_false_positives(self):
+        with Deduplicator(capacity=10) as deduplicator:
+            with mock.patch.object(BloomFilter, 'add', return_value=True):
+                self.assertTrue(deduplicator.add('tag:a,2018:x'))
+                self.assertFalse(deduplicator.add('tag:a,2018:x'))
+            self.assertEqual(DedupInfo(2, 1, 1), deduplicator.info())
+
+    def test_spills_to_disk(self):
+        with Deduplicator(capacity=100) as deduplicator:
+            with mock.patch.object(dedup, 'SPILL_BATCH_SIZE', 2):
+                for n in range(5):
+                    self.assertTrue(deduplicator.add(f'tag:a,2018:{n}'))
+                for n in range(5):
+                    self.assertFalse(deduplicator.add(f'tag:a,2018:{n}'))
+
+    def test_resumes_from_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with Deduplicator(capacity=100, directory=directory) as deduplicator:
+                self.assertTrue(deduplicator.add('tag:a,2018:x'))
+            with Deduplicator(capacity=100, directory=directory) as deduplicator:
+                self.assertFalse(deduplicator.add('tag:a,2018:x'))
+                self.assertTrue(deduplicator.add('tag:a,2018:y'))
+
+    def test_lenient(self):
+        tags = ['tag:a,2018:x%7e', 'tag:a,2018:x~', 'tag:A,2018:x~']
+        with Deduplicator(capacity=10, partitions=64, lenient=True) as deduplicator:
+            self.assertEqual(1, len(list(deduplicator.unique(tags))))
+        with Deduplicator(capacity=10) as deduplicator:
+            self.assertEqual(3, len(list(deduplicator.unique(tags))))
+
+    def test_partitions_by_tagging_entity(self):
+        first = ParsedTag.parse('tag:example.com,2018:x')
+        second = ParsedTag.parse('tag:example.com,2018:y')
+        self.assertEqual(partition_of(first, 16), partition_of(second, 16))
+        self.assertLess(partition_of(first, 16), 16)
+        upper = ParsedTag.parse('tag:EXAMPLE.com,2018:x')
+        self.assertEqual(partition_of(first, 64),
+                         partition_of(upper, 64, lenient=True))
+
+    def test_rejects_invalid_tags(self):
+        with Deduplicator(capacity=10) as deduplicator:
+            with self.assertRaises(AttributeError):
+                deduplicator.add('tag:example.com:x')
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from taguri.errors import ErrorCode, TagError
+from taguri.instrumentation import REJECTION_REASONS
+
+class ErrorCodeTestCase(TestCase):
+
+    def test_messages(self):
+        messages = {
+            ErrorCode.MISSES_PARTS: 'Invalid tag_uri: misses parts',
+            ErrorCode.INVALID_PREFIX: 'Invalid tag_uri: invalid prefix',
+            ErrorCode.INVALID_TAGGING_ENTITY: 'Invalid tag_uri: invalid tagging entity',
+            ErrorCode.INVALID_AUTHORITY_NAME: 'Invalid tag_uri: invalid authority name',
+            ErrorCode.INVALID_DATE: 'Invalid tag_uri: invalid date',
+            ErrorCode.TOO_MANY_FRAGMENTS: 'Invalid tag_uri: too many fragments',
+            ErrorCode.INVALID_FRAGMENT: 'Invalid tag_uri: invalid fragment',
+            ErrorCode.INVALID_SPECIFIC: 'Invalid tag_uri: invalid specific',
+        }
+        self.assertEqual(len(ErrorCode), len(messages))
+        for code, message in messages.items():
+            with self.subTest(code=code):
+                self.assertEqual(message, code.message)
+                self.assertEqual(message, TagError(code, 0).message)
+
+    def test_reasons(self):
+        self.assertEqual('date', ErrorCode.INVALID_DATE.reason)
+        self.assertEqual('misses_parts', ErrorCode.MISSES_PARTS.reason)
+        self.assertEqual('invalid authority name',
+                         ErrorCode.INVALID_AUTHORITY_NAME.description)
+        for code in ErrorCode:
+            with self.subTest(code=code):
+                self.assertEqual(code.reason, REJECTION_REASONS[code.message])
+
+    def test_ordered_like_checks(self):
+        self.assertLess(ErrorCode.INVALID_AUTHORITY_NAME, ErrorCode.INVALID_DATE)
+        self.assertLess(ErrorCode.INVALID_FRAGMENT, ErrorCode.INVALID_SPECIFIC)
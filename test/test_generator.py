@@ -0,0 +1,151 @@
+import os
+import tempfile
+import threading
+from unittest import mock, TestCase
+
+from taguri.generator import (
+    BlockAllocator,
+    BlockIdGenerator,
+    IdGenerator,
+    SequenceIdGenerator,
+    TimeOrderedIdGenerator,
+)
+from taguri.minter import TagUriMinter
+from taguri.parser import TagUriParser
+
+def mint_concurrently(generator, threads=8, count=2000):
+    tags = []
+    def worker():
+        minted = [generator.mint() for _ in range(count)]
+        tags.extend(minted)
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return tags
+
+class TornFile:
+    """A file whose writes fail after writing a few bytes."""
+
+    def __init__(self, file, size):
+        self.file = file
+        self.size = size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+    def write(self, data):
+        self.file.write(data[:self.size])
+        self.file.flush()
+        raise OSError('Interrupted write')
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+class IdGeneratorTestCase(TestCase):
+
+    def test_is_abstract(self):
+        with self.assertRaises(TypeError):
+            IdGenerator(TagUriMinter('example.org', '2018'))
+
+class SequenceIdGeneratorTestCase(TestCase):
+
+    def setUp(self):
+        self.minter = TagUriMinter('example.org', '2018')
+
+    def test_mints_sequence(self):
+        generator = SequenceIdGenerator(self.minter, 'Books/', start=5)
+        self.assertEqual('tag:example.org,2018:Books/5', generator.mint())
+        self.assertEqual('tag:example.org,2018:Books/6', next(generator))
+
+    def test_rejects_invalid_prefix(self):
+        with self.assertRaises(AttributeError):
+            SequenceIdGenerator(self.minter, 'Bad Prefix/')
+
+    def test_is_thread_safe(self):
+        tags = mint_concurrently(SequenceIdGenerator(self.minter))
+        self.assertEqual(16000, len(set(tags)))
+
+class TimeOrderedIdGeneratorTestCase(TestCase):
+
+    def setUp(self):
+        self.minter = TagUriMinter('example.org', '2018')
+
+    def test_mints_valid_sortable_tags(self):
+        generator = TimeOrderedIdGenerator(self.minter, 'Events/', node=3)
+        tags = [generator.mint() for _ in range(100)]
+        self.assertListEqual(tags, sorted(tags))
+        parser = TagUriParser(tags[0])
+        self.assertTrue(parser.specific.startswith('Events/'))
+        self.assertEqual('0003', parser.specific.split('-')[1])
+
+    def test_rejects_invalid_node(self):
+        with self.assertRaises(ValueError):
+            TimeOrderedIdGenerator(self.minter, node=70000)
+
+    def test_is_thread_safe(self):
+        tags = mint_concurrently(TimeOrderedIdGenerator(self.minter))
+        self.assertEqual(16000, len(set(tags)))
+
+class BlockIdGeneratorTestCase(TestCase):
+
+    def setUp(self):
+        self.minter = TagUriMinter('example.org', '2018')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'books.seq')
+
+    def test_reserves_blocks(self):
+        first = BlockAllocator(self.path, block_size=10, start=100)
+        second = BlockAllocator(self.path, block_size=5)
+        self.assertTupleEqual((100, 110), first.reserve())
+        self.assertTupleEqual((110, 115), second.reserve())
+        self.assertTupleEqual((115, 125), first.reserve())
+        with open(self.path) as state:
+            self.assertEqual('00000000000000000125', state.read())
+
+    def test_survives_interrupted_writes(self):
+        allocator = BlockAllocator(self.path, block_size=900)
+        self.assertTupleEqual((0, 900), allocator.reserve())
+        for written in range(20):
+            with self.subTest(written=written):
+                with mock.patch('taguri.generator.os.fdopen',
+                                lambda *args: TornFile(open(*args), written)):
+                    with self.assertRaises(OSError):
+                        allocator.reserve()
+                with open(self.path) as state:
+                    start = int(state.read())
+                self.assertGreaterEqual(start, 900)
+                self.assertEqual(start, allocator.reserve()[0])
+
+    def test_requires_fcntl(self):
+        with mock.patch('taguri.generator.fcntl', None):
+            with self.assertRaisesRegex(RuntimeError, 'fcntl'):
+                BlockAllocator(self.path)
+
+    def test_rejects_invalid_block_size(self):
+        with self.assertRaises(ValueError):
+            BlockAllocator(self.path, block_size=0)
+
+    def test_mints_from_blocks(self):
+        allocator = BlockAllocator(self.path, block_size=2)
+        generator = BlockIdGenerator(self.minter, allocator, 'Books/')
+        other = BlockIdGenerator(self.minter, allocator, 'Books/')
+        self.assertEqual('tag:example.org,2018:Books/0', generator.mint())
+        self.assertEqual('tag:example.org,2018:Books/2', other.mint())
+        self.assertEqual('tag:example.org,2018:Books/1', generator.mint())
+        self.assertEqual('tag:example.org,2018:Books/4', generator.mint())
+
+    def test_is_thread_safe(self):
+        generators = [
+            BlockIdGenerator(self.minter, BlockAllocator(self.path, 100))
+            for _ in range(2)
+        ]
+        tags = []
+        for generator in generators:
+            tags += mint_concurrently(generator, threads=4)
+        self.assertEqual(16000, len(set(tags)))
@@ -0,0 +1,178 @@
+import itertools
+import random
+from unittest import TestCase
+
+from taguri.cache import EntityCache
+from taguri.grammar import (
+    split_tag,
+    tag_offsets,
+    valid_authority_name,
+    valid_date,
+    valid_specific,
+)
+from taguri.validator import (
+    authority_name_validator,
+    date_validator,
+    specific_validator,
+)
+
+def reference_parse(tag_uri):
+    """The step by step parser, as TagUriParser used to implement it."""
+    tokens = tag_uri.split(':', maxsplit=2)
+    if len(tokens) != 3:
+        raise AttributeError('Invalid tag_uri: misses parts')
+    prefix, tagging_entity, specific = tokens
+    if prefix != 'tag':
+        raise AttributeError('Invalid tag_uri: invalid prefix')
+    try:
+        authority_name, date = tagging_entity.split(',')
+        if not authority_name_validator(authority_name):
+            raise AttributeError('Invalid tag_uri: invalid authority name')
+        if not date_validator(date):
+            raise AttributeError('Invalid tag_uri: invalid date')
+    except ValueError:
+        raise AttributeError('Invalid tag_uri: invalid tagging entity')
+    fragment = None
+    if '#' in specific:
+        try:
+            specific, fragment = specific.split('#')
+            if not specific_validator(fragment):
+                raise AttributeError('Invalid tag_uri: invalid fragment')
+        except ValueError:
+            raise AttributeError('Invalid tag_uri: too many fragments')
+    if not specific_validator(specific):
+        raise AttributeError('Invalid tag_uri: invalid specific')
+    return authority_name, date, specific, fragment
+
+def outcome(parse, tag_uri):
+    try:
+        return parse(tag_uri)
+    except AttributeError as error:
+        return str(error)
+
+def lazy_components(tag_uri):
+    # The lazy parser splits first, and validates the components later.
+    comma, colon, hash = split_tag(tag_uri)
+    fragment = tag_uri[hash + 1:] if hash < len(tag_uri) else None
+    result = tag_uri[4:comma], tag_uri[comma + 1:colon], tag_uri[colon + 1:hash], fragment
+    if not (valid_authority_name(result[0]) and valid_date(result[1])
+            and valid_specific(result[2])
+            and (fragment is None or valid_specific(fragment))):
+        raise AttributeError('Invalid tag_uri: invalid component')
+    return result
+
+def components(tag_uri, cache=None):
+    comma, colon, hash = tag_offsets(tag_uri, cache)
+    fragment = tag_uri[hash + 1:] if hash < len(tag_uri) else None
+    return tag_uri[4:comma], tag_uri[comma + 1:colon], tag_uri[colon + 1:hash], fragment
+
+AUTHORITY_NAMES = (
+    'example.com', 'Windows-PC', 'a', 'a-b--c.d1', 'john.doe+tag@example.org',
+    '.x@example.org', '-example.com', 'example-.com', 'example..com',
+    'a@b@c', '@example.com', 'user@', '', 'ex ample', 'exämple.com',
+    'example.com\n',
+)
+DATES = (
+    '2018', '2018-11', '2018-11-26', '0001', '0000', '9999-12-31',
+    '2016-02-29', '2018-02-29', '2000-02-29', '1900-02-29', '2018-04-31',
+    '2018-1', '2018-01-1', '2018-01- 1', '2018-13', '1999-12-32', '341',
+    '20180', '2018-', 'year', '', '٢٠١٨',
+)
+SPECIFICS = (
+    '', 'Books', 'path/to/resource.html', 'C:/Users/Memoir.pdf', '(hi)!',
+    'hello%20world', '%2f%2F', '%', '%4', '%GG', 'a space', '<b>', 'é',
+    '²', 'a,b;c=d', '~user', 'x\n',
+)
+FRAGMENTS = (None, '', 'Doe', 'a%20b', 'a b', 'x#y', '%zz')
+
+class TagOffsetsTestCase(TestCase):
+
+    def test_offsets_of_tag_with_fragment(self):
+        self.assertTupleEqual((15, 20, 26),
+                              tag_offsets('tag:example.com,2018:Books#Doe'))
+
+    def test_offsets_of_tag_without_fragment(self):
+        self.assertTupleEqual((15, 20, 26),
+                              tag_offsets('tag:example.com,2018:Books'))
+
+    def test_offsets_of_tag_with_empty_fragment(self):
+        self.assertTupleEqual((15, 20, 26),
+                              tag_offsets('tag:example.com,2018:Books#'))
+
+    def test_raises_parser_messages(self):
+        test_cases = (
+            ('hello.example.com', 'Invalid tag_uri: misses parts'),
+            ('urn:example.com,2018:Book', 'Invalid tag_uri: invalid prefix'),
+            ('tag:a,b,2018:Book', 'Invalid tag_uri: invalid tagging entity'),
+            ('tag:-a,2018:Book', 'Invalid tag_uri: invalid authority name'),
+            ('tag:a,2018-02-30:Book', 'Invalid tag_uri: invalid date'),
+            ('tag:a,2018:Book#a b', 'Invalid tag_uri: invalid fragment'),
+            ('tag:a,2018:Book#a#b', 'Invalid tag_uri: too many fragments'),
+            ('tag:a,2018:Bo ok', 'Invalid tag_uri: invalid specific'),
+        )
+        for tag_uri, message in test_cases:
+            with self.subTest(tag_uri=tag_uri):
+                with self.assertRaises(AttributeError) as context:
+                    tag_offsets(tag_uri)
+                self.assertEqual(message, str(context.exception))
+
+class ComponentValidatorsTestCase(TestCase):
+
+    def test_same_as_validators(self):
+        for function, validator, values in (
+                (valid_authority_name, authority_name_validator, AUTHORITY_NAMES),
+                (valid_date, date_validator, DATES),
+                (valid_specific, specific_validator, SPECIFICS)):
+            for value in values:
+                with self.subTest(value=value):
+                    self.assertEqual(bool(validator(value)), function(value))
+
+class DifferentialTestCase(TestCase):
+    """Checks the compiled grammar against the step by step validators."""
+
+    def setUp(self):
+        self.cache = EntityCache(maxsize=64)
+
+    def assertSameOutcome(self, tag_uri):
+        expected = outcome(reference_parse, tag_uri)
+        self.assertEqual(expected, outcome(components, tag_uri))
+        self.assertEqual(expected, outcome(
+            lambda tag_uri: components(tag_uri, self.cache), tag_uri))
+        lazy = outcome(lazy_components, tag_uri)
+        if isinstance(expected, tuple):
+            self.assertEqual(expected, lazy)
+        else:
+            self.assertIsInstance(lazy, str)
+
+    def test_combinations_of_components(self):
+        for authority_name, date, specific, fragment in itertools.product(
+                AUTHORITY_NAMES, DATES, SPECIFICS, FRAGMENTS):
+            tag_uri = f'tag:{authority_name},{date}:{specific}'
+            if fragment is not None:
+                tag_uri = f'{tag_uri}#{fragment}'
+            with self.subTest(tag_uri=tag_uri):
+                self.assertSameOutcome(tag_uri)
+
+    def test_mutated_tags(self):
+        alphabet = 'tag:,#%-.@/ aZ09\n'
+        seeds = (
+            'tag:example.com,2018-11-26:Books/Book#Doe',
+            'tag:john@example.org,2016:a%20b',
+        )
+        rng = random.Random(4151)
+        for seed in seeds:
+            for _ in range(2000):
+                chars = list(seed)
+                for _ in range(rng.randint(1, 3)):
+                    position = rng.randrange(len(chars) + 1)
+                    operation = rng.choice(('insert', 'delete', 'replace'))
+                    if operation == 'insert':
+                        chars.insert(position, rng.choice(alphabet))
+                    elif position < len(chars):
+                        if operation == 'delete':
+                            del chars[position]
+                        else:
+                            chars[position] = rng.choice(alphabet)
+                tag_uri = ''.join(chars)
+                with self.subTest(tag_uri=tag_uri):
+                    self.assertSameOutcome(tag_uri)
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from taguri.index import TagIndex
+from taguri.tag import ParsedTag
+
+TAGS = (
+    'tag:example.com,2017-12-31:Collections/Books/1',
+    'tag:example.com,2018:Collections/Books/2',
+    'tag:example.com,2018-06:Collections/Books/Poetry/3',
+    'tag:example.com,2018-12-31:Collections/Films/4',
+    'tag:john@example.com,2018-02:Collections/Books/5',
+    'tag:example.org,2019:Collections/BooksOld/6#Intro',
+    'tag:example.org,2019:Collections/Books',
+)
+
+def tags(*numbers):
+    return {ParsedTag.parse(TAGS[number]) for number in numbers}
+
+class TagIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.index = TagIndex(TAGS)
+
+    def test_indexes_tags(self):
+        self.assertEqual(7, len(self.index))
+        self.assertIn(TAGS[0], self.index)
+        self.assertIn(ParsedTag.parse(TAGS[1]), self.index)
+        self.assertNotIn('tag:example.com,2018:Other', self.index)
+        self.assertNotIn('not a tag', self.index)
+        self.assertEqual(tags(*range(7)), set(self.index))
+
+    def test_adding_twice_is_a_no_op(self):
+        self.index.add(TAGS[0])
+        self.assertEqual(7, len(self.index))
+        self.index.discard(TAGS[0])
+        self.assertNotIn(TAGS[0], self.index)
+
+    def test_rejects_invalid_tags(self):
+        with self.assertRaises(AttributeError):
+            self.index.add('tag:example.com:Books')
+
+    def test_by_authority_name(self):
+        self.assertEqual(tags(0, 1, 2, 3),
+                         self.index.by_authority_name('example.com'))
+        self.assertEqual(set(), self.index.by_authority_name('example.net'))
+
+    def test_by_tagging_entity(self):
+        self.assertEqual(tags(5, 6),
+                         self.index.by_tagging_entity('example.org,2019'))
+
+    def test_by_date(self):
+        self.assertListEqual([ParsedTag.parse(TAGS[n]) for n in (1, 4, 2, 3)],
+                             self.index.by_date('2018', '2018'))
+        self.assertEqual(tags(4, 2), set(self.index.by_date('2018-02', '2018-06')))
+        self.assertEqual(tags(0), set(self.index.by_date(until='2017')))
+        self.assertEqual(tags(3, 5, 6), set(self.index.by_date('2018-12-31')))
+        with self.assertRaises(AttributeError):
+            self.index.by_date('2018-13')
+
+    def test_by_date_after_adding_and_discarding(self):
+        index = TagIndex(TAGS[4:])
+        self.assertEqual(tags(4), set(index.by_date('2018', '2018')))
+        for tag in TAGS[:4]:
+            index.add(tag)
+        index.discard(TAGS[1])
+        self.assertListEqual([ParsedTag.parse(TAGS[n]) for n in (4, 2, 3)],
+                             index.by_date('2018', '2018'))
+        index.discard(TAGS[6])
+        index.add(TAGS[1])
+        self.assertListEqual([ParsedTag.parse(TAGS[n]) for n in (0, 1, 4, 2, 3, 5)],
+                             index.by_date())
+
+    def test_by_specific_prefix(self):
+        self.assertEqual(tags(0, 1, 2, 4),
+                         self.index.by_specific_prefix('Collections/Books/'))
+        self.assertEqual(tags(0, 1, 2, 4, 5, 6),
+                         self.index.by_specific_prefix('Collections/Books'))
+        self.assertEqual(tags(*range(7)), self.index.by_specific_prefix(''))
+        self.assertEqual(set(), self.index.by_specific_prefix('Other/'))
+
+    def test_search(self):
+        self.assertEqual(tags(1, 2), self.index.search(
+            authority_name='example.com', since='2018', until='2018',
+            specific_prefix='Collections/Books/'))
+        self.assertEqual(tags(*range(7)), self.index.search())
+
+    def test_discard(self):
+        for tag in TAGS[:4]:
+            self.index.discard(tag)
+        self.index.discard('tag:example.com,2018:Missing')
+        self.index.discard('not a tag')
+        self.assertEqual(set(), self.index.by_authority_name('example.com'))
+        self.assertEqual(tags(4), self.index.by_specific_prefix('Collections/Books/'))
+        self.assertEqual(tags(4), set(self.index.by_date('2018', '2018')))
+        self.index.add(TAGS[2])
+        self.assertEqual(tags(2, 4), self.index.by_specific_prefix('Collections/Books/'))
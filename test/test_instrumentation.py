@@ -0,0 +1,165 @@
+from unittest import TestCase
+
+from taguri.bulk import parse_many
+from taguri.cache import EntityCache
+from taguri.instrumentation import (
+    REJECTION_REASONS,
+    STAGES,
+    Instrumentation,
+    MetricsRecorder,
+    get_instrumentation,
+    instrumented,
+    set_instrumentation,
+)
+from taguri.ownership import OwnershipRegistry
+from taguri.parser import TagUriParser
+from taguri.tag import ParsedTag
+
+REJECTED = {
+    'tag:example.com': 'misses_parts',
+    'urn:example.com,2018:x': 'prefix',
+    'tag:example.com:x': 'tagging_entity',
+    'tag:-example.com,2018:x': 'authority_name',
+    'tag:example.com,2018-02-30:x': 'date',
+    'tag:example.com,2018:x#y#z': 'too_many_fragments',
+    'tag:example.com,2018:x#y z': 'fragment',
+    'tag:example.com,2018:x y': 'specific',
+}
+UNOWNED = {
+    'tag:example.com,2999:x': 'future_date',
+    'tag:example.com,2010:x': 'unowned_authority_name',
+    'tag:example.org,2018:x': 'unknown_authority_name',
+}
+
+def registry():
+    registry = OwnershipRegistry(today='2020', strict=True)
+    registry.add('example.com', '2015')
+    return registry
+
+def parse_all(tags, cache=None):
+    for tag in tags:
+        try:
+            ParsedTag.parse(tag, cache)
+        except AttributeError:
+            pass
+
+class InstrumentationTestCase(TestCase):
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_instrumentation())
+
+    def test_set_instrumentation(self):
+        hooks = Instrumentation()
+        self.assertIsNone(set_instrumentation(hooks))
+        self.assertIs(hooks, set_instrumentation(None))
+        self.assertIsNone(get_instrumentation())
+
+    def test_instrumented_restores_previous(self):
+        outer, inner = Instrumentation(), Instrumentation()
+        with instrumented(outer):
+            with self.assertRaises(RuntimeError), instrumented(inner):
+                self.assertIs(inner, get_instrumentation())
+                raise RuntimeError
+            self.assertIs(outer, get_instrumentation())
+        self.assertIsNone(get_instrumentation())
+
+    def test_base_hooks_do_nothing(self):
+        with instrumented(Instrumentation()):
+            parse_all(['tag:example.com,2018:x'] + list(REJECTED))
+
+class MetricsRecorderTestCase(TestCase):
+
+    def test_counts_every_reason(self):
+        self.assertSetEqual(set(REJECTION_REASONS.values()),
+                            set(REJECTED.values()) | set(UNOWNED.values()))
+        for cache in (None, EntityCache()):
+            for timings in (False, True):
+                with self.subTest(cache=cache, timings=timings):
+                    recorder = MetricsRecorder(timings=timings)
+                    with instrumented(recorder):
+                        parse_all(['tag:example.com,2018:x'] * 3 + list(REJECTED),
+                                  cache)
+                    self.assertEqual(3, recorder.parsed_count)
+                    expected = {reason: 1 for reason in REJECTED.values()}
+                    self.assertDictEqual(expected, recorder.rejections())
+
+    def test_counts_ownership_rejections(self):
+        tags = ['tag:example.com,2018:x'] + list(UNOWNED) + list(REJECTED)
+        expected = {reason: 1 for reason in UNOWNED.values()}
+        expected.update((reason, 1) for reason in REJECTED.values())
+        for timings in (False, True):
+            with self.subTest(timings=timings):
+                recorder = MetricsRecorder(timings=timings)
+                with instrumented(recorder):
+                    results = list(parse_many(tags, 'record', registry=registry()))
+                    for tag in tags:
+                        try:
+                            TagUriParser(tag, registry=registry())
+                        except AttributeError:
+                            pass
+                self.assertEqual(1, len([result for result in results
+                                         if type(result) is ParsedTag]))
+                self.assertEqual(2, recorder.parsed_count)
+                self.assertDictEqual({reason: count * 2
+                                      for reason, count in expected.items()},
+                                     recorder.rejections())
+                for result in results[1:]:
+                    self.assertIn(result.reason, REJECTION_REASONS)
+
+    def test_same_results_when_timed(self):
+        recorder = MetricsRecorder(timings=True)
+        tags = ['tag:example.com,2018:Books#Doe'] + list(REJECTED)
+        for tag in tags:
+            with self.subTest(tag=tag):
+                try:
+                    expected = ParsedTag.parse(tag).offsets
+                except AttributeError as error:
+                    expected = str(error)
+                with instrumented(recorder):
+                    try:
+                        result = ParsedTag.parse(tag).offsets
+                    except AttributeError as error:
+                        result = str(error)
+                self.assertEqual(expected, result)
+
+    def test_timings(self):
+        recorder = MetricsRecorder(timings=True, buckets=(1e-9, 1.0))
+        with instrumented(recorder):
+            parse_all(['tag:example.com,2018:x#y', 'tag:example.com,2018:x'])
+        for stage in STAGES:
+            histogram = recorder.histogram(stage)
+            expected = 1 if stage == 'fragment' else 2
+            with self.subTest(stage=stage):
+                self.assertEqual(expected, histogram.count)
+                self.assertEqual(expected, histogram.buckets[-1][1])
+                self.assertEqual(1.0, histogram.buckets[1][0])
+                self.assertGreater(histogram.sum, 0)
+
+    def test_no_timings_unless_enabled(self):
+        recorder = MetricsRecorder()
+        with instrumented(recorder):
+            parse_all(['tag:example.com,2018:x'])
+        self.assertEqual(0, recorder.histogram('date').count)
+        self.assertDictEqual({}, recorder.snapshot()['stages'])
+
+    def test_reset(self):
+        recorder = MetricsRecorder(timings=True)
+        with instrumented(recorder):
+            parse_all(list(REJECTED))
+        recorder.reset()
+        self.assertEqual(0, recorder.parsed_count)
+        self.assertDictEqual({}, recorder.rejections())
+        self.assertEqual(0, recorder.histogram('specific').count)
+
+    def test_export(self):
+        recorder = MetricsRecorder(timings=True, buckets=(1.0,))
+        with instrumented(recorder):
+            parse_all(['tag:example.com,2018:x', 'tag:example.com,2018-13:x'])
+        metrics = []
+        recorder.export(lambda *metric: metrics.append(metric), prefix='tags')
+        self.assertIn(('tags_parsed_total', 1, {}), metrics)
+        self.assertIn(('tags_rejected_total', 1, {'reason': 'date'}), metrics)
+        self.assertIn(('tags_stage_seconds_bucket', 2,
+                       {'stage': 'date', 'le': '+Inf'}), metrics)
+        self.assertIn(('tags_stage_seconds_count', 1, {'stage': 'specific'}),
+                      metrics)
@@ -1,4 +1,7 @@
 from unittest import mock, TestCase
+from taguri.bulk import ErrorRecord
+from taguri.cache import EntityCache
+from taguri.errors import ErrorCode, TagError
 from taguri.minter import TagUriMinter
 
 class TagUriMinterTestCase(TestCase):
@@ -54,4 +57,100 @@ class TagUriMinterTestCase(TestCase):
         with self.assertRaises(AttributeError):
             minter = TagUriMinter('alice.example.org', '2018-11-21')
             minter.mint('Invalid/Item', 'DoeFragment')
-        self.assertEqual(2, validator.call_count)
\ No newline at end of file
+        self.assertEqual(2, validator.call_count)
+
+    def test_minter_checks(self):
+        minter = TagUriMinter('example.org', '2018')
+        self.assertIsNone(minter.check('Books', 'Doe'))
+        self.assertEqual(TagError(ErrorCode.INVALID_SPECIFIC, 23),
+                         minter.check('Bo oks', 'Doe'))
+        self.assertEqual(TagError(ErrorCode.INVALID_FRAGMENT, 28),
+                         minter.check('Books', 'D%oe'))
+        with self.assertRaisesRegex(AttributeError, '^Invalid fragment: D%oe$'):
+            minter.mint('Books', 'D%oe')
+
+    @mock.patch('taguri.minter.specific_validator', return_value=False)
+    def test_minter_checks_using_validator(self, validator):
+        error = TagUriMinter('example.org', '2018').check('Books')
+        self.assertEqual(TagError(ErrorCode.INVALID_SPECIFIC, 21), error)
+
+    def test_minter_uses_cache(self):
+        cache = EntityCache()
+        TagUriMinter('alice.example.org', '2018-11-21', cache=cache)
+        with mock.patch('taguri.grammar.authority_name_validator') as validator:
+            minter = TagUriMinter('alice.example.org', '2018-11-21', cache=cache)
+            self.assertFalse(validator.called)
+        self.assertEqual('alice.example.org,2018-11-21', minter.tagging_entity)
+        self.assertEqual(1, cache.info().hits)
+
+    def test_minter_raises_with_cache(self):
+        cache = EntityCache()
+        for _ in range(2):
+            with self.assertRaisesRegex(AttributeError, 'Invalid date'):
+                TagUriMinter('alice.example.org', '2018-13', cache=cache)
+            with self.assertRaisesRegex(AttributeError, 'Invalid authority'):
+                TagUriMinter('-alice', '2018', cache=cache)
+            with self.assertRaisesRegex(AttributeError, 'Invalid authority'):
+                TagUriMinter('a,b', '2018', cache=cache)
+        self.assertEqual(2, cache.info().hits)
+
+    def test_minter_mints_many(self):
+        minter = TagUriMinter('alice.example.org', '2018')
+        tags = minter.mint_many(['Books', 'Films', 'Songs'], ['Doe', None, ''])
+        self.assertListEqual([
+            'tag:alice.example.org,2018:Books#Doe',
+            'tag:alice.example.org,2018:Films',
+            'tag:alice.example.org,2018:Songs',
+        ], list(tags))
+
+    def test_minter_mints_many_in_batches(self):
+        minter = TagUriMinter('alice.example.org', '2018')
+        specifics = (str(n) for n in range(2500))
+        tags = list(minter.mint_many(specifics))
+        self.assertEqual(2500, len(tags))
+        self.assertEqual('tag:alice.example.org,2018:2499', tags[-1])
+
+    def test_minter_mints_many_raises(self):
+        minter = TagUriMinter('alice.example.org', '2018')
+        tags = minter.mint_many(['Books', 'Bad Item'])
+        self.assertEqual('tag:alice.example.org,2018:Books', next(tags))
+        with self.assertRaisesRegex(AttributeError, 'Invalid specific'):
+            next(tags)
+
+    def test_minter_mints_many_with_error_policies(self):
+        minter = TagUriMinter('alice.example.org', '2018')
+        specifics = ['Books', 'Bad Item', 'Films', 'Songs']
+        fragments = ['a b', 'x y', 'Doe', None]
+        skipped = list(minter.mint_many(specifics, fragments, errors='skip'))
+        self.assertListEqual([
+            'tag:alice.example.org,2018:Films#Doe',
+            'tag:alice.example.org,2018:Songs',
+        ], skipped)
+        recorded = list(minter.mint_many(specifics, fragments, errors='record'))
+        self.assertEqual(ErrorRecord(1, 'a b', 'Invalid fragment: a b'),
+                         recorded[0])
+        self.assertEqual(ErrorRecord(2, 'Bad Item', 'Invalid specific: Bad Item'),
+                         recorded[1])
+        self.assertListEqual(skipped, recorded[2:])
+
+    def test_minter_mints_many_rejects_mismatched_fragments(self):
+        minter = TagUriMinter('alice.example.org', '2018')
+        specifics = [str(n) for n in range(1500)]
+        cases = (
+            (specifics, ['Doe'] * 1200, 1200),
+            (specifics[:2], ['Doe'] * 3, 2),
+            (specifics, ['Doe'] * 1024, 1024),
+        )
+        for specifics_given, fragments, count in cases:
+            with self.subTest(specifics=len(specifics_given), fragments=len(fragments)):
+                tags = []
+                with self.assertRaisesRegex(ValueError, 'number of specifics and fragments'):
+                    for tag in minter.mint_many(iter(specifics_given), iter(fragments)):
+                        tags.append(tag)
+                self.assertEqual(count, len(tags))
+                self.assertEqual(f'tag:alice.example.org,2018:{count - 1}#Doe', tags[-1])
+
+    def test_minter_mints_many_rejects_unknown_policy(self):
+        minter = TagUriMinter('alice.example.org', '2018')
+        with self.assertRaises(ValueError):
+            minter.mint_many(['Books'], errors='ignore')
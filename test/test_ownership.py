@@ -0,0 +1,111 @@
+import os
+import tempfile
+from datetime import date
+from unittest import TestCase, mock
+
+from taguri.ownership import OwnershipRegistry
+
+REGISTRY = '''\
+# authority name   since       until
+example.com        2001-05-01  2010-12
+example.com        2015
+
+alice@Example.org  2018-11-26
+'''
+
+class OwnershipRegistryTestCase(TestCase):
+
+    def setUp(self):
+        self.registry = OwnershipRegistry(today='2020-06-15')
+        self.registry.add('example.com', '2001-05-01', '2010-12')
+        self.registry.add('example.com', '2015')
+
+    def test_checks_periods(self):
+        cases = {
+            '2001': 'unowned authority name',
+            '2001-04': 'unowned authority name',
+            '2001-05': None,
+            '2001-05-01': None,
+            '2005': None,
+            '2010-12-31': None,
+            '2011': 'unowned authority name',
+            '2015': None,
+            '2020-06-15': None,
+            '2020-06-16': 'future date',
+            '2999': 'future date',
+        }
+        for tag_date, expected in cases.items():
+            with self.subTest(date=tag_date):
+                self.assertEqual(expected, self.registry.check('example.com', tag_date))
+
+    def test_dns_name_is_case_insensitive(self):
+        self.assertIsNone(self.registry.check('EXAMPLE.com', '2005'))
+        self.assertIn('Example.COM', self.registry)
+        self.registry.add('Alice@Example.org', '2018')
+        self.assertIsNone(self.registry.check('Alice@example.ORG', '2019'))
+        self.assertIsNone(self.registry.check('alice@example.org', '2019'))
+        self.assertNotIn('alice@example.org', self.registry)
+
+    def test_unknown_authority_names(self):
+        self.assertIsNone(self.registry.check('example.org', '2018'))
+        self.assertEqual('future date', self.registry.check('example.org', '2021'))
+        strict = OwnershipRegistry(today='2020', strict=True)
+        self.assertEqual('unknown authority name', strict.check('example.org', '2018'))
+
+    def test_merges_periods(self):
+        registry = OwnershipRegistry()
+        registry.add('example.com', '2010', '2011')
+        registry.add('example.com', '2014', '2015')
+        registry.add('example.com', '2001', '2002')
+        self.assertEqual(3, len(registry.periods('example.com')))
+        registry.add('example.com', '2012', '2013-06')
+        registry.add('example.com', '2011-06', '2012-02')
+        self.assertListEqual([(date(2001, 1, 1), date(2002, 12, 31)),
+                              (date(2010, 1, 1), date(2013, 6, 30)),
+                              (date(2014, 1, 1), date(2015, 12, 31))],
+                             registry.periods('example.com'))
+        registry.add('example.com', '2000')
+        self.assertListEqual([(date(2000, 1, 1), None)],
+                             registry.periods('example.com'))
+
+    def test_rejects_invalid_periods(self):
+        with self.assertRaises(AttributeError):
+            self.registry.add('example.org', '2018-13')
+        with self.assertRaises(ValueError):
+            self.registry.add('example.org', '2018-02', '2018-01')
+        with self.assertRaises(AttributeError):
+            OwnershipRegistry(today='today')
+
+    def test_today(self):
+        registry = OwnershipRegistry(today=date(2018, 5, 1))
+        self.assertIsNone(registry.check('example.com', '2018-05-01'))
+        self.assertEqual('future date', registry.check('example.com', '2018-05-02'))
+        registry = OwnershipRegistry()
+        with mock.patch('time.time', return_value=86400 * 365):
+            self.assertIsNone(registry.check('example.com', '1971-01-01'))
+            self.assertEqual('future date', registry.check('example.com', '1971-01-02'))
+
+    def test_validate(self):
+        with self.assertRaisesRegex(AttributeError, '^Invalid tag_uri: future date$'):
+            self.registry.validate('example.com', '2999')
+        self.registry.validate('example.com', '2015')
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'owners.txt')
+            with open(path, 'w') as output:
+                output.write(REGISTRY)
+            registry = OwnershipRegistry.load(path, today='2020')
+            self.assertEqual(2, len(registry))
+            self.assertEqual(2, len(registry.periods('example.com')))
+            self.assertIsNone(registry.check('alice@example.org', '2019'))
+            self.assertEqual('unowned authority name',
+                             registry.check('example.com', '2012'))
+
+            for line in ('example.com', 'example.com 2018 2019 2020',
+                         'example.com 2018-13', 'example.com 2018 2017'):
+                with self.subTest(line=line):
+                    with open(path, 'w') as output:
+                        output.write('# header\n' + line + '\n')
+                    with self.assertRaisesRegex(ValueError, 'at line 2'):
+                        OwnershipRegistry.load(path)
@@ -0,0 +1,131 @@
+import os
+import sys
+import tempfile
+import threading
+from unittest import mock, TestCase
+
+from corpus import corpus_tags
+from taguri.bulk import parse_many
+from taguri.cache import EntityCache
+from taguri.generator import (
+    BlockAllocator,
+    BlockIdGenerator,
+    SequenceIdGenerator,
+    TimeOrderedIdGenerator,
+)
+from taguri.minter import TagUriMinter
+from taguri.ownership import OwnershipRegistry
+from taguri.parallel import (
+    PARALLEL_CHUNK_SIZE,
+    check_parallel,
+    default_threads,
+    parse_parallel,
+)
+from taguri.tag import check
+
+TAGS = corpus_tags(3 * PARALLEL_CHUNK_SIZE + 10, invalid_share=0.2)
+
+def cache_lookups(tags):
+    # How many times the cache is used when checking the tags.
+    cache = EntityCache()
+    for tag in tags:
+        check(tag, cache)
+    info = cache.info()
+    return info.hits + info.misses
+
+class ParallelTestCase(TestCase):
+
+    def setUp(self):
+        # Switch threads often, so races show up on GIL builds too.
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+
+    def test_parses_like_parse_many(self):
+        expected = list(parse_many(TAGS, errors='record'))
+        for threads in (1, 2, 4):
+            with self.subTest(threads=threads):
+                self.assertListEqual(expected, list(parse_parallel(TAGS, 'record', threads=threads)))
+
+    def test_shares_cache(self):
+        cache = EntityCache(maxsize=8)
+        expected = list(parse_many(TAGS, errors='record'))
+        self.assertListEqual(expected, list(parse_parallel(TAGS, 'record', cache, threads=8)))
+        info = cache.info()
+        self.assertEqual(cache_lookups(TAGS), info.hits + info.misses)
+
+    def test_shares_registry(self):
+        registry = OwnershipRegistry(today='2018-06-01')
+        expected = list(parse_many(TAGS, 'record', registry=registry))
+        self.assertListEqual(expected, list(parse_parallel(TAGS, 'record', registry=registry,
+                                                           threads=4)))
+
+    def test_raise_policy(self):
+        tags = [f'tag:example.com,2018:{n}' for n in range(2 * PARALLEL_CHUNK_SIZE)]
+        tags[PARALLEL_CHUNK_SIZE + 5] = 'tag:example.com,2018-13:x'
+        results = []
+        with self.assertRaisesRegex(AttributeError, 'invalid date'):
+            for tag in parse_parallel(tags, threads=2):
+                results.append(str(tag))
+        self.assertListEqual(tags[:PARALLEL_CHUNK_SIZE + 5], results)
+
+    def test_stops_early(self):
+        results = parse_parallel(TAGS * 10, 'skip', threads=2)
+        next(results)
+        results.close()
+
+    def test_checks_like_check(self):
+        expected = [check(tag) for tag in TAGS]
+        for threads in (1, 3):
+            with self.subTest(threads=threads):
+                self.assertListEqual(expected, check_parallel(TAGS, EntityCache(4), threads))
+        self.assertListEqual([], check_parallel([], threads=2))
+
+    def test_rejects_invalid_threads(self):
+        with self.assertRaises(ValueError):
+            parse_parallel(TAGS, threads=0)
+        with self.assertRaises(ValueError):
+            check_parallel(TAGS, threads=0)
+
+    def test_default_threads(self):
+        with mock.patch('taguri.parallel.free_threaded', return_value=False):
+            self.assertEqual(1, default_threads())
+        with mock.patch('taguri.parallel.free_threaded', return_value=True):
+            self.assertGreaterEqual(default_threads(), 1)
+
+    def test_stress(self):
+        # Many threads parse while sharing a cache that keeps evicting,
+        # and mint while sharing the identifier generators.
+        cache = EntityCache(maxsize=4)
+        expected = [check(tag) for tag in TAGS]
+        failures = []
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        minter = TagUriMinter('example.com', '2018')
+        allocator = BlockAllocator(os.path.join(directory.name, 'ids.seq'), 7)
+        generators = [
+            SequenceIdGenerator(minter),
+            TimeOrderedIdGenerator(minter),
+            BlockIdGenerator(minter, allocator),
+        ]
+        minted = [[] for _ in generators]
+
+        def run():
+            try:
+                for _ in range(3):
+                    if check_parallel(TAGS, cache, threads=1) != expected:
+                        failures.append('mismatch')
+                    for generator, tags in zip(generators, minted):
+                        tags.extend(generator.mint() for _ in range(500))
+            except Exception as error:
+                failures.append(error)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertListEqual([], failures)
+        self.assertLessEqual(len(cache), 4)
+        for tags in minted:
+            self.assertEqual(8 * 3 * 500, len(set(tags)))
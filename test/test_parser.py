@@ -1,6 +1,9 @@
 from unittest import TestCase
 
+from taguri.cache import EntityCache
+from taguri.ownership import OwnershipRegistry
 from taguri.parser import TagUriParser
+from taguri.tag import ParsedTag
 
 class TagUriParserTestCase(TestCase):
 
@@ -21,7 +24,13 @@ class TagUriParserTestCase(TestCase):
         self.assertEqual('alice.example.org,2018-11-22', parser.tagging_entity)
         self.assertEqual('Collections/Books', parser.specific)
         self.assertEqual('Doe', parser.fragment)
-    
+
+    def test_tagtuple_is_a_tuple(self):
+        parser = TagUriParser('tag:a.com,2018:x')
+        self.assertIs(tuple, type(parser.tagtuple()))
+        self.assertEqual(('a.com', '2018', 'x', None), parser.tagtuple())
+        self.assertEqual(ParsedTag.parse('tag:a.com,2018:x'), parser.parsed_tag())
+
     def test_parser_accepts_empty_specific(self):
         parser = TagUriParser('tag:alice.example.org,2018-11-22:')
         self.assertEqual('', parser.specific)
@@ -42,4 +51,139 @@ class TagUriParserTestCase(TestCase):
         for test_case in test_cases:
             with self.subTest(test_case=test_case):
                 with self.assertRaises(AttributeError):
-                    TagUriParser(test_case)
\ No newline at end of file
+                    TagUriParser(test_case)
+
+class LazyTagUriParserTestCase(TestCase):
+
+    def test_defers_validation(self):
+        parser = TagUriParser('tag:-bad-,2018-02-30:Books#Bad fragment', lazy=True)
+        self.assertFalse(parser.validated)
+        self.assertEqual('Books', parser.specific)
+        self.assertEqual('tag:-bad-,2018-02-30:Books#Bad fragment', str(parser))
+        for name, message in (('authority_name', 'invalid authority name'),
+                              ('date', 'invalid date'),
+                              ('tagging_entity', 'invalid authority name'),
+                              ('fragment', 'invalid fragment'),
+                              ('tag', 'invalid authority name')):
+            with self.subTest(name=name):
+                with self.assertRaisesRegex(AttributeError, message):
+                    getattr(parser, name)
+        with self.assertRaises(AttributeError):
+            parser.tagtuple()
+        with self.assertRaises(AttributeError):
+            parser.parsed_tag()
+        with self.assertRaises(AttributeError):
+            parser.validate()
+
+    def test_raises_structure_errors_eagerly(self):
+        for tag, message in (('tag:example.com', 'misses parts'),
+                             ('urn:example.com,2018:x', 'invalid prefix'),
+                             ('tag:example.com:x', 'invalid tagging entity'),
+                             ('tag:a,b,2018:x', 'invalid tagging entity'),
+                             ('tag:example.com,2018:x#y#z', 'too many fragments')):
+            with self.subTest(tag=tag):
+                with self.assertRaisesRegex(AttributeError, message):
+                    TagUriParser(tag, lazy=True)
+
+    def test_validate_matches_eager_parser(self):
+        tags = (
+            'tag:alice.example.org,2018-11-22:Collections/Books#Doe',
+            'tag:john@example.org,2018:',
+            'tag:example.com,2018:Books#',
+            'tag:-example.com,2018:x',
+            'tag:example.com,2018-02-30:x',
+            'tag:example.com,0000:x',
+            'tag:example.com,2018:x#y z',
+            'tag:example.com,2018:x y',
+            'tag:example.com,2018:x%2',
+            'tag:example.com,2018:x%2F#%7e',
+        )
+        for tag in tags:
+            with self.subTest(tag=tag):
+                try:
+                    expected = TagUriParser(tag).parsed_tag().offsets
+                except AttributeError as error:
+                    expected = str(error)
+                parser = TagUriParser(tag, lazy=True)
+                try:
+                    parser.validate()
+                    result = parser.parsed_tag().offsets
+                except AttributeError as error:
+                    result = str(error)
+                self.assertEqual(expected, result)
+
+    def test_caches_validation(self):
+        parser = TagUriParser('tag:example.com,2018:Books#Doe', lazy=True)
+        self.assertEqual('example.com', parser.authority_name)
+        self.assertFalse(parser.validated)
+        parser.validate()
+        self.assertTrue(parser.validated)
+        self.assertEqual(('example.com', '2018', 'Books', 'Doe'),
+                         parser.tagtuple())
+
+    def test_uses_cache(self):
+        cache = EntityCache()
+        parser = TagUriParser('tag:example.com,2018-13:x', cache, lazy=True)
+        with self.assertRaisesRegex(AttributeError, 'invalid date'):
+            parser.date
+        self.assertEqual(1, cache.info().misses)
+        self.assertEqual('x', TagUriParser('tag:example.com,2018:x', cache,
+                                           lazy=True).specific)
+
+    def test_uses_cache_for_each_component(self):
+        cache = EntityCache()
+        parser = TagUriParser('tag:example.com,2018-13:Books', cache, lazy=True)
+        self.assertEqual('example.com', parser.authority_name)
+        with self.assertRaisesRegex(AttributeError, 'invalid date'):
+            parser.date
+        parser = TagUriParser('tag:-bad-,2018:Books', cache, lazy=True)
+        self.assertEqual('2018', parser.date)
+        with self.assertRaisesRegex(AttributeError, 'invalid authority name'):
+            parser.authority_name
+        with self.assertRaisesRegex(AttributeError, 'invalid authority name'):
+            parser.validate()
+
+    def test_eager_parser_is_validated(self):
+        self.assertTrue(TagUriParser('tag:example.com,2018:x').validated)
+
+class OwnershipTagUriParserTestCase(TestCase):
+
+    def setUp(self):
+        self.registry = OwnershipRegistry(today='2020')
+        self.registry.add('alice.example.org', '2014-04-20')
+
+    def test_checks_ownership(self):
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                parser = TagUriParser('tag:alice.example.org,2015:x',
+                                      lazy=lazy, registry=self.registry)
+                self.assertEqual('2015', parser.date)
+
+    def test_rejects_illegitimate_entities(self):
+        tags = {
+            'tag:alice.example.org,2014-04:x': 'Invalid tag_uri: unowned authority name',
+            'tag:hp.com,2999:x': 'Invalid tag_uri: future date',
+        }
+        for tag, message in tags.items():
+            with self.subTest(tag=tag):
+                with self.assertRaisesRegex(AttributeError, f'^{message}$'):
+                    TagUriParser(tag, registry=self.registry)
+
+    def test_lazy_checks_with_date(self):
+        for cache in (None, EntityCache()):
+            with self.subTest(cache=cache):
+                parser = TagUriParser('tag:hp.com,2999:x', cache=cache, lazy=True,
+                                      registry=self.registry)
+                self.assertEqual('x', parser.specific)
+                self.assertEqual('hp.com', parser.authority_name)
+                for _ in range(2):
+                    with self.assertRaisesRegex(AttributeError, 'future date'):
+                        parser.date
+                with self.assertRaisesRegex(AttributeError, 'future date'):
+                    parser.validate()
+                self.assertFalse(parser.validated)
+
+    def test_lazy_reports_invalid_authority_name_first(self):
+        parser = TagUriParser('tag:-hp.com,2999:x', lazy=True, registry=self.registry)
+        with self.assertRaisesRegex(AttributeError, 'invalid authority name'):
+            parser.date
@@ -0,0 +1,97 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from corpus import corpus_tags
+from taguri.errors import TagError
+from taguri.grammar import scan_tag
+from taguri.scanner import scan, scan_file
+
+FEED = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <id>tag:example.org,2003:3</id>
+  <entry><id>tag:example.org,2003:3.2397</id><title>Caf\xc3\xa9</title></entry>
+  <entry><id>tag:example.org,2003-02-30:3.2398</id></entry>
+  <entry><id>tag:john@example.org,2018-11-22:Posts/1#c%20d</id></entry>
+</feed>
+hashtag:example.org,2003:not-a-tag (tag:example.org,2003:in-parens)
+'''
+
+# Tags around the edges of the grammar, valid or not.
+EDGE_CASES = (
+    'tag:example.com,2018:',
+    'tag:example.com,2018:Books#',
+    'tag:example.com,2018:#Doe',
+    'tag:example.com,2016-02-29:x',
+    'tag:example.com,2018-02-29:x',
+    'tag:example.com,2018-04-31:x',
+    'tag:example.com,0000:x',
+    'tag:example.com,2018-00:x',
+    'tag:example.com,2018-1:x',
+    'tag:example.com,2018-01- 1:x',
+    'tag:example.com,2018-1- 9:x',
+    'tag:example.com,2018-01- 0:x',
+    'tag:example.com,2018-01-  1:x',
+    'tag:example.com,2018- 1:x',
+    'tag:EXAMPLE.COM,2018:x',
+    'tag:john@example.com,2018:x',
+    'tag:john@@example.com,2018:x',
+    'tag:a..b,2018:x',
+    'tag:-example.com,2018:x',
+    'tag:example-.com,2018:x',
+    'tag:ex_ample.com,2018:x',
+    'tag:example.com.,2018:x',
+    'tag:caf\xe9.com,2018:x',
+    'tag:example.com,2018:caf\xe9',
+    'tag:example.com,2018:a%2',
+    'tag:example.com,2018:a%2F%7e',
+    'tag:example.com,2018:a#b#c',
+    "tag:example.com,2018:-._~!$&'()*+,;=:@/?",
+)
+
+class ScannerTestCase(TestCase):
+
+    def test_finds_tags_in_text(self):
+        found = list(scan(FEED))
+        self.assertListEqual([
+            'tag:example.org,2003:3',
+            'tag:example.org,2003:3.2397',
+            'tag:john@example.org,2018-11-22:Posts/1#c%20d',
+            'tag:example.org,2003:in-parens)',
+        ], [tag for _, tag in found])
+        for offset, tag in found:
+            self.assertEqual(tag.encode(), FEED[offset:offset + len(tag)])
+
+    def test_scans_memoryviews(self):
+        self.assertEqual(4, len(list(scan(memoryview(FEED)))))
+
+    def test_scans_files(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'feed.xml')
+        with open(path, 'wb') as feed:
+            feed.write(FEED)
+        self.assertListEqual(list(scan(FEED)), list(scan_file(path)))
+        with open(path, 'wb'):
+            pass
+        self.assertListEqual([], list(scan_file(path)))
+
+    def test_agrees_with_scan_tag(self):
+        tags = corpus_tags(2000, invalid_share=0.5)
+        tags.extend(EDGE_CASES)
+        for tag in tags:
+            with self.subTest(tag=tag):
+                found = [found for _, found in scan(f' {tag}\n'.encode('utf-8'))]
+                # Every tag found is valid, even if the line is not.
+                for found_tag in found:
+                    self.assertIsNot(TagError, type(scan_tag(found_tag)))
+                # And the whole line is found if and only if it is valid.
+                self.assertEqual(type(scan_tag(tag)) is not TagError, tag in found)
+
+    def test_misses_dates_with_digits_that_are_not_ascii(self):
+        # Accepted by the date validator, but only ASCII bytes are scanned.
+        for tag in ('tag:example.com,\u0662\u0660\u0661\u0668:x',
+                    'tag:example.com,\uff12\uff10\uff11\uff18-01:x'):
+            with self.subTest(tag=tag):
+                self.assertIsNot(TagError, type(scan_tag(tag)))
+                self.assertListEqual([], list(scan(tag.encode('utf-8'))))
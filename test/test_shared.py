@@ -0,0 +1,55 @@
+import multiprocessing
+from unittest import mock, TestCase
+
+from taguri.shared import SharedTagTable
+
+TAGS = sorted(f'tag:example.com,2018:Books/{n}' for n in range(100)) + \
+    ['tag:example.org,2018:Films/1#Doe']
+
+def read_table(name):
+    # Runs in a worker process.
+    with SharedTagTable.attach(name) as table:
+        return (str(table[3]), table.index('tag:example.org,2018:Films/1#Doe'),
+                [tag.specific for tag in table.by_tagging_entity('example.org,2018')])
+
+class SharedTagTableTestCase(TestCase):
+
+    def setUp(self):
+        self.table = SharedTagTable.publish(TAGS)
+
+    def tearDown(self):
+        self.table.close()
+        self.table.unlink()
+
+    def test_attach(self):
+        with SharedTagTable.attach(self.table.name) as table:
+            self.assertEqual(len(TAGS), len(table))
+            self.assertTrue(table.pre_validated)
+            self.assertListEqual(TAGS, [str(tag) for tag in table])
+            self.assertIn(TAGS[50], table)
+            # Unfinished iterators do not keep the memory in use.
+            next(iter(table))
+
+    def test_other_process(self):
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(2) as pool:
+            results = pool.map(read_table, [self.table.name] * 2)
+        for result in results:
+            self.assertTupleEqual((TAGS[3], len(TAGS) - 1, ['Films/1']), result)
+        # The workers did not destroy the table when they exited.
+        with SharedTagTable.attach(self.table.name) as table:
+            self.assertEqual(TAGS[3], str(table[3]))
+
+    def test_unlink(self):
+        other = SharedTagTable.publish(TAGS[:1])
+        other.close()
+        other.unlink()
+        with self.assertRaises(FileNotFoundError):
+            SharedTagTable.attach(other.name)
+
+    def test_requires_shared_memory(self):
+        with mock.patch('taguri.shared.shared_memory', None):
+            with self.assertRaisesRegex(RuntimeError, 'shared_memory'):
+                SharedTagTable.publish(TAGS)
+            with self.assertRaisesRegex(RuntimeError, 'shared_memory'):
+                SharedTagTable.attach(self.table.name)
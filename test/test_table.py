@@ -0,0 +1,142 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from corpus import corpus_tags
+from taguri.table import RESTART_INTERVAL, TagTable, encode_table, write_table
+from taguri.tag import ParsedTag
+
+class TagTableTestCase(TestCase):
+
+    def test_round_trip(self):
+        tags = corpus_tags(500) + ['tag:example.com,2018:', 'tag:example.com,2018:x#',
+                                'tag:example.com,2018:Bücher%C3%BC']
+        tags = [tag for tag in tags if tag.isascii()]
+        table = TagTable(encode_table(tags))
+        self.assertEqual(len(tags), len(table))
+        self.assertTrue(table.pre_validated)
+        parsed = [ParsedTag.parse(tag) for tag in tags]
+        self.assertListEqual(parsed, list(table))
+        for index in (0, 1, RESTART_INTERVAL - 1, RESTART_INTERVAL,
+                      RESTART_INTERVAL + 1, len(tags) - 1, -1):
+            with self.subTest(index=index):
+                self.assertEqual(parsed[index], table[index])
+                self.assertEqual(parsed[index].offsets, table[index].offsets)
+                self.assertEqual(parsed[index].fragment, table[index].fragment)
+        with self.assertRaises(IndexError):
+            table[len(tags)]
+
+    def test_buffers(self):
+        tags = sorted(corpus_tags(100))
+        data = encode_table(tags)
+        for source in (data, bytearray(data), memoryview(data)):
+            with self.subTest(source=type(source).__name__):
+                table = TagTable(source)
+                self.assertListEqual(tags, [str(table[n]) for n in range(len(tags))])
+                self.assertListEqual(tags, [str(tag) for tag in table])
+                table.close()
+
+    def test_close_with_unfinished_iterators(self):
+        data = bytearray(encode_table(corpus_tags(100)))
+        table = TagTable(data)
+        tags = iter(table)
+        next(tags)
+        table.close()
+        # No view of the data is left, so it can be resized.
+        data.extend(b'\0')
+
+    def test_fragments(self):
+        tags = ['tag:example.com,2018:a', 'tag:example.com,2018:a#',
+                'tag:example.com,2018:a#b', 'tag:example.com,2018:a#bc']
+        table = TagTable(encode_table(tags))
+        self.assertListEqual([None, '', 'b', 'bc'], [tag.fragment for tag in table])
+
+    def test_few_fragments(self):
+        tags = [f'tag:example.com,2018:{n}' for n in range(50)]
+        tags[20] += '#b'
+        table = TagTable(encode_table(tags))
+        fragments = [None] * 50
+        fragments[20] = 'b'
+        self.assertListEqual(fragments, [tag.fragment for tag in table])
+        self.assertListEqual(fragments, [table[n].fragment for n in range(50)])
+        self.assertListEqual(tags, [str(tag) for tag in table.by_tagging_entity(
+            'example.com,2018')])
+
+    def test_by_tagging_entity(self):
+        tags = corpus_tags(500)
+        table = TagTable(encode_table(tags))
+        parsed = [ParsedTag.parse(tag) for tag in tags]
+        entities = sorted({tag.tagging_entity for tag in parsed})
+        self.assertListEqual(entities, sorted(table.entities))
+        for entity in entities[:20]:
+            with self.subTest(entity=entity):
+                expected = [tag for tag in parsed if tag.tagging_entity == entity]
+                self.assertListEqual(expected, list(table.by_tagging_entity(entity)))
+        self.assertListEqual([], list(table.by_tagging_entity('example.com,1999')))
+
+    def test_index(self):
+        tags = corpus_tags(500) + ['tag:example.com,2018:x', 'tag:example.com,2018:x#',
+                                'tag:example.com,2018:x#a']
+        for ordered in (False, True):
+            if ordered:
+                tags = sorted(set(tags))
+            table = TagTable(encode_table(tags))
+            for position in (0, 1, 17, len(tags) - 3, len(tags) - 2, len(tags) - 1):
+                with self.subTest(ordered=ordered, position=position):
+                    self.assertEqual(position, table.index(tags[position]))
+                    self.assertEqual(position, table.index(ParsedTag.parse(tags[position])))
+            for tag in ('tag:example.com,2018:y', 'tag:example.com,2018:x#b',
+                        'tag:example.com,1999:x', 'tag:x', 'Books'):
+                with self.subTest(ordered=ordered, tag=tag):
+                    self.assertNotIn(tag, table)
+                    with self.assertRaises(ValueError):
+                        table.index(tag)
+
+    def test_sorted_tags_are_smaller(self):
+        tags = [f'tag:example.com,2018:Collections/Books/{n:06}' for n in range(1000)]
+        data = encode_table(tags)
+        self.assertLess(len(data), len('\n'.join(tags)) / 3)
+
+    def test_not_validated(self):
+        tags = ['tag:example.com,2018:a', 'tag:example.com,2018-13:b']
+        with self.assertRaises(AttributeError):
+            encode_table(tags)
+        table = TagTable(encode_table(tags, validate=False))
+        self.assertFalse(table.pre_validated)
+        self.assertEqual('a', table[0].specific)
+        with self.assertRaisesRegex(AttributeError, 'invalid date'):
+            table[1]
+
+    def test_checksum(self):
+        data = bytearray(encode_table(corpus_tags(50)))
+        TagTable(data)
+        data[-1] ^= 1
+        with self.assertRaisesRegex(ValueError, 'checksum'):
+            TagTable(data)
+        TagTable(data, verify=False)
+
+    def test_rejects_other_data(self):
+        for data in (b'', b'tag:example.com,2018:a\n' * 20, encode_table([])[:-1] + b'x'):
+            with self.subTest(data=data[:10]):
+                with self.assertRaises(ValueError):
+                    TagTable(data)
+        self.assertEqual(0, len(TagTable(encode_table([]))))
+
+    def test_many_entities(self):
+        tags = [f'tag:host{n}.example.com,2018:x' for n in range(300)]
+        table = TagTable(encode_table(tags))
+        self.assertEqual(tags[299], str(table[299]))
+        self.assertEqual(tags[260], str(next(table.by_tagging_entity('host260.example.com,2018'))))
+
+    def test_memory_mapped_file(self):
+        tags = corpus_tags(100)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tags.table')
+            write_table(tags, path)
+            with TagTable.open(path) as table:
+                self.assertEqual(tags[42], str(table[42]))
+                self.assertListEqual(tags, [str(tag) for tag in table])
+            with open(path, 'wb'):
+                pass
+            with self.assertRaises(ValueError):
+                TagTable.open(path)
@@ -0,0 +1,189 @@
+import pickle
+from unittest import TestCase
+
+from taguri.bulk import parse_many
+from taguri.cache import EntityCache
+from taguri.errors import ErrorCode, TagError
+from taguri.ownership import OwnershipRegistry
+from taguri.tag import ParsedTag, check, try_parse
+
+class ParsedTagTestCase(TestCase):
+
+    def test_components(self):
+        parsed = ParsedTag.parse('tag:alice.example.org,2018-11-22:Books#Doe')
+        self.assertEqual('tag:alice.example.org,2018-11-22:Books#Doe', parsed.tag)
+        self.assertEqual('alice.example.org', parsed.authority_name)
+        self.assertEqual('2018-11-22', parsed.date)
+        self.assertEqual('alice.example.org,2018-11-22', parsed.tagging_entity)
+        self.assertEqual('Books', parsed.specific)
+        self.assertEqual('Doe', parsed.fragment)
+
+    def test_fragments(self):
+        self.assertIsNone(ParsedTag.parse('tag:example.org,2018:Books').fragment)
+        self.assertEqual('', ParsedTag.parse('tag:example.org,2018:Books#').fragment)
+
+    def test_behaves_like_tagtuple(self):
+        parsed = ParsedTag.parse('tag:example.org,2018:Books')
+        self.assertTupleEqual(('example.org', '2018', 'Books', None),
+                              tuple(parsed))
+        self.assertEqual(4, len(parsed))
+        self.assertEqual('Books', parsed[2])
+        self.assertEqual(('2018', 'Books'), parsed[1:3])
+
+    def test_is_hashable_and_comparable(self):
+        first = ParsedTag.parse('tag:example.org,2018:A')
+        second = ParsedTag.parse('tag:example.org,2018:B')
+        self.assertEqual(first, ParsedTag.parse('tag:example.org,2018:A'))
+        self.assertNotEqual(first, second)
+        self.assertLess(first, second)
+        self.assertEqual([first, second], sorted([second, first]))
+        self.assertEqual(1, len({first, ParsedTag.parse(first.tag)}))
+        self.assertNotEqual(first, first.tag)
+
+    def test_has_no_dict(self):
+        parsed = ParsedTag.parse('tag:example.org,2018:A')
+        with self.assertRaises(AttributeError):
+            parsed.__dict__
+
+    def test_can_be_pickled(self):
+        parsed = ParsedTag.parse('tag:example.org,2018:A#b')
+        restored = pickle.loads(pickle.dumps(parsed))
+        self.assertEqual(parsed, restored)
+        self.assertEqual('b', restored.fragment)
+
+    def test_parse_raises_on_invalid_tags(self):
+        with self.assertRaises(AttributeError):
+            ParsedTag.parse('tag:example.org:A')
+
+INVALID_TAGS = {
+    'tag:example.com': (ErrorCode.MISSES_PARTS, 15),
+    'urn:example.com,2018:x': (ErrorCode.INVALID_PREFIX, 0),
+    'tag:example.com:x': (ErrorCode.INVALID_TAGGING_ENTITY, 15),
+    'tag:example.com,2018,2019:x': (ErrorCode.INVALID_TAGGING_ENTITY, 20),
+    'tag:exa mple.com,2018:x': (ErrorCode.INVALID_AUTHORITY_NAME, 7),
+    'tag:-example.com,2018:x': (ErrorCode.INVALID_AUTHORITY_NAME, 4),
+    'tag:example.com,18:x': (ErrorCode.INVALID_DATE, 16),
+    'tag:example.com,2018-1x:x': (ErrorCode.INVALID_DATE, 20),
+    'tag:example.com,2018-02-30:x': (ErrorCode.INVALID_DATE, 24),
+    'tag:example.com,0000:x': (ErrorCode.INVALID_DATE, 16),
+    'tag:example.com,2018:x#y#z': (ErrorCode.TOO_MANY_FRAGMENTS, 24),
+    'tag:example.com,2018:x#y z': (ErrorCode.INVALID_FRAGMENT, 24),
+    'tag:example.com,2018:x y': (ErrorCode.INVALID_SPECIFIC, 22),
+    'tag:example.com,2018:x%zz': (ErrorCode.INVALID_SPECIFIC, 22),
+}
+
+class DerivedTagTestCase(TestCase):
+
+    def setUp(self):
+        self.parsed = ParsedTag.parse('tag:example.com,2018:Books#Doe')
+
+    def assertParsed(self, expected, derived):
+        reparsed = ParsedTag.parse(expected)
+        self.assertEqual(reparsed, derived)
+        self.assertTupleEqual(reparsed.offsets, derived.offsets)
+        self.assertTupleEqual(tuple(reparsed), tuple(derived))
+
+    def test_replace(self):
+        test_cases = (
+            ({}, 'tag:example.com,2018:Books#Doe'),
+            ({'authority_name': 'alice@example.org'}, 'tag:alice@example.org,2018:Books#Doe'),
+            ({'date': '2019-02-28'}, 'tag:example.com,2019-02-28:Books#Doe'),
+            ({'specific': 'Films:1/a%20b'}, 'tag:example.com,2018:Films:1/a%20b#Doe'),
+            ({'specific': ''}, 'tag:example.com,2018:#Doe'),
+            ({'fragment': 'Roe'}, 'tag:example.com,2018:Books#Roe'),
+            ({'fragment': ''}, 'tag:example.com,2018:Books'),
+            ({'fragment': None}, 'tag:example.com,2018:Books'),
+            ({'date': '2019', 'fragment': None}, 'tag:example.com,2019:Books'),
+        )
+        for changes, expected in test_cases:
+            with self.subTest(changes=changes):
+                self.assertParsed(expected, self.parsed.replace(**changes))
+        self.assertParsed('tag:example.com,2018:Books#Roe',
+                          ParsedTag.parse('tag:example.com,2018:Books').replace(fragment='Roe'))
+
+    def test_replace_validates_changes(self):
+        test_cases = (
+            ({'authority_name': '-example.com'}, 'Invalid authority name: -example.com'),
+            ({'authority_name': 'a,b'}, 'Invalid authority name: a,b'),
+            ({'date': '2018-02-30'}, 'Invalid date: 2018-02-30'),
+            ({'date': '2018:x'}, 'Invalid date: 2018:x'),
+            ({'specific': 'a#b'}, 'Invalid specific: a#b'),
+            ({'specific': 'a%2'}, 'Invalid specific: a%2'),
+            ({'fragment': 'a b'}, 'Invalid fragment: a b'),
+        )
+        for cache in (None, EntityCache()):
+            for changes, message in test_cases:
+                with self.subTest(changes=changes, cache=cache):
+                    with self.assertRaisesRegex(AttributeError, message):
+                        self.parsed.replace(**changes, cache=cache)
+
+    def test_replace_uses_cache(self):
+        cache = EntityCache()
+        for _ in range(2):
+            self.assertParsed('tag:example.com,2019:Books#Doe',
+                              self.parsed.replace(date='2019', cache=cache))
+        self.assertEqual((1, 1), cache.info()[:2])
+
+    def test_replace_checks_ownership(self):
+        registry = OwnershipRegistry(today='2020')
+        registry.add('example.com', '2010', '2018-06')
+        test_cases = (
+            ({}, None),
+            ({'fragment': None}, None),
+            ({'date': '2015'}, None),
+            ({'date': '2019'}, 'Invalid tag_uri: unowned authority name'),
+            ({'date': '2021'}, 'Invalid tag_uri: future date'),
+            ({'authority_name': 'example.org'}, None),
+        )
+        for changes, message in test_cases:
+            with self.subTest(changes=changes):
+                if message is None:
+                    derived = self.parsed.replace(**changes, registry=registry)
+                    self.assertEqual(self.parsed.replace(**changes), derived)
+                    self.assertListEqual([derived], list(parse_many(
+                        [str(derived)], registry=registry)))
+                    continue
+                with self.assertRaisesRegex(AttributeError, f'^{message}$'):
+                    self.parsed.replace(**changes, registry=registry)
+                with self.assertRaisesRegex(AttributeError, f'^{message}$'):
+                    list(parse_many([str(self.parsed.replace(**changes))],
+                                    registry=registry))
+
+    def test_append(self):
+        self.assertParsed('tag:example.com,2018:Books/1984#Doe', self.parsed.append('1984'))
+        self.assertParsed('tag:example.com,2018:Books.v2#Doe', self.parsed.append('v2', '.'))
+        self.assertParsed('tag:example.com,2018:Books2', ParsedTag.parse(
+            'tag:example.com,2018:Books').append('2', ''))
+        self.assertParsed('tag:example.com,2018:Books/#Doe', self.parsed.append(''))
+        self.assertParsed('tag:example.com,2018:#Doe',
+                          self.parsed.replace(specific='').append('', ''))
+        for segment, separator in (('a b', '/'), ('%4', '/'), ('x', '#'), ('1', '%')):
+            with self.subTest(segment=segment, separator=separator):
+                with self.assertRaises(AttributeError):
+                    self.parsed.append(segment, separator)
+
+class TryParseTestCase(TestCase):
+
+    def test_valid(self):
+        result = try_parse('tag:example.org,2018:Books#Doe')
+        self.assertTrue(result)
+        self.assertIsNone(result.error)
+        self.assertEqual(ParsedTag.parse('tag:example.org,2018:Books#Doe'), result.tag)
+        self.assertIsNone(check('tag:example.org,2018:Books#Doe'))
+
+    def test_invalid(self):
+        for cache in (None, EntityCache()):
+            for tag, (code, offset) in INVALID_TAGS.items():
+                with self.subTest(tag=tag, cache=cache):
+                    result = try_parse(tag, cache)
+                    self.assertFalse(result)
+                    self.assertIsNone(result.tag)
+                    self.assertEqual(TagError(code, offset), result.error)
+                    self.assertEqual(result.error, check(tag, cache))
+
+    def test_same_messages_as_parse(self):
+        for tag in INVALID_TAGS:
+            with self.subTest(tag=tag):
+                with self.assertRaises(AttributeError) as raised:
+                    ParsedTag.parse(tag)
+                self.assertEqual(str(raised.exception), check(tag).message)
@@ -0,0 +1,92 @@
+from unittest import TestCase
+from uuid import UUID
+
+from taguri.minter import TagUriMinter
+from taguri.tag import ParsedTag
+from taguri.template import SEEN_VALUES, TagTemplate
+
+UUID_TEXT = '12345678-1234-5678-1234-567812345678'
+
+class TagTemplateTestCase(TestCase):
+
+    def setUp(self):
+        self.minter = TagUriMinter('example.com', '2018')
+
+    def test_template_mints(self):
+        template = self.minter.template('Collections/{kind}/{id:int}#{section}')
+        self.assertIsInstance(template, TagTemplate)
+        self.assertTupleEqual(('kind', 'id', 'section'), template.fields)
+        expected = 'tag:example.com,2018:Collections/Books/42#Doe'
+        self.assertEqual(expected, template('Books', 42, 'Doe'))
+        self.assertEqual(expected, template.mint(section='Doe', kind='Books', id=42))
+        self.assertEqual(expected, self.minter.mint('Collections/Books/42', 'Doe'))
+
+    def test_template_mints_like_minter(self):
+        cases = (
+            ('Books/{id}', {'id': 'Caf%C3%A9'}, ('Books/Caf%C3%A9', None)),
+            ('{id}', {'id': ''}, ('', None)),
+            ('Books#', {}, ('Books', None)),
+            ('Books/{id}#{id}', {'id': 'a'}, ('Books/a', 'a')),
+            ('Books/{id}#{id}', {'id': ''}, ('Books/', None)),
+            ('Books#{part}', {'part': ''}, ('Books', None)),
+            ('Books#{part}{page}', {'part': '', 'page': ''}, ('Books', None)),
+            ('Books#{part}{page}', {'part': '', 'page': '1'}, ('Books', '1')),
+            ('Books#{page:int}', {'page': 0}, ('Books', '0')),
+            ('Books#p{part}', {'part': ''}, ('Books', 'p')),
+            ('{a}{b}', {'a': 'x:y', 'b': "it's"}, ("x:yit's", None)),
+            ('Books/{id:int}', {'id': -1}, ('Books/-1', None)),
+            ('Books/{id:uuid}', {'id': UUID(UUID_TEXT)}, (f'Books/{UUID_TEXT}', None)),
+            ('Books/{id:uuid}', {'id': UUID_TEXT.upper()}, (f'Books/{UUID_TEXT.upper()}', None)),
+        )
+        for template, values, (specific, fragment) in cases:
+            with self.subTest(template=template, values=values):
+                tag = self.minter.template(template)(**values)
+                self.assertEqual(self.minter.mint(specific, fragment), tag)
+                ParsedTag.parse(tag)
+
+    def test_template_checks_values(self):
+        cases = (
+            ('Books/{id}', 'a space', 'Invalid specific: a space'),
+            ('Books/{id}', 'a#b', 'Invalid specific: a#b'),
+            ('Books/{id}', 5, 'Invalid specific: 5'),
+            ('Books/{id}', ['a'], r"Invalid specific: \['a'\]"),
+            ('Books#{id}', 'Caf%C', 'Invalid fragment: Caf%C'),
+            ('Books/{id:int}', '42', 'Invalid specific: 42'),
+            ('Books/{id:int}', True, 'Invalid specific: True'),
+            ('Books/{id:uuid}', 'not-a-uuid', 'Invalid specific: not-a-uuid'),
+        )
+        for template, value, message in cases:
+            with self.subTest(template=template, value=value):
+                with self.assertRaisesRegex(AttributeError, message):
+                    self.minter.template(template)(value)
+
+    def test_template_checks_template(self):
+        cases = (
+            ('Books {id}', AttributeError, 'Invalid specific'),
+            ('Books/{id}#a#b', AttributeError, 'Invalid fragment'),
+            ('Books/Caf%C{id}', AttributeError, 'Invalid specific'),
+            ('Books/{id', ValueError, 'Invalid template'),
+            ('Books/{}', ValueError, 'Invalid field name'),
+            ('Books/{0}', ValueError, 'Invalid field name'),
+            ('Books/{_id}', ValueError, 'Invalid field name'),
+            ('Books/{class}', ValueError, 'Invalid field name'),
+            ('Books/{id!r}', ValueError, 'Invalid field conversion'),
+            ('Books/{id:float}', ValueError, 'Invalid field type'),
+            ('Books/{id:int}/{id}', ValueError, 'Invalid field type'),
+        )
+        for template, error, message in cases:
+            with self.subTest(template=template):
+                with self.assertRaisesRegex(error, message):
+                    self.minter.template(template)
+
+    def test_template_fields_may_shadow_builtins(self):
+        template = self.minter.template('{str}/{int:int}/{mint}')
+        self.assertEqual('tag:example.com,2018:a/1/b', template('a', 1, 'b'))
+
+    def test_template_remembers_valid_values(self):
+        template = self.minter.template('Books/{id}')
+        for n in range(SEEN_VALUES + 10):
+            template(f'{n}')
+        self.assertEqual('tag:example.com,2018:Books/x', template('x'))
+        with self.assertRaises(AttributeError):
+            template('a space')
@@ -1,9 +1,17 @@
+import itertools
+import unittest
+from datetime import datetime
 from unittest import TestCase
 from taguri.validator import (
+    DatePrecision,
+    TagDate,
     authority_name_validator,
     date_validator,
+    parse_date,
     specific_validator,
+    validate_specifics,
 )
+from taguri import validator
 
 class AuthorityNameValidatorTestCase(TestCase):
     def test_accepts_domain_names(self):
@@ -121,6 +129,56 @@ class DateValidator(TestCase):
                 self.assertFalse(date_validator(test_case),
                                  '{} should not be valid'.format(test_case))
 
+    def test_checks_the_calendar(self):
+        self.assertTrue(date_validator('2016-02-29'))
+        self.assertTrue(date_validator('2000-02-29'))
+        self.assertFalse(date_validator('2018-02-29'))
+        self.assertFalse(date_validator('1900-02-29'))
+        self.assertFalse(date_validator('2018-04-31'))
+        self.assertFalse(date_validator('0000'))
+
+    def test_accepts_the_same_dates_as_strptime(self):
+        def strptime_validator(date):
+            for format in ('%Y-%m-%d', '%Y-%m', '%Y'):
+                try:
+                    datetime.strptime(date, format)
+                except ValueError:
+                    pass
+                else:
+                    return True
+            return False
+
+        years = ('0000', '0001', '1900', '2000', '2018', '٢٠١٨', '201', '20180')
+        tokens = ('', 'x', '001', '٣', '1٣', '0', '1', '3', '9', ' 1', ' 0',
+                  '01', '02', '04', '12', '13', '28', '29', '30', '31', '32')
+        for year, month, day in itertools.product(years, tokens, tokens):
+            for test_case in (year, f'{year}-{month}', f'{year}-{month}-{day}'):
+                self.assertEqual(strptime_validator(test_case),
+                                 date_validator(test_case), repr(test_case))
+
+class ParseDateTestCase(TestCase):
+
+    def test_parses_dates(self):
+        self.assertEqual(TagDate(2018, 1, 1, DatePrecision.YEAR),
+                         parse_date('2018'))
+        self.assertEqual(TagDate(2018, 11, 1, DatePrecision.MONTH),
+                         parse_date('2018-11'))
+        self.assertEqual(TagDate(2018, 11, 26, DatePrecision.DAY),
+                         parse_date('2018-11-26'))
+
+    def test_returns_none_for_invalid_dates(self):
+        for test_case in ('year', '1999-12-32', '2018-02-29', '341-11-22'):
+            with self.subTest(date=test_case):
+                self.assertIsNone(parse_date(test_case))
+
+    def test_dates_sort_by_day_and_precision(self):
+        dates = [parse_date(date) for date in ('2018-01-01', '2017-12', '2018')]
+        self.assertListEqual(['2017-12', '2018', '2018-01-01'], [
+            f'{date.year}' if date.precision == DatePrecision.YEAR else
+            f'{date.year}-{date.month:02}' if date.precision == DatePrecision.MONTH
+            else f'{date.year}-{date.month:02}-{date.day:02}'
+            for date in sorted(dates)])
+
 
 class SpecificValidatorTestCase(TestCase):
 
@@ -150,4 +208,42 @@ class SpecificValidatorTestCase(TestCase):
         for test_case in test_cases:
             with self.subTest(email=test_case):
                 self.assertFalse(specific_validator(test_case),
-                                 '{} should not be valid'.format(test_case))
\ No newline at end of file
+                                 '{} should not be valid'.format(test_case))
+
+    def test_rejects_non_ascii_characters(self):
+        test_cases = ('Café', 'ñ', '²', '٣', 'あいうえお')
+        for test_case in test_cases:
+            with self.subTest(specific=test_case):
+                self.assertFalse(specific_validator(test_case),
+                                 '{} should not be valid'.format(test_case))
+        self.assertTrue(specific_validator('Caf%C3%A9'))
+
+
+class ValidateSpecificsTestCase(TestCase):
+    test_cases = (
+        '', 'specific', 'path/to/resource.html', 'hello%20world', '%2f',
+        '<rejected>', 'hello world', '%HF', 'Café', 'a%', '%4', 'a#b', '41',
+    )
+
+    def test_validates_batches(self):
+        expected = [specific_validator(test_case) for test_case in self.test_cases]
+        self.assertListEqual(expected, validate_specifics(self.test_cases))
+
+    def test_validates_valid_batches(self):
+        self.assertListEqual([True, True], validate_specifics(['a', 'b%20']))
+
+    def test_pct_encoding_does_not_span_specifics(self):
+        self.assertListEqual([False, True], validate_specifics(['a%', '41']))
+        self.assertListEqual([False, True], validate_specifics(['a%4', '1']))
+
+    def test_accepts_iterables(self):
+        self.assertListEqual([True, False],
+                             validate_specifics(iter(['a', 'a b'])))
+
+    @unittest.skipIf(validator.numpy is None, 'NumPy is not installed')
+    def test_validates_large_batches_with_numpy(self):
+        specifics = self.test_cases * (validator.NUMPY_BATCH_SIZE // 10)
+        expected = [specific_validator(specific) for specific in specifics]
+        self.assertListEqual(expected, validate_specifics(specifics))
+        self.assertListEqual(
+            expected, validator._validate_specifics_numpy(specifics))